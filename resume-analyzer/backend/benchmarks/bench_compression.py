@@ -0,0 +1,84 @@
+"""
+Compression cost and ratio per encoding and level on response bodies.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_compression --output results/compression.json
+
+The bodies are the ``benchmarks.bench_json`` payloads (100-resume list
+pages, an analysis and an optimization result) encoded as the app sends
+them. For every available encoding and level it reports the compressed
+size, the ratio and the time to compress, which is what
+COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY / COMPRESSION_ZSTD_LEVEL
+trade against each other. Timings are in microseconds.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+from typing import Any, Callable, Dict
+
+from benchmarks.bench_json import build_payloads
+from benchmarks.bench_nlp import _git_commit, measure
+from core.http_compression import brotli, zstandard
+from core.json_response import dumps
+from core.metrics import metrics
+
+LEVELS = {
+    "gzip": (1, 3, 6, 9),
+    "br": (1, 4, 6, 9, 11),
+    "zstd": (1, 3, 6, 12, 19),
+}
+
+
+def compressors() -> Dict[str, Callable[[bytes, int], bytes]]:
+    found = {"gzip": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0)}
+    if brotli is not None:
+        found["br"] = lambda data, level: brotli.compress(data, quality=level)
+    if zstandard is not None:
+        found["zstd"] = lambda data, level: zstandard.ZstdCompressor(level=level).compress(data)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="resumes per list page")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--budget", type=float, default=1.0, help="max seconds per measurement")
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    metrics.enabled = False
+    available = compressors()
+    results: Dict[str, Any] = {}
+    for name, payload in build_payloads(args.count, args.seed).items():
+        body = dumps(payload)
+        entry: Dict[str, Any] = {"bytes": len(body)}
+        for encoding, compress in available.items():
+            entry[encoding] = {}
+            for level in LEVELS[encoding]:
+                size = len(compress(body, level))
+                entry[encoding][str(level)] = {
+                    "bytes": size,
+                    "ratio": round(len(body) / size, 2),
+                    **measure(lambda: compress(body, level), args.repeat, args.budget),
+                }
+        results[name] = entry
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "encodings": sorted(available),
+        "count": args.count,
+        "payloads": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measure cold-start cost: importing ``main`` and serving the first request.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_import --runs 5 --output results/import.json
+
+Each run is a fresh interpreter started with ``-X importtime``. It
+reports the time to ``import main``, the time until the first ``GET /``
+response (startup handlers included, local storage, warm-up off), which
+heavy dependencies were loaded by the import alone, and the slowest
+imports made by ``main`` and its direct dependencies. A heavy module
+under ``eager_heavy_modules`` means something imports it at module
+level again.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("fitz", "docx", "firebase_admin", "google.cloud.firestore", "groq", "openai")
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+eager = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    client.get("/")
+    served = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (served - started) * 1000,
+    "eager_heavy_modules": eager,
+}}))
+"""
+
+
+def parse_importtime(stderr: str, max_depth: int = 2) -> Dict[str, float]:
+    """
+    Cumulative milliseconds per module from ``-X importtime`` output, for
+    modules nested at most ``max_depth`` levels below a top-level import
+    (depth 1 is what ``main`` imports directly).
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if cumulative.strip().isdigit() and 1 <= depth <= max_depth:
+            modules[name.strip()] = int(cumulative) / 1000
+    return modules
+
+
+def run_once() -> Dict[str, Any]:
+    env = {
+        **os.environ,
+        "USE_LOCAL_DB": "true",
+        "LOCAL_DB_BACKEND": "memory",
+        "STARTUP_WARMUP": "false",
+        "LOG_LEVEL": "WARNING",
+        "PYTHONPATH": BACKEND_DIR,
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["modules"] = parse_importtime(completed.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    runs: List[Dict[str, Any]] = [run_once() for _ in range(args.runs)]
+    per_module: Dict[str, List[float]] = defaultdict(list)
+    for run in runs:
+        for name, elapsed in run["modules"].items():
+            per_module[name].append(elapsed)
+    slowest = sorted(
+        ((name, round(statistics.median(values), 1)) for name, values in per_module.items()),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+
+    import_ms = [run["import_ms"] for run in runs]
+    first_ms = [run["first_response_ms"] for run in runs]
+    report = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_main_ms": {"median": round(statistics.median(import_ms), 1), "min": round(min(import_ms), 1)},
+        "first_response_ms": {"median": round(statistics.median(first_ms), 1), "min": round(min(first_ms), 1)},
+        "eager_heavy_modules": sorted({name for run in runs for name in run["eager_heavy_modules"]}),
+        "slowest_imports_ms": dict(slowest),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Compare response serialization paths on large resume payloads.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_json --output results/json.json
+
+Payloads are built from the synthetic corpus: a 100-resume list page in
+summary form and with ``include=analysis``, one ``/api/analyze-resume``
+result and one ``/api/optimize-resume`` result. Each is encoded by
+
+* ``fastapi_default``: ``jsonable_encoder`` then Starlette's ``JSONResponse``,
+* ``response_model`` (analysis only): the model re-validated first, as
+  FastAPI does for ``response_model=AIAnalysisResult``,
+* ``fast_stdlib`` and ``fast_orjson``: ``core.json_response.dumps`` with
+  each encoder (orjson only when installed).
+
+Timings are in microseconds. ``equivalent`` reports whether every path
+decodes to the same document.
+"""
+import argparse
+import json
+import os
+import platform
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.bench_nlp import _git_commit, measure
+from benchmarks.corpus import make_job_description, make_resume
+from benchmarks.fake_llm import CANNED_PAYLOAD
+from core import json_response
+from core.metrics import metrics
+from models.schemas import AIAnalysisResult
+from services.nlp_engine import NLPService
+
+
+def build_payloads(count: int, seed: int) -> Dict[str, Any]:
+    nlp = NLPService()
+    job = make_job_description(seed, skill_count=12)
+    started = datetime(2025, 1, 1, 9, 30)
+    summaries, expanded = [], []
+    analysis = None
+    for index in range(count):
+        text = make_resume(seed + index, roles=3, bullets_per_role=4, skill_count=14)
+        analysis = nlp.analyze_resume_vs_job(text, job)
+        analysis.resume_skills = nlp.extract_skills(text)
+        analysis.strengths = ["Quantified impact in recent roles", "Relevant backend stack"]
+        item = {
+            "id": f"resume-{index:04d}",
+            "filename": f"resume_{index}.pdf",
+            "uploaded_at": started + timedelta(hours=index, microseconds=index * 137),
+            "ats_score": analysis.ats_score,
+            "analysis_summary": {
+                "ats_score": analysis.ats_score,
+                "matched_count": len(analysis.matched_skills),
+                "missing_count": len(analysis.missing_skills),
+            },
+        }
+        summaries.append(item)
+        expanded.append({**item, "analysis_result": analysis.dict()})
+    return {
+        "list_summary": summaries,
+        "list_with_analysis": expanded,
+        "analyze_result": analysis,
+        "optimize_result": {**CANNED_PAYLOAD, "optimized_resume_id": "resume-9999", "version": 2},
+    }
+
+
+def _stock(content: Any) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _validated(content: AIAnalysisResult) -> bytes:
+    return _stock(AIAnalysisResult(**content.dict()))
+
+
+def _with_encoder(encoder) -> Callable[[Any], bytes]:
+    def encode(content: Any) -> bytes:
+        saved = json_response.orjson
+        json_response.orjson = encoder
+        try:
+            return json_response.dumps(content)
+        finally:
+            json_response.orjson = saved
+    return encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="resumes per list page")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=2.0, help="max seconds per measurement")
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    metrics.enabled = False
+    json_response.settings.FAST_JSON_RESPONSES = True
+
+    paths: Dict[str, Callable[[Any], bytes]] = {
+        "fastapi_default": _stock,
+        "fast_stdlib": _with_encoder(None),
+    }
+    if json_response.orjson is not None:
+        paths["fast_orjson"] = _with_encoder(json_response.orjson)
+
+    results: Dict[str, Any] = {}
+    for name, payload in build_payloads(args.count, args.seed).items():
+        candidates = dict(paths)
+        if isinstance(payload, AIAnalysisResult):
+            candidates["response_model"] = _validated
+        bodies = {path: encode(payload) for path, encode in candidates.items()}
+        decoded = [json.loads(body) for body in bodies.values()]
+        results[name] = {
+            "bytes": len(bodies["fastapi_default"]),
+            "equivalent": all(document == decoded[0] for document in decoded),
+            **{path: measure(lambda: encode(payload), args.repeat, args.budget) for path, encode in candidates.items()},
+        }
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "orjson": getattr(json_response.orjson, "__version__", None),
+        "count": args.count,
+        "payloads": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compare the in-memory MockCollection with the SQLite backend.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_local_db --docs 100000 --output results/local_db.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from db.firebase import MockDatabase
+from db.sqlite_store import SQLiteDatabase
+
+
+def make_documents(count: int, users: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    documents = []
+    for index in range(count):
+        parent = documents[rng.randrange(index)]["id"] if index and rng.random() < 0.2 else None
+        documents.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": f"user-{rng.randrange(users)}",
+            "parent_resume_id": parent,
+            "filename": f"resume_{index}.pdf",
+            "content_text": "Experienced engineer. " * 20,
+            "uploaded_at": started + timedelta(minutes=index),
+            "ats_score": rng.randint(30, 95),
+            "analysis_summary": {"ats_score": 70, "matched_count": 8, "missing_count": 3},
+            "analysis_result": {
+                "matched_skills": ["python", "sql", "docker", "aws"] * 5,
+                "missing_skills": ["kubernetes", "terraform"] * 5,
+                "ai_suggestions": ["Quantify the impact of each project bullet."] * 4,
+            },
+        })
+    return documents
+
+
+async def _timed(label: str, results: Dict[str, float], operations: int, coro_factory):
+    started = time.perf_counter()
+    for index in range(operations):
+        await coro_factory(index)
+    elapsed = time.perf_counter() - started
+    results[label] = round(elapsed / operations * 1e6, 2)
+
+
+async def bench_backend(collection, documents, lookups: int, rng: random.Random) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    for document in documents:
+        await collection.insert_one(dict(document))
+    results["insert_one_us"] = round((time.perf_counter() - started) / len(documents) * 1e6, 2)
+
+    sample = [rng.choice(documents) for _ in range(lookups)]
+
+    await _timed("find_one_by_id_us", results, lookups,
+                 lambda i: collection.find_one({"id": sample[i]["id"]}))
+
+    async def find_user(i):
+        await collection.find({"user_id": sample[i]["user_id"]}).sort("uploaded_at", -1).to_list(length=100)
+
+    await _timed("find_by_user_us", results, lookups, find_user)
+
+    async def list_summary_page(i):
+        await collection.find(
+            {"user_id": sample[i]["user_id"]},
+            projection=["filename", "uploaded_at", "ats_score", "analysis_summary"],
+        ).sort("uploaded_at", -1).to_list(length=20)
+
+    await _timed("list_summary_page_us", results, lookups, list_summary_page)
+
+    async def find_versions(i):
+        resume_id = sample[i]["id"]
+        await collection.find({"$or": [{"id": resume_id}, {"parent_resume_id": resume_id}]}).to_list(length=100)
+
+    await _timed("find_versions_or_us", results, lookups, find_versions)
+
+    await _timed("update_one_us", results, lookups,
+                 lambda i: collection.update_one({"id": sample[i]["id"]}, {"$set": {"ats_score": i}}))
+
+    victims = list({doc["id"] for doc in sample})
+    await _timed("delete_one_us", results, len(victims),
+                 lambda i: collection.delete_one({"id": victims[i]}))
+    return results
+
+
+async def run(doc_count: int, users: int, lookups: int) -> Dict[str, Any]:
+    documents = make_documents(doc_count, users)
+    report: Dict[str, Any] = {"docs": doc_count, "users": users, "lookups": lookups, "backends": {}}
+
+    report["backends"]["memory"] = await bench_backend(
+        MockDatabase()["resumes"], documents, lookups, random.Random(1)
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = SQLiteDatabase(os.path.join(directory, "bench.db"), synchronous="NORMAL")
+        report["backends"]["sqlite"] = await bench_backend(
+            database["resumes"], documents, lookups, random.Random(1)
+        )
+        database.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.docs, args.users, args.lookups))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Time the NLP scoring pipeline and the resume parser on a synthetic corpus.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_nlp --output results/nlp.json
+    python -m benchmarks.bench_nlp --baseline results/nlp.json
+
+Every resume case in ``benchmarks.corpus`` is run through
+``extract_skills``, each ``_score_*`` function and the keyword-stuffing
+penalty; similarity and ``analyze_resume_vs_job`` are run per resume/JD
+pair. PDF and DOCX extraction use documents rendered from the same text.
+Timings are in microseconds. With ``--baseline``, each median is printed
+next to the baseline's and flagged when it regressed by more than
+``--threshold``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import job_cases, render_docx, render_pdf, resume_cases
+from core.metrics import metrics
+from services.nlp_engine import NLPService
+from services.parser import extract_text_from_docx, extract_text_from_pdf
+
+
+def measure(func: Callable[[], Any], repeat: int, budget: float) -> Dict[str, float]:
+    """Run ``func`` up to ``repeat`` times, stopping early once ``budget`` seconds are spent."""
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+        if time.perf_counter() > deadline:
+            break
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6, 2),
+        "min_us": round(samples[0] * 1e6, 2),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_nlp(resumes: Dict[str, str], jobs: Dict[str, str], repeat: int, budget: float) -> Dict[str, Any]:
+    nlp = NLPService()
+    results: Dict[str, Any] = {}
+    job_skills = set(nlp.extract_skills(jobs["typical"]))
+
+    for name, text in resumes.items():
+        results[name] = {
+            "chars": len(text),
+            "extract_skills": measure(lambda: nlp.extract_skills(text), repeat, budget),
+            "_score_sections": measure(lambda: nlp._score_sections(text), repeat, budget),
+            "_score_impact_signals": measure(lambda: nlp._score_impact_signals(text), repeat, budget),
+            "_score_formatting": measure(lambda: nlp._score_formatting(text), repeat, budget),
+            "_keyword_stuffing_penalty": measure(
+                lambda: nlp._keyword_stuffing_penalty(text, job_skills), repeat, budget
+            ),
+            "calculate_similarity_score": {},
+            "analyze_resume_vs_job": {},
+        }
+        for job_name, job_text in jobs.items():
+            results[name]["calculate_similarity_score"][job_name] = measure(
+                lambda: nlp.calculate_similarity_score(text, job_text), repeat, budget
+            )
+            results[name]["analyze_resume_vs_job"][job_name] = measure(
+                lambda: nlp.analyze_resume_vs_job(text, job_text), repeat, budget
+            )
+    return results
+
+
+def bench_parser(resumes: Dict[str, str], repeat: int, budget: float) -> Dict[str, Any]:
+    loop = asyncio.new_event_loop()
+    results: Dict[str, Any] = {}
+    try:
+        for name in ("short", "typical", "long", "huge"):
+            pdf, docx_bytes = render_pdf(resumes[name]), render_docx(resumes[name])
+            results[name] = {
+                "pdf_bytes": len(pdf),
+                "docx_bytes": len(docx_bytes),
+                "pdf": measure(lambda: loop.run_until_complete(extract_text_from_pdf(pdf)), repeat, budget),
+                "docx": measure(lambda: loop.run_until_complete(extract_text_from_docx(docx_bytes)), repeat, budget),
+            }
+    finally:
+        loop.close()
+    return results
+
+
+def _medians(node: Any, path: str = "") -> Dict[str, float]:
+    if not isinstance(node, dict):
+        return {}
+    if "median_us" in node:
+        return {path: node["median_us"]}
+    found: Dict[str, float] = {}
+    for key, value in node.items():
+        found.update(_medians(value, f"{path}/{key}" if path else key))
+    return found
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print median changes against ``baseline``; returns the number of regressions."""
+    current, previous = _medians(report), _medians(baseline)
+    regressions = 0
+    for key in sorted(current.keys() & previous.keys()):
+        ratio = current[key] / previous[key] if previous[key] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:70s} {previous[key]:>12.1f} -> {current[key]:>12.1f} us  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--budget", type=float, default=2.0, help="max seconds per measurement")
+    parser.add_argument("--skip-parser", action="store_true")
+    parser.add_argument("--output", default="")
+    parser.add_argument("--baseline", default="", help="earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    # The stage histograms would otherwise grow for every timed call.
+    metrics.enabled = False
+
+    resumes, jobs = resume_cases(args.seed), job_cases(args.seed)
+    report: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "nlp": bench_nlp(resumes, jobs, args.repeat, args.budget),
+    }
+    if not args.skip_parser:
+        report["parser"] = bench_parser(resumes, args.repeat, args.budget)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        print(f"Comparing {report['commit']} against {baseline.get('commit', '?')}")
+        regressions = compare(report, baseline, args.threshold)
+        print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
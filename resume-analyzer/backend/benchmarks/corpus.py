@@ -0,0 +1,163 @@
+"""
+Deterministic synthetic resumes and job descriptions for benchmarks.
+
+Every case is derived from a seed, so two runs (or two commits) score the
+exact same inputs. ``resume_cases`` covers ordinary variation (length,
+skill density, bullet style, section layout) plus pathological inputs:
+a very large resume and one stuffed with repeated keywords.
+"""
+import io
+import random
+from typing import Dict, List, Optional
+
+from utils.skills_db import COMMON_SKILLS
+
+SKILLS = sorted(COMMON_SKILLS)
+
+VERBS = [
+    "Built", "Led", "Designed", "Developed", "Implemented", "Optimized", "Improved",
+    "Launched", "Scaled", "Automated", "Delivered", "Reduced", "Increased", "Maintained",
+]
+OBJECTS = [
+    "the billing service", "an internal analytics dashboard", "the onboarding flow",
+    "a data ingestion pipeline", "the search ranking model", "CI/CD pipelines",
+    "a customer-facing mobile app", "the recommendation engine", "monitoring and alerting",
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "serving {n}k users", "saving ${n}k per year",
+    "across {n} projects", "for {n}+ clients", "within {n} months", "improving conversion by {n}%",
+]
+FILLER = [
+    "Worked closely with product and design teams.",
+    "Participated in code reviews and planning sessions.",
+    "Responsible for day to day maintenance of existing systems.",
+    "Collaborated with stakeholders to gather requirements.",
+]
+BULLETS = ("- ", "* ", "• ", "")
+
+
+def _bullet(rng: random.Random, skills: List[str], marker: Optional[str], metrics: bool) -> str:
+    if marker is None:
+        marker = rng.choice(BULLETS)
+    line = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if skills:
+        line += f" using {', '.join(rng.sample(skills, min(len(skills), rng.randint(1, 3))))}"
+    if metrics:
+        line += ", " + rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    return f"{marker}{line}."
+
+
+def make_resume(
+    seed: int,
+    roles: int = 3,
+    bullets_per_role: int = 4,
+    skill_count: int = 12,
+    bullet_marker: Optional[str] = "- ",
+    layout: str = "standard",
+    metrics: bool = True,
+) -> str:
+    """
+    ``bullet_marker=None`` picks a marker per bullet. ``layout`` is
+    ``standard`` (conventional headings in order), ``shuffled`` (sections
+    in random order, uppercase headings) or ``inline`` (single-line
+    pipe-separated sections, as produced by two-column PDF templates).
+    """
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, min(skill_count, len(SKILLS)))
+
+    contact = f"Alex Morgan\nalex.morgan{seed}@example.com | +1 555 010 {seed % 10000:04d}"
+    summary = ["Summary", f"Engineer with {rng.randint(2, 15)} years of experience building products."]
+    experience = ["Experience"]
+    for role in range(roles):
+        experience.append(f"Senior Engineer, Company {role} ({2015 + role} - {2016 + role})")
+        for _ in range(bullets_per_role):
+            experience.append(_bullet(rng, skills, bullet_marker, metrics and rng.random() < 0.6))
+        if rng.random() < 0.3:
+            experience.append(rng.choice(FILLER))
+    projects = ["Projects"] + [_bullet(rng, skills, bullet_marker, metrics) for _ in range(2)]
+    education = ["Education", "B.Sc. Computer Science, State University"]
+    skills_section = ["Skills", ", ".join(skills)]
+
+    sections = [summary, experience, projects, education, skills_section]
+    if layout == "shuffled":
+        rng.shuffle(sections)
+        sections = [[section[0].upper()] + section[1:] for section in sections]
+    if layout == "inline":
+        body = "\n".join(f"{section[0]}: " + " | ".join(section[1:]) for section in sections)
+    else:
+        body = "\n\n".join("\n".join(section) for section in sections)
+    return f"{contact}\n\n{body}\n"
+
+
+def make_job_description(seed: int, skill_count: int = 10, paragraphs: int = 3) -> str:
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, min(skill_count, len(SKILLS)))
+    lines = ["Senior Software Engineer", ""]
+    for _ in range(paragraphs):
+        lines.append(
+            "You will join a growing team shipping reliable services to customers. "
+            + rng.choice(FILLER)
+        )
+    lines.append("")
+    lines.append("Requirements:")
+    lines.extend(f"- {rng.randint(2, 6)}+ years of experience with {skill}" for skill in skills)
+    return "\n".join(lines)
+
+
+def stuff_keywords(text: str, keywords: List[str], times: int) -> str:
+    return text + "\n" + "\n".join(" ".join(keywords) for _ in range(times))
+
+
+def resume_cases(seed: int = 7) -> Dict[str, str]:
+    cases = {
+        "short": make_resume(seed, roles=1, bullets_per_role=2, skill_count=4),
+        "typical": make_resume(seed + 1),
+        "long": make_resume(seed + 2, roles=10, bullets_per_role=8, skill_count=30),
+        "dense_skills": make_resume(seed + 3, skill_count=120),
+        # Fewer than three dictionary hits sends extract_skills to the fallback parser.
+        "sparse_skills": make_resume(seed + 4, skill_count=0, metrics=False),
+        "no_bullets": make_resume(seed + 5, bullet_marker=""),
+        "mixed_bullets": make_resume(seed + 6, bullet_marker=None),
+        "shuffled_sections": make_resume(seed + 7, layout="shuffled"),
+        "inline_layout": make_resume(seed + 8, layout="inline"),
+        "huge": make_resume(seed + 9, roles=200, bullets_per_role=10, skill_count=60),
+    }
+    # Repeat the skills of the "typical" job description so the stuffing penalty fires.
+    jd_skills = random.Random(seed + 1).sample(SKILLS, 10)
+    cases["keyword_stuffed"] = stuff_keywords(cases["typical"], jd_skills, times=50)
+    return cases
+
+
+def job_cases(seed: int = 7) -> Dict[str, str]:
+    return {
+        "none": "",
+        "short": make_job_description(seed, skill_count=4, paragraphs=1),
+        "typical": make_job_description(seed + 1),
+        "long": make_job_description(seed + 2, skill_count=40, paragraphs=20),
+    }
+
+
+def render_pdf(text: str) -> bytes:
+    import fitz
+
+    document = fitz.open()
+    lines = text.splitlines() or [""]
+    per_page = 50
+    for start in range(0, len(lines), per_page):
+        page = document.new_page()
+        page.insert_text((48, 56), "\n".join(lines[start:start + per_page]), fontsize=9)
+    try:
+        return document.tobytes()
+    finally:
+        document.close()
+
+
+def render_docx(text: str) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
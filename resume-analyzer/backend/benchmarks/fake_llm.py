@@ -0,0 +1,148 @@
+"""
+Local stand-in for the Groq and OpenAI chat completion APIs.
+
+Serves ``/openai/v1/chat/completions`` (Groq SDK paths) and
+``/v1/chat/completions`` (OpenAI SDK paths) with a canned JSON answer
+after a simulated latency. A configurable fraction of calls fails with
+500 or is rate limited with 429 plus ``retry-after-ms``, so the SDK retry
+paths are exercised too. ``GET /stats`` reports what was served.
+
+Usage (from the backend directory):
+    python -m benchmarks.fake_llm --port 8599 --latency-ms 400 --rate-limit-rate 0.05
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8599 and
+OPENAI_BASE_URL=http://127.0.0.1:8599/v1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# One payload carrying the required fields of every response model the
+# app validates; pydantic ignores the keys a given template does not use.
+CANNED_PAYLOAD = {
+    "resume_score": 72,
+    "ats_score": 70,
+    "skills": {"matched": ["python", "sql"], "missing": ["kubernetes"], "recommended": ["terraform"]},
+    "section_scores": {"education": 70, "experience": 75, "projects": 65, "skills": 80},
+    "strengths": ["Clear quantified impact in recent roles", "Relevant backend stack"],
+    "improvement_tips": ["Add metrics to project bullets", "Mention cloud deployment experience"],
+    "resume_category": "Experienced",
+    "experience_match": "Moderate",
+    "sections": [
+        {"name": "Summary", "score": 78, "status": "moderate", "feedback": "Tighten the opening line."},
+        {"name": "Experience", "score": 84, "status": "good", "feedback": "Strong action verbs."},
+        {"name": "Skills", "score": 66, "status": "needs-work", "feedback": "Group skills by area."},
+    ],
+    "optimized_summary": "Backend engineer focused on reliable, measurable delivery.",
+    "optimized_skills": ["python", "fastapi", "postgresql"],
+    "optimized_experience": [
+        {"original": "Built the billing service.", "optimized": "Built the billing service handling 2M invoices/month.", "reason": "Quantified"},
+    ],
+    "ats_improvement_score": 8,
+    "changes_explanation": "Added metrics and role keywords.",
+    "key_changes": [{"section": "experience", "change_type": "modified", "description": "Quantified bullets", "impact": "positive"}],
+    "improvements": ["More measurable outcomes"],
+    "regressions": [],
+    "recommendation": "Use version 2.",
+    "match_percentage": 68,
+    "reasoning": "Most core skills are present.",
+}
+
+
+class FakeLLMState:
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, rate_limit_rate: float,
+                 retry_after_ms: int, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_ms = retry_after_ms
+        self.rng = random.Random(seed)
+        self.counts: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+def create_app(state: FakeLLMState) -> FastAPI:
+    app = FastAPI()
+    body = json.dumps(CANNED_PAYLOAD)
+
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            delay = max(0.0, state.latency_ms + state.rng.uniform(-state.jitter_ms, state.jitter_ms))
+            await asyncio.sleep(delay / 1000)
+        finally:
+            state.in_flight -= 1
+
+        roll = state.rng.random()
+        if roll < state.rate_limit_rate:
+            state.counts["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after-ms": str(state.retry_after_ms)},
+            )
+        if roll < state.rate_limit_rate + state.error_rate:
+            state.counts["errors"] += 1
+            return JSONResponse({"error": {"message": "Injected failure", "type": "server_error"}}, status_code=500)
+
+        state.counts["ok"] += 1
+        prompt_chars = sum(len(str(message.get("content") or "")) for message in payload.get("messages", []))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": body},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(body) // 4,
+                "total_tokens": (prompt_chars + len(body)) // 4,
+            },
+        }
+
+    app.add_api_route("/openai/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/stats")
+    async def stats():
+        return {**state.counts, "max_in_flight": state.max_in_flight}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=250)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    state = FakeLLMState(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                         args.retry_after_ms, args.seed)
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+End-to-end load test of the API against local stand-ins.
+
+Starts ``benchmarks.fake_llm`` and ``uvicorn main:app`` as subprocesses
+(USE_LOCAL_DB=true, so storage is the in-memory mock or the SQLite
+store), seeds users with uploaded resumes and optimized versions, then
+drives a weighted mix of uploads, analyze, heatmap, list and compare
+requests from concurrent workers for a fixed duration.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --duration 30 --concurrency 32 --output results/load.json
+    python -m benchmarks.load_test --backend sqlite --llm-latency-ms 800 --llm-429-rate 0.05
+
+The load generator cannot mint Firebase ID tokens, so each resume owner
+gets its own address in ``X-Forwarded-For`` and the app runs with
+TRUSTED_PROXY_HOPS=1; quotas then key callers by that address. Per-caller
+quotas are off unless ``--quotas`` is given; with it, throttled calls show up as
+429 in the route statuses and the fair-queue counters are reported.
+
+The report has throughput and p50/p95/p99 latency per route. A separate
+probe requests ``GET /`` every 100 ms; that route does no work, so its
+tail latency rising under load means something is blocking the event
+loop.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.corpus import make_job_description, make_resume, render_docx, render_pdf
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "upload=1,analyze=3,heatmap=2,list=3,compare=1"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name!r} (choose from {', '.join(OPERATIONS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def start_process(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "wb")
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Process exited early while waiting for {url}")
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, status: str, elapsed: float):
+        self.latencies[route].append(elapsed)
+        self.statuses[route][status] += 1
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            statuses = dict(self.statuses[route])
+            ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+            routes[route] = {
+                "requests": len(values),
+                "ok": ok,
+                "statuses": statuses,
+                "throughput_rps": round(len(values) / duration, 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+        return routes
+
+
+class Fixture:
+    """Resumes and job descriptions shared by the workers."""
+
+    def __init__(self, seed: int, variants: int):
+        rng = random.Random(seed)
+        self.documents: List[Tuple[str, bytes, str]] = []
+        for index in range(variants):
+            text = make_resume(seed + index, roles=rng.randint(1, 6), skill_count=rng.randint(4, 30))
+            if index % 2:
+                self.documents.append((f"resume_{index}.docx", render_docx(text),
+                                       "application/vnd.openxmlformats-officedocument.wordprocessingml.document"))
+            else:
+                self.documents.append((f"resume_{index}.pdf", render_pdf(text), "application/pdf"))
+        self.jobs = [make_job_description(seed + index) for index in range(variants)]
+        self.users: List[str] = []
+        self.resumes: List[str] = []
+        self.owners: Dict[str, str] = {}
+        # Original resume ids that have at least one optimized version.
+        self.versioned: List[str] = []
+
+    def caller(self, resume_id: str) -> Dict[str, str]:
+        digest = zlib.crc32(self.owners.get(resume_id, "load-anonymous").encode("utf-8"))
+        return {"X-Forwarded-For": f"10.{digest >> 16 & 255}.{digest >> 8 & 255}.{digest & 255}"}
+
+
+async def call(client: httpx.AsyncClient, recorder: Recorder, route: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        status = str(response.status_code)
+    except httpx.HTTPError as error:
+        response, status = None, type(error).__name__
+    recorder.record(route, status, time.perf_counter() - started)
+    return response
+
+
+async def op_upload(client, recorder, fixture: Fixture, rng: random.Random):
+    filename, content, content_type = rng.choice(fixture.documents)
+    data = {"user_id": rng.choice(fixture.users)}
+    response = await call(
+        client, recorder, "POST /api/upload-resume", "POST", "/api/upload-resume",
+        files={"file": (filename, content, content_type)}, data=data,
+    )
+    if response is not None and response.status_code == 200:
+        fixture.resumes.append(response.json()["resume_id"])
+        fixture.owners[fixture.resumes[-1]] = data["user_id"]
+
+
+async def op_analyze(client, recorder, fixture: Fixture, rng: random.Random):
+    # A per-request suffix keeps the AI response cache from answering every call.
+    job = f"{rng.choice(fixture.jobs)}\nReference {rng.getrandbits(32):08x}"
+    resume_id = rng.choice(fixture.resumes)
+    await call(client, recorder, "POST /api/analyze-resume", "POST", "/api/analyze-resume",
+               json={"resume_id": resume_id, "job_description": job}, headers=fixture.caller(resume_id))
+
+
+async def op_heatmap(client, recorder, fixture: Fixture, rng: random.Random):
+    resume_id = rng.choice(fixture.resumes)
+    await call(client, recorder, "POST /api/ats-heatmap", "POST", "/api/ats-heatmap",
+               json={"resume_id": resume_id}, headers=fixture.caller(resume_id))
+
+
+async def op_list(client, recorder, fixture: Fixture, rng: random.Random):
+    await call(client, recorder, "GET /api/resumes/{user_id}", "GET",
+               f"/api/resumes/{rng.choice(fixture.users)}", params={"limit": 20})
+
+
+async def op_compare(client, recorder, fixture: Fixture, rng: random.Random):
+    if not fixture.versioned:
+        return await op_list(client, recorder, fixture, rng)
+    await call(client, recorder, "POST /api/compare-versions", "POST", "/api/compare-versions",
+               json={"resume_id": rng.choice(fixture.versioned), "version1": 1, "version2": 2})
+
+
+OPERATIONS = {
+    "upload": op_upload,
+    "analyze": op_analyze,
+    "heatmap": op_heatmap,
+    "list": op_list,
+    "compare": op_compare,
+}
+
+
+async def seed_data(client: httpx.AsyncClient, fixture: Fixture, users: int, per_user: int, versions: int):
+    rng = random.Random(1)
+    fixture.users = [f"load-user-{index}" for index in range(users)]
+    for user in fixture.users:
+        for _ in range(per_user):
+            filename, content, content_type = rng.choice(fixture.documents)
+            response = await client.post(
+                "/api/upload-resume",
+                files={"file": (filename, content, content_type)}, data={"user_id": user},
+            )
+            response.raise_for_status()
+            fixture.resumes.append(response.json()["resume_id"])
+            fixture.owners[fixture.resumes[-1]] = user
+
+    for resume_id in fixture.resumes[:versions]:
+        response = await client.post(
+            "/api/optimize-resume",
+            json={"resume_id": resume_id, "job_description": rng.choice(fixture.jobs)},
+            headers=fixture.caller(resume_id),
+        )
+        if response.status_code == 200:
+            fixture.versioned.append(resume_id)
+
+
+async def worker(client, recorder, fixture: Fixture, mix: Dict[str, float], deadline: float, seed: int):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        operation = OPERATIONS[rng.choices(names, weights)[0]]
+        await operation(client, recorder, fixture, rng)
+
+
+async def probe(client, recorder, deadline: float, interval: float = 0.1):
+    while time.perf_counter() < deadline:
+        await call(client, recorder, "probe GET /", "GET", "/")
+        await asyncio.sleep(interval)
+
+
+async def run_load(base_url: str, llm_url: str, app: subprocess.Popen, llm: subprocess.Popen, args) -> Dict[str, Any]:
+    fixture = Fixture(args.seed, variants=8)
+    limits = httpx.Limits(max_connections=args.concurrency + 4, max_keepalive_connections=args.concurrency + 4)
+    timeout = httpx.Timeout(args.request_timeout)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        await wait_ready(client, f"{llm_url}/stats", llm)
+        await wait_ready(client, "/", app)
+        await seed_data(client, fixture, args.users, args.resumes_per_user, args.versions)
+
+        recorder = Recorder()
+        mix = parse_mix(args.mix)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            probe(client, recorder, deadline),
+            *(worker(client, recorder, fixture, mix, deadline, args.seed + index) for index in range(args.concurrency)),
+        )
+        elapsed = time.perf_counter() - started
+
+        llm_stats = (await client.get(f"{llm_url}/stats")).json()
+        transport_stats = (await client.get("/api/ai/transport-stats")).json()
+        quota_stats = (await client.get("/api/ai/quota-stats")).json()
+
+    routes = recorder.report(elapsed)
+    total = sum(stats["requests"] for route, stats in routes.items() if not route.startswith("probe"))
+    return {
+        "duration_s": round(elapsed, 2),
+        "concurrency": args.concurrency,
+        "backend": args.backend,
+        "mix": args.mix,
+        "llm": {
+            "latency_ms": args.llm_latency_ms,
+            "error_rate": args.llm_error_rate,
+            "rate_limit_rate": args.llm_429_rate,
+            "served": llm_stats,
+        },
+        "seeded": {"users": len(fixture.users), "resumes": len(fixture.resumes), "versioned": len(fixture.versioned)},
+        "throughput_rps": round(total / elapsed, 2),
+        "routes": routes,
+        "transport": transport_stats,
+        "quotas": quota_stats if args.quotas else None,
+    }
+
+
+def print_table(report: Dict[str, Any]):
+    print(f"\n{report['throughput_rps']} req/s over {report['duration_s']}s "
+          f"(concurrency {report['concurrency']}, backend {report['backend']})")
+    print(f"{'route':34s} {'reqs':>6s} {'ok':>6s} {'rps':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s}")
+    for route, stats in report["routes"].items():
+        print(f"{route:34s} {stats['requests']:>6d} {stats['ok']:>6d} {stats['throughput_rps']:>7.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    print(f"fake LLM: {report['llm']['served']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--resumes-per-user", type=int, default=3)
+    parser.add_argument("--versions", type=int, default=10, help="resumes to optimize so compare has two versions")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-429-rate", type=float, default=0.0)
+    parser.add_argument("--request-timeout", type=float, default=120)
+    parser.add_argument("--quotas", action="store_true", help="keep the per-user AI quotas enabled")
+    parser.add_argument("--app-port", type=int, default=0)
+    parser.add_argument("--llm-port", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    app_port, llm_port = args.app_port or free_port(), args.llm_port or free_port()
+    base_url, llm_url = f"http://127.0.0.1:{app_port}", f"http://127.0.0.1:{llm_port}"
+    workdir = tempfile.mkdtemp(prefix="skillsnap-load-")
+
+    env = {
+        **os.environ,
+        "USE_LOCAL_DB": "true",
+        "LOCAL_DB_BACKEND": args.backend,
+        "LOCAL_DB_PATH": os.path.join(workdir, "load.db"),
+        "LOCAL_DB_SYNCHRONOUS": "NORMAL",
+        "GROQ_API_KEY": "fake-key",
+        "GROQ_BASE_URL": llm_url,
+        "OPENAI_API_KEY": "fake-key",
+        "OPENAI_BASE_URL": f"{llm_url}/v1",
+        "QUOTA_ENABLED": "true" if args.quotas else "false",
+        "TRUSTED_PROXY_HOPS": "1",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "PYTHONPATH": BACKEND_DIR,
+    }
+    processes: List[subprocess.Popen] = []
+    try:
+        llm = start_process([
+            "-m", "benchmarks.fake_llm", "--port", str(llm_port),
+            "--latency-ms", str(args.llm_latency_ms), "--jitter-ms", str(args.llm_jitter_ms),
+            "--error-rate", str(args.llm_error_rate), "--rate-limit-rate", str(args.llm_429_rate),
+            "--seed", str(args.seed),
+        ], env, os.path.join(workdir, "fake_llm.log"))
+        processes.append(llm)
+        app = start_process(
+            ["-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(app_port), "--log-level", "warning"],
+            env, os.path.join(workdir, "app.log"),
+        )
+        processes.append(app)
+
+        report = asyncio.run(run_load(base_url, llm_url, app, llm, args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print_table(report)
+    print(f"logs: {workdir}")
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Caller identity from Firebase ID tokens.
+
+The frontend sends the signed-in user's ID token as ``Authorization:
+Bearer <token>``. ``token_verifier.uid`` checks it with firebase-admin
+(signature against Google's published keys, audience
+FIREBASE_PROJECT_ID, expiry) and returns the Firebase uid, or None for a
+token that does not verify. Verified tokens are remembered until they
+expire, so repeat requests from the same session skip the check; a miss
+verifies on the threadpool because fetching the public keys blocks.
+
+firebase-admin is imported on first use. When the app already connected
+to Firestore its default app is reused; otherwise a credential-less app
+named ``AUTH_APP_NAME`` is created, which is all token verification needs.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from core.config import get_settings
+from core.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+AUTH_APP_NAME = "id-token-verifier"
+
+
+def bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers") or []:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token.strip():
+                return token.strip()
+    return None
+
+
+def client_address(scope) -> str:
+    """
+    The client's address. Behind TRUSTED_PROXY_HOPS proxies it is read
+    from X-Forwarded-For, counting from the right: every proxy appends
+    the address it received the request from, so entries further left
+    were written by the client and are not trusted.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        for name, value in scope.get("headers") or []:
+            if name == b"x-forwarded-for":
+                hosts = [host.strip() for host in value.decode("latin-1").split(",") if host.strip()]
+                if hosts:
+                    return hosts[-min(hops, len(hosts))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class TokenVerifier:
+    def __init__(self, project_id: str, max_entries: int = 1024):
+        self.project_id = project_id
+        self.max_entries = max_entries
+        self._verified: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = Lock()
+        self._app = None
+
+    def _firebase_app(self):
+        import firebase_admin
+
+        with self._lock:
+            if self._app is None:
+                try:
+                    self._app = firebase_admin.get_app()
+                except ValueError:
+                    try:
+                        self._app = firebase_admin.get_app(AUTH_APP_NAME)
+                    except ValueError:
+                        self._app = firebase_admin.initialize_app(
+                            options={"projectId": self.project_id}, name=AUTH_APP_NAME
+                        )
+            return self._app
+
+    def _cached(self, token: str) -> Optional[str]:
+        with self._lock:
+            entry = self._verified.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._verified[token]
+                return None
+            self._verified.move_to_end(token)
+            return entry[0]
+
+    def verify(self, token: str) -> Optional[str]:
+        try:
+            from firebase_admin import auth
+
+            claims = auth.verify_id_token(token, app=self._firebase_app())
+        except ImportError:
+            logger.warning("firebase-admin is not installed; ID tokens cannot be verified")
+            return None
+        except Exception as e:
+            logger.info("Rejected Firebase ID token", extra={"error": str(e)})
+            return None
+
+        uid = claims.get("uid") or claims.get("sub")
+        if not uid:
+            return None
+        with self._lock:
+            self._verified[token] = (uid, float(claims.get("exp", 0)))
+            self._verified.move_to_end(token)
+            while len(self._verified) > self.max_entries:
+                self._verified.popitem(last=False)
+        return uid
+
+    async def uid(self, token: str) -> Optional[str]:
+        cached = self._cached(token)
+        if cached is not None:
+            return cached
+        return await run_in_threadpool(self.verify, token)
+
+
+token_verifier = TokenVerifier(settings.FIREBASE_PROJECT_ID)
@@ -9,12 +9,92 @@ class Settings(BaseSettings):
     FIREBASE_PROJECT_ID: str = os.getenv("FIREBASE_PROJECT_ID", "ai-resume-400b1")
     FIREBASE_CREDENTIALS_PATH: str = os.getenv("FIREBASE_CREDENTIALS_PATH", "")
     FIREBASE_CREDENTIALS_JSON: str = os.getenv("FIREBASE_CREDENTIALS_JSON", "")
+    # Window for coalescing Firestore $set updates into batched commits; 0 writes immediately.
+    FIRESTORE_WRITE_COALESCE_MS: int = int(os.getenv("FIRESTORE_WRITE_COALESCE_MS", "50"))
+    # Read-through cache for resume documents fetched by id; 0 entries disables it.
+    DOC_CACHE_MAX_ENTRIES: int = int(os.getenv("DOC_CACHE_MAX_ENTRIES", "1024"))
+    DOC_CACHE_TTL_SECONDS: int = int(os.getenv("DOC_CACHE_TTL_SECONDS", "30"))
+    # Compression of large stored fields: "zlib", "zstd" (needs zstandard) or "none".
+    STORAGE_COMPRESSION: str = os.getenv("STORAGE_COMPRESSION", "zlib")
+    STORAGE_COMPRESSION_LEVEL: int = int(os.getenv("STORAGE_COMPRESSION_LEVEL", "6"))
+    STORAGE_COMPRESSION_MIN_BYTES: int = int(os.getenv("STORAGE_COMPRESSION_MIN_BYTES", "512"))
+    # Structured logging: "json" or "text"; high-volume events are sampled at LOG_SAMPLE_RATE.
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Request profiling: triggered by "X-Profile: <PROFILING_ADMIN_TOKEN>" or sampled at PROFILING_SAMPLE_RATE.
+    PROFILING_ADMIN_TOKEN: str = os.getenv("PROFILING_ADMIN_TOKEN", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_MODE: str = os.getenv("PROFILING_MODE", "cprofile")  # "cprofile" or "sampling"
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "local_data/profiles")
+    PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", "50"))
+    # SQLite file shared by all workers on a host (AI response cache, ETag counters,
+    # document-cache invalidations); empty keeps that state per process.
+    SHARED_STATE_PATH: str = os.getenv("SHARED_STATE_PATH", "")
+    SHARED_STATE_MAX_ENTRIES: int = int(os.getenv("SHARED_STATE_MAX_ENTRIES", "10000"))
+    # Import deferred dependencies and build API clients in a background thread after startup.
+    STARTUP_WARMUP: bool = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+    # Encode responses in one pass (orjson when installed) instead of FastAPI's jsonable_encoder walk.
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+    # Response compression: gzip always, zstd/br when zstandard/brotli are installed.
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Single-body responses smaller than this are sent as is.
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_CONTENT_TYPES: str = os.getenv(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,text/plain,text/html,text/css,text/csv,application/javascript,image/svg+xml",
+    )
+    # Server preference among encodings the client accepts equally.
+    COMPRESSION_PREFERENCE: str = os.getenv("COMPRESSION_PREFERENCE", "zstd,br,gzip")
+    # Higher levels trade CPU per response for fewer bytes on the wire.
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    # Per-route / per-stage latency histograms served on /metrics.
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Storage used when Firestore is unavailable (or skipped via USE_LOCAL_DB): "memory" or "sqlite".
+    USE_LOCAL_DB: bool = os.getenv("USE_LOCAL_DB", "false").lower() in ("1", "true", "yes")
+    LOCAL_DB_BACKEND: str = os.getenv("LOCAL_DB_BACKEND", "memory")
+    LOCAL_DB_PATH: str = os.getenv("LOCAL_DB_PATH", "local_data/skillsnap.db")
+    LOCAL_DB_SYNCHRONOUS: str = os.getenv("LOCAL_DB_SYNCHRONOUS", "FULL")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-long-secret-key")
     SPACY_MODEL: str = "en_core_web_sm"
     TRANSFORMER_MODEL: str = "all-MiniLM-L6-v2"
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+    # Provider endpoint overrides (e.g. a local fake for load tests); empty uses the SDK default.
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    # Shared HTTP transport for the Groq/OpenAI clients.
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+    LLM_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5"))
+    LLM_HTTP_READ_TIMEOUT: float = float(os.getenv("LLM_HTTP_READ_TIMEOUT", "60"))
+    LLM_HTTP_WRITE_TIMEOUT: float = float(os.getenv("LLM_HTTP_WRITE_TIMEOUT", "30"))
+    LLM_HTTP_POOL_TIMEOUT: float = float(os.getenv("LLM_HTTP_POOL_TIMEOUT", "10"))
+    LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+    # Max tokens for the one-shot "continue the JSON" request on truncated output; 0 disables it.
+    LLM_CONTINUATION_MAX_TOKENS: int = int(os.getenv("LLM_CONTINUATION_MAX_TOKENS", "512"))
+    # Per-caller token buckets on the AI-backed routes (costs in core.quotas.ROUTE_COSTS).
+    QUOTA_ENABLED: bool = os.getenv("QUOTA_ENABLED", "true").lower() in ("1", "true", "yes")
+    QUOTA_BURST: int = int(os.getenv("QUOTA_BURST", "20"))
+    QUOTA_REFILL_PER_MINUTE: float = float(os.getenv("QUOTA_REFILL_PER_MINUTE", "10"))
+    # Fair-queuing weights for specific callers, e.g. "user:<firebase uid>=2,addr:10.0.0.9=0.5"; others weigh 1.
+    QUOTA_USER_WEIGHTS: str = os.getenv("QUOTA_USER_WEIGHTS", "")
+    # Reverse proxies in front of the app; the client address is read from X-Forwarded-For past them.
+    TRUSTED_PROXY_HOPS: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+    # AI requests served at once per worker; the rest wait in the fair queue up to the timeout.
+    AI_MAX_CONCURRENT: int = int(os.getenv("AI_MAX_CONCURRENT", "4"))
+    AI_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", "30"))
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "512"))
+    AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+    CAREER_PATH_SIMILARITY_THRESHOLD: float = float(os.getenv("CAREER_PATH_SIMILARITY_THRESHOLD", "0.8"))
+    # Stored career roadmaps are regenerated after this many days.
+    CAREER_PATH_TTL_DAYS: float = float(os.getenv("CAREER_PATH_TTL_DAYS", "30"))
 
     class Config:
         case_sensitive = True
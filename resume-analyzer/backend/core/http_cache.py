@@ -0,0 +1,85 @@
+"""
+Conditional GET support for polled list endpoints.
+
+A route derives a version token from the DB change counters (no storage
+read), turns it into a strong ETag, answers a matching ``If-None-Match``
+with 304, and otherwise serves a cached serialized body as long as the
+version token has not moved.
+"""
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from core.json_response import dumps
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def make_etag(scope: str, version: str, request: Request) -> str:
+    """Strong ETag over the resource version and the exact query string."""
+    digest = hashlib.sha1(f"{scope}|{version}|{request.url.query}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    ``If-None-Match`` uses weak comparison, so the weakened tag of a
+    compressed response (see ``core.http_compression``) still matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {_opaque(value.strip()) for value in header.split(",")}
+    return "*" in candidates or _opaque(etag) in candidates
+
+
+class ConditionalResponseCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def _headers(self, etag: str, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        headers.update(extra or {})
+        return headers
+
+    def not_modified(self, etag: str) -> Response:
+        return Response(status_code=304, headers=self._headers(etag, None))
+
+    def get(self, key: str, etag: str) -> Optional[Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            _, body, extra = entry
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=self._headers(etag, extra))
+
+    def store(self, key: str, etag: str, payload, extra_headers: Optional[Dict[str, str]] = None) -> Response:
+        body = dumps(payload)
+        with self._lock:
+            self._entries[key] = (etag, body, dict(extra_headers or {}))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=self._headers(etag, extra_headers))
+
+
+    def invalidate(self, prefix: str) -> int:
+        """Drop every cached body whose key starts with ``prefix``."""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+
+response_cache = ConditionalResponseCache()
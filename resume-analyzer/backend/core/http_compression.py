@@ -0,0 +1,283 @@
+"""
+Response compression negotiated from ``Accept-Encoding``.
+
+gzip is always available; zstd and brotli are offered when the
+``zstandard`` / ``brotli`` packages are installed. Among the encodings a
+client accepts with its highest q-value, COMPRESSION_PREFERENCE decides.
+
+Only responses whose media type is on COMPRESSION_CONTENT_TYPES are
+compressed, and single-body responses only from COMPRESSION_MIN_SIZE
+bytes. Streaming responses are compressed chunk by chunk with a flush
+after each one, so nothing is held back. Server-Sent Events
+(``text/event-stream``) are never touched: each event has to reach the
+client as soon as it is sent.
+
+A compressed representation is not byte-identical to the uncompressed
+one, so its ETag is made weak; ``If-None-Match`` uses weak comparison
+(see ``core.http_cache.etag_matches``). Bodies behind a strong ETag are
+identical for the same tag, so their compressed form is kept in a small
+LRU and list endpoints served from the response cache are not
+recompressed on every request.
+"""
+import gzip
+import zlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional
+    zstandard = None
+
+settings = get_settings()
+
+EVENT_STREAM = "text/event-stream"
+_NO_BODY_STATUSES = {204, 304}
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class Codec:
+    def __init__(self, name: str, compress: Callable[[bytes], bytes], stream: Callable[[], object]):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+def available_codecs() -> Dict[str, Codec]:
+    gzip_level = settings.COMPRESSION_GZIP_LEVEL
+    codecs = {
+        "gzip": Codec(
+            "gzip",
+            lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0),
+            lambda: _GzipStream(gzip_level),
+        ),
+    }
+    if brotli is not None:
+        quality = settings.COMPRESSION_BROTLI_QUALITY
+        codecs["br"] = Codec(
+            "br",
+            lambda data: brotli.compress(data, quality=quality),
+            lambda: _BrotliStream(quality),
+        )
+    if zstandard is not None:
+        zstd_level = settings.COMPRESSION_ZSTD_LEVEL
+        codecs["zstd"] = Codec(
+            "zstd",
+            lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data),
+            lambda: _ZstdStream(zstd_level),
+        )
+    return codecs
+
+
+def _split_csv(value: str) -> List[str]:
+    return [part.strip().lower() for part in value.split(",") if part.strip()]
+
+
+def negotiate(accept_encoding: str, preference: List[str]) -> Optional[str]:
+    """The preferred encoding among those accepted with the highest q-value."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for name in preference:
+        quality = weights.get(name, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def _weaken(etag: bytes) -> bytes:
+    return etag if etag.startswith(b"W/") else b"W/" + etag
+
+
+class CompressedBodyCache:
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, etag: bytes, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is not None:
+                self._entries.move_to_end((etag, encoding))
+            return body
+
+    def put(self, etag: bytes, encoding: str, body: bytes):
+        with self._lock:
+            self._entries[(etag, encoding)] = body
+            self._entries.move_to_end((etag, encoding))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses in the negotiated encoding."""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = settings.COMPRESSION_ENABLED
+        self.codecs = available_codecs()
+        self.preference = [name for name in _split_csv(settings.COMPRESSION_PREFERENCE) if name in self.codecs]
+        self.content_types = set(_split_csv(settings.COMPRESSION_CONTENT_TYPES))
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.body_cache = CompressedBodyCache()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept = dict(scope.get("headers") or []).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate(accept, self.preference) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self, self.codecs[encoding])(scope, receive, send)
+
+    def eligible(self, status: int, headers: List[Tuple[bytes, bytes]]) -> bool:
+        if status in _NO_BODY_STATUSES:
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if b"content-encoding" in values or b"no-transform" in values.get(b"cache-control", b"").lower():
+            return False
+        media_type = values.get(b"content-type", b"").decode("latin-1").split(";")[0].strip().lower()
+        return media_type != EVENT_STREAM and media_type in self.content_types
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec):
+        self.middleware = middleware
+        self.codec = codec
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    def _headers(self, content_length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+        headers = []
+        vary = b""
+        for name, value in self.start.get("headers") or []:
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"vary":
+                vary = value
+                continue
+            if lowered == b"etag":
+                value = _weaken(value)
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.codec.name.encode("latin-1")))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    def _strong_etag(self) -> Optional[bytes]:
+        for name, value in self.start.get("headers") or []:
+            if name.lower() == b"etag" and not value.startswith(b"W/"):
+                return value
+        return None
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self.middleware.eligible(message["status"], list(message.get("headers") or []))
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            chunk = self.stream.compress(body) if body else b""
+            if not more_body:
+                chunk += self.stream.finish()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        if more_body:
+            # Streaming response: compress each chunk as it arrives.
+            self.stream = self.codec.stream()
+            await self.send({**self.start, "headers": self._headers(None)})
+            await self.send({"type": "http.response.body", "body": self.stream.compress(body), "more_body": True})
+            return
+
+        if len(body) < self.middleware.min_size:
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        etag = self._strong_etag()
+        compressed = self.middleware.body_cache.get(etag, self.codec.name) if etag else None
+        if compressed is None:
+            compressed = self.codec.compress(body)
+            if etag:
+                self.middleware.body_cache.put(etag, self.codec.name, compressed)
+        if len(compressed) >= len(body):
+            await self.send(self.start)
+            await self.send(message)
+            return
+        await self.send({**self.start, "headers": self._headers(len(compressed))})
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
@@ -0,0 +1,75 @@
+"""
+JSON serialization for large response payloads.
+
+FastAPI's default path walks every returned value with ``jsonable_encoder``
+(and, with a ``response_model``, validates it against the model again)
+before ``json.dumps`` runs. For list pages with full ``analysis_result``
+dicts and for optimization results that walk costs more than the
+encoding itself. ``dumps`` encodes in one pass instead: with orjson when
+it is installed, with the stdlib encoder otherwise, and in both cases it
+understands datetimes (``uploaded_at``) and pydantic models directly.
+
+Routes whose result is already typed return ``json_response(...)``,
+which FastAPI passes through untouched. FAST_JSON_RESPONSES=false goes
+back to FastAPI's stock encoding everywhere.
+"""
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, Optional, Type
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from core.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is the fallback
+    orjson = None
+
+settings = get_settings()
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _default(value: Any) -> Any:
+    """Encode what neither encoder handles natively, the way ``jsonable_encoder`` would."""
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Enum):
+        return value.value
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON for ``content``."""
+    if not settings.FAST_JSON_RESPONSES:
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def default_response_class() -> Type[JSONResponse]:
+    return FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Response for a payload that is already in its final shape. Returning a
+    Response skips FastAPI's encoding pass and ``response_model`` validation.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,199 @@
+"""
+Lightweight latency histograms with a Prometheus text exposition.
+
+``span(stage, provider)`` times a block of work (parser, NLP scorers, LLM
+calls, DB operations). ``MetricsMiddleware`` records request latency per
+route template. Spans inside a request are buffered on the request and
+labelled with its route once routing has resolved it. Spans outside a
+request (warm-up scripts, background jobs) use ``route="-"``. When
+METRICS_ENABLED is off, ``span`` returns a shared no-op and the
+middleware passes requests straight through.
+"""
+import asyncio
+import contextvars
+import functools
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from core.config import get_settings
+
+settings = get_settings()
+
+# Seconds; spans range from sub-millisecond scorers to multi-second LLM calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+NO_ROUTE = "-"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _RequestSpans:
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: List[Tuple[str, str, float]] = []
+
+
+_current_request: contextvars.ContextVar[Optional[_RequestSpans]] = contextvars.ContextVar(
+    "metrics_request", default=None
+)
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.requests = Histogram(
+            "skillsnap_request_duration_seconds",
+            "HTTP request latency by route template.",
+            ("route", "method", "status"),
+        )
+        self.stages = Histogram(
+            "skillsnap_stage_duration_seconds",
+            "Latency of individual processing stages.",
+            ("route", "stage", "provider"),
+        )
+
+    def record_stage(self, stage: str, provider: str, elapsed: float):
+        pending = _current_request.get()
+        if pending is not None:
+            pending.spans.append((stage, provider, elapsed))
+        else:
+            self.stages.observe((NO_ROUTE, stage, provider), elapsed)
+
+    def render(self) -> str:
+        return "\n".join(self.requests.render() + self.stages.render()) + "\n"
+
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+
+class _Span:
+    __slots__ = ("stage", "provider", "started")
+
+    def __init__(self, stage: str, provider: str):
+        self.stage = stage
+        self.provider = provider
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.record_stage(self.stage, self.provider, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage: str, provider: str = ""):
+    """Context manager timing one stage; free when metrics are disabled."""
+    if not metrics.enabled:
+        return _NOOP_SPAN
+    return _Span(stage, provider)
+
+
+def timed(stage: str, provider: str = ""):
+    """Decorator form of ``span`` for sync and async functions."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    return await func(*args, **kwargs)
+                with _Span(stage, provider):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with _Span(stage, provider):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and flushing per-request spans."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        pending = _RequestSpans()
+        token = _current_request.set(pending)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.requests.observe((route, scope.get("method", ""), str(status)), elapsed)
+            for stage, provider, stage_elapsed in pending.spans:
+                metrics.stages.observe((route, stage, provider), stage_elapsed)
@@ -0,0 +1,184 @@
+"""
+On-demand request profiling.
+
+``ProfilingMiddleware`` profiles a request when it carries
+``X-Profile: <PROFILING_ADMIN_TOKEN>`` or is picked at
+PROFILING_SAMPLE_RATE. Two profilers are available:
+
+* ``cprofile``: deterministic; writes a ``.pstats`` file. It runs on the
+  event-loop thread, so concurrent requests show up in the profile as
+  well. Only one cProfile session runs at a time; overlapping requests
+  go unprofiled.
+* ``sampling``: a background thread samples every thread's stack
+  (including threadpool workers running sync routes) every
+  PROFILING_INTERVAL_MS and writes folded ``.collapsed`` stacks, ready
+  for flamegraph tools.
+
+Profiles are stored in PROFILING_DIR (the newest PROFILING_MAX_FILES are
+kept) and can be downloaded from ``/api/admin/profiles``. With no admin
+token and a zero sample rate, the middleware is a pass-through.
+"""
+import asyncio
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from core.config import get_settings
+from core.log import get_logger, request_id_var
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_SUFFIXES = (".pstats", ".collapsed")
+
+
+def profiling_active() -> bool:
+    return bool(settings.PROFILING_ADMIN_TOKEN) or settings.PROFILING_SAMPLE_RATE > 0
+
+
+def is_admin(token: Optional[str]) -> bool:
+    expected = settings.PROFILING_ADMIN_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token, expected)
+
+
+class SamplingProfiler:
+    """Samples stacks of all threads from a daemon thread; output is folded stacks."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f"{stack} {count}\n")
+
+
+class ProfileStore:
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+    def new_path(self, request_id: str, suffix: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{request_id[:16]}{suffix}"
+        return os.path.join(self.directory, name)
+
+    def list(self) -> List[Dict[str, object]]:
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(PROFILE_SUFFIXES):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append({"name": name, "bytes": stat.st_size, "created_at": stat.st_mtime})
+        return sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+
+    def path_for(self, name: str) -> Optional[str]:
+        if os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIXES):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def prune(self):
+        for entry in self.list()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, entry["name"]))
+            except OSError:
+                pass
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+
+# cProfile allows a single active profiler per interpreter thread.
+_cprofile_lock = threading.Lock()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        for key, value in scope.get("headers") or []:
+            if key == b"x-profile":
+                return is_admin(value.decode("latin-1"))
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_active() or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        mode = settings.PROFILING_MODE.lower()
+        suffix = ".pstats" if mode == "cprofile" else ".collapsed"
+        path = profile_store.new_path(request_id_var.get(), suffix)
+        name = os.path.basename(path)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((PROFILE_ID_HEADER.encode("latin-1"), name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if mode == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                await self.app(scope, receive, send)
+                return
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_with_id)
+                finally:
+                    profiler.disable()
+            finally:
+                _cprofile_lock.release()
+            dump = profiler.dump_stats
+        else:
+            profiler = SamplingProfiler(settings.PROFILING_INTERVAL_MS / 1000)
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.stop()
+            dump = profiler.dump
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, dump, path)
+        await loop.run_in_executor(None, profile_store.prune)
+        logger.info("Stored request profile", extra={"profile": name, "path": scope.get("path"), "mode": mode})
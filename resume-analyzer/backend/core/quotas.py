@@ -0,0 +1,309 @@
+"""
+Per-caller quotas and fair scheduling for the AI-backed routes.
+
+Every request to a route in ``ROUTE_COSTS`` spends that many tokens from
+its caller's bucket (QUOTA_BURST tokens, refilled at
+QUOTA_REFILL_PER_MINUTE). The caller is the Firebase uid of a verified
+``Authorization: Bearer`` ID token (see ``core.auth``), the client
+address otherwise, read past TRUSTED_PROXY_HOPS proxies. An empty bucket
+answers 429 with ``Retry-After``. Every metered response carries
+``X-RateLimit-Limit``, ``X-RateLimit-Remaining`` and
+``X-RateLimit-Reset``. Buckets live in the
+shared store when SHARED_STATE_PATH is set, so the quota holds across
+workers; otherwise they are per process.
+
+Admitted requests then take one of AI_MAX_CONCURRENT slots per worker.
+When all are busy they wait in a weighted fair queue: each request gets
+a virtual finish tag ``max(now, caller's last tag) + cost / weight`` and
+the smallest tag runs next, so a caller with many requests queued
+cannot hold the slots while others wait. A request still queued after
+AI_QUEUE_TIMEOUT_SECONDS gets 503 and its tokens back.
+
+``/api/compare-versions`` calls the model only with
+``include_narrative``, which the path alone does not show; that route
+charges ``COMPARE_NARRATIVE_COST`` itself through ``metered``.
+Deterministic routes (upload, lists, versions, comparisons without a
+narrative, stats) are not metered.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+from core.auth import bearer_token, client_address, token_verifier
+from core.config import get_settings
+from core.log import get_logger
+from core.shared_state import shared_store
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Tokens per request, roughly by prompt and completion size.
+ROUTE_COSTS: Dict[str, int] = {
+    "/api/analyze-resume": 1,
+    "/api/ats-heatmap": 1,
+    "/api/job-match": 1,
+    "/api/simulate-improvement": 1,
+    "/api/career-path": 1,
+    "/api/resume-quality-check": 1,
+    "/api/explain-score": 2,
+    "/api/interview-questions": 2,
+    "/api/resume-insights": 3,
+    "/api/optimize-resume": 3,
+}
+
+# Charged inside /api/compare-versions, only when a narrative is requested.
+COMPARE_NARRATIVE_COST = 1
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() and weight.strip():
+            weights[name.strip()] = max(float(weight), 0.01)
+    return weights
+
+
+class LocalBuckets:
+    """Process-local token buckets, used when no shared store is configured."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = Lock()
+
+    def take_tokens(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        with self._lock:
+            now = time.time()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+            taken = tokens >= cost
+            if taken:
+                tokens = min(capacity, tokens - cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > 10_000:
+                self._prune(now, capacity, refill_per_second)
+        return taken, tokens
+
+    def _prune(self, now: float, capacity: float, refill_per_second: float):
+        full_after = capacity / refill_per_second if refill_per_second > 0 else math.inf
+        for key, (_, updated_at) in list(self._buckets.items()):
+            if now - updated_at > full_after:
+                del self._buckets[key]
+
+
+class QuotaDecision:
+    def __init__(self, allowed: bool, remaining: float, limit: float, refill_per_second: float, cost: float):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.limit = limit
+        self.refill_per_second = refill_per_second
+        self.cost = cost
+
+    def _seconds_until(self, tokens: float) -> int:
+        missing = max(0.0, tokens - self.remaining)
+        if not missing:
+            return 0
+        return math.ceil(missing / self.refill_per_second) if self.refill_per_second > 0 else 86400
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, self._seconds_until(self.cost))
+
+    def headers(self) -> List[Tuple[bytes, bytes]]:
+        values = {
+            "x-ratelimit-limit": str(int(self.limit)),
+            "x-ratelimit-remaining": str(int(self.remaining)),
+            "x-ratelimit-reset": str(self._seconds_until(self.limit)),
+        }
+        if not self.allowed:
+            values["retry-after"] = str(self.retry_after)
+        return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in values.items()]
+
+
+class QuotaLimiter:
+    def __init__(self, capacity: float, refill_per_minute: float, store=None):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60.0
+        self.store = store if store is not None else LocalBuckets()
+
+    def take(self, caller: str, cost: float) -> QuotaDecision:
+        allowed, remaining = self.store.take_tokens(f"ai:{caller}", cost, self.capacity, self.refill_per_second)
+        return QuotaDecision(allowed, remaining, self.capacity, self.refill_per_second, cost)
+
+    def refund(self, caller: str, cost: float):
+        self.store.take_tokens(f"ai:{caller}", -cost, self.capacity, self.refill_per_second)
+
+
+class FairScheduler:
+    """Weighted fair queuing over a fixed number of slots, within one event loop."""
+
+    def __init__(self, slots: int, weights: Optional[Dict[str, float]] = None):
+        self.slots = max(1, slots)
+        self.weights = weights or {}
+        self.active = 0
+        self.virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._queue: list = []
+        self._sequence = itertools.count()
+        self.stats = {"admitted": 0, "queued": 0, "queue_timeouts": 0, "max_queue_depth": 0, "max_wait_seconds": 0.0}
+
+    def _tag(self, caller: str, cost: float) -> float:
+        tag = max(self.virtual_time, self._finish_tags.get(caller, 0.0)) + cost / self.weights.get(caller, 1.0)
+        self._finish_tags[caller] = tag
+        return tag
+
+    async def acquire(self, caller: str, cost: float, timeout: float):
+        tag = self._tag(caller, cost)
+        self.stats["admitted"] += 1
+        if self.active < self.slots and not self._queue:
+            self.active += 1
+            self.virtual_time = tag
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (tag, next(self._sequence), waiter))
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._queue))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the wait ended; hand it on.
+                self.release()
+            if isinstance(exc, asyncio.TimeoutError):
+                self.stats["queue_timeouts"] += 1
+            raise
+        finally:
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], time.perf_counter() - started)
+
+    def release(self):
+        self.active -= 1
+        while self._queue and self.active < self.slots:
+            tag, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():
+                continue
+            self.active += 1
+            self.virtual_time = tag
+            waiter.set_result(None)
+        if not self._queue and len(self._finish_tags) > 1024:
+            # Tags at or behind the virtual clock no longer affect ordering.
+            self._finish_tags = {caller: tag for caller, tag in self._finish_tags.items() if tag > self.virtual_time}
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            **self.stats,
+            "max_wait_seconds": round(self.stats["max_wait_seconds"], 4),
+            "slots": self.slots,
+            "active": self.active,
+            "queue_depth": sum(1 for _, _, waiter in self._queue if not waiter.done()),
+        }
+
+
+async def _caller(scope) -> str:
+    token = bearer_token(scope)
+    if token:
+        uid = await token_verifier.uid(token)
+        if uid:
+            return "user:" + uid
+    return "addr:" + client_address(scope)
+
+
+class QuotaRejected(Exception):
+    def __init__(self, status_code: int, detail: str, headers: Dict[str, str]):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+
+
+async def admit(caller: str, cost: float) -> QuotaDecision:
+    """Spend ``cost`` tokens and wait for a fair-queue slot; ``release_slot()`` when done."""
+    decision = quota_limiter.take(caller, cost)
+    if not decision.allowed:
+        logger.info("AI quota exhausted", extra={"caller": caller, "cost": cost})
+        raise QuotaRejected(
+            429,
+            "AI request quota exceeded. Please retry later.",
+            {name.decode("latin-1"): value.decode("latin-1") for name, value in decision.headers()},
+        )
+    try:
+        await fair_scheduler.acquire(caller, cost, settings.AI_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        quota_limiter.refund(caller, cost)
+        raise QuotaRejected(
+            503,
+            "AI service is busy. Please retry shortly.",
+            {"Retry-After": str(max(1, math.ceil(settings.AI_QUEUE_TIMEOUT_SECONDS / 2)))},
+        )
+    return decision
+
+
+def release_slot():
+    fair_scheduler.release()
+
+
+@asynccontextmanager
+async def metered(request: Request, response: Response, cost: float):
+    """
+    Quota and fair-queue slot for AI work a route only does for some
+    requests, so the middleware cannot meter it by path.
+    """
+    if not settings.QUOTA_ENABLED:
+        yield
+        return
+    try:
+        decision = await admit(await _caller(request.scope), cost)
+    except QuotaRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    for name, value in decision.headers():
+        response.headers[name.decode("latin-1")] = value.decode("latin-1")
+    try:
+        yield
+    finally:
+        release_slot()
+
+
+class QuotaMiddleware:
+    """ASGI middleware metering the routes in ``ROUTE_COSTS`` per caller."""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = settings.QUOTA_ENABLED
+
+    async def __call__(self, scope, receive, send):
+        cost = ROUTE_COSTS.get(scope.get("path")) if scope["type"] == "http" and scope.get("method") == "POST" else None
+        if cost is None or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            decision = await admit(await _caller(scope), cost)
+        except QuotaRejected as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+
+        quota_headers = decision.headers()
+
+        async def send_with_quota(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers") or []) + quota_headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_quota)
+        finally:
+            release_slot()
+
+
+quota_limiter = QuotaLimiter(settings.QUOTA_BURST, settings.QUOTA_REFILL_PER_MINUTE, shared_store)
+fair_scheduler = FairScheduler(settings.AI_MAX_CONCURRENT, _parse_weights(settings.QUOTA_USER_WEIGHTS))
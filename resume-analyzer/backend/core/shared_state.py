@@ -0,0 +1,241 @@
+"""
+Cross-process state for multi-worker deployments.
+
+With SHARED_STATE_PATH set, every worker on a host shares one SQLite file
+(WAL mode) holding:
+
+* ``kv``: cached values with an expiry (the AI response cache),
+* ``counters``: the change counters behind list ETags, plus an epoch
+  that is renewed when the server (re)starts,
+* ``invalidations``: an append-only log of document-cache invalidations
+  that each worker replays before serving from its local cache,
+* ``buckets``: per-caller token buckets for the AI route quotas.
+
+Connections are opened lazily and per process, so a store created before
+a fork (gunicorn ``preload_app``) is safe to use in the workers. Without
+SHARED_STATE_PATH the caches stay process-local.
+"""
+import os
+import sqlite3
+import time
+import uuid
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from core.config import get_settings
+
+settings = get_settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv (expires_at);
+CREATE TABLE IF NOT EXISTS counters (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS invalidations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    doc_id TEXT
+);
+CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL);
+"""
+
+# Housekeeping runs on every Nth write instead of on a timer.
+_MAINTENANCE_EVERY = 256
+
+
+class SharedStore:
+    def __init__(self, path: str, max_entries: int = 10_000, invalidation_retention: int = 10_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.invalidation_retention = invalidation_retention
+        self._lock = Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent's connection and lock must not be used from the child.
+        self._lock = Lock()
+        self._connection = None
+        self._pid = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _wrote(self, connection: sqlite3.Connection):
+        self._writes += 1
+        if self._writes % _MAINTENANCE_EVERY:
+            return
+        connection.execute("DELETE FROM kv WHERE expires_at < ?", (time.time(),))
+        connection.execute(
+            "DELETE FROM kv WHERE rowid IN (SELECT rowid FROM kv ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        connection.execute(
+            "DELETE FROM invalidations WHERE seq <= (SELECT MAX(seq) FROM invalidations) - ?",
+            (self.invalidation_retention,),
+        )
+        # A bucket untouched for a day has long refilled; dropping it changes nothing.
+        connection.execute("DELETE FROM buckets WHERE updated_at < ?", (time.time() - 86400,))
+
+    # -- key/value ------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, namespace: str, key: str, value: str, ttl_seconds: float):
+        with self._lock:
+            connection = self._conn()
+            connection.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, time.time() + ttl_seconds),
+            )
+            self._wrote(connection)
+
+    def delete_prefix(self, namespace: str, prefix: str):
+        """Drop every key in ``namespace`` that starts with ``prefix`` (a primary-key range scan)."""
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self._lock:
+            self._conn().execute(
+                "DELETE FROM kv WHERE namespace = ? AND key >= ? AND key < ?", (namespace, prefix, upper)
+            )
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._conn().execute("DELETE FROM kv WHERE namespace = ?", (namespace,))
+
+    # -- counters -------------------------------------------------------
+
+    def incr(self, scope: str, key: str):
+        with self._lock:
+            self._conn().execute(
+                "INSERT INTO counters (scope, key, value) VALUES (?, ?, 1) "
+                "ON CONFLICT (scope, key) DO UPDATE SET value = value + 1",
+                (scope, key),
+            )
+
+    def counter(self, scope: str, key: str) -> int:
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT value FROM counters WHERE scope = ? AND key = ?", (scope, key)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def epoch(self) -> str:
+        with self._lock:
+            connection = self._conn()
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex[:8],)
+            )
+            return connection.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+
+    # -- invalidation log -----------------------------------------------
+
+    def append_invalidation(self, origin: str, collection: str, doc_id: Optional[str]):
+        with self._lock:
+            connection = self._conn()
+            connection.execute(
+                "INSERT INTO invalidations (origin, collection, doc_id) VALUES (?, ?, ?)",
+                (origin, collection, doc_id),
+            )
+            self._wrote(connection)
+
+    def last_invalidation(self) -> int:
+        with self._lock:
+            return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def invalidations_since(self, seq: int) -> List[Tuple[int, str, str, Optional[str]]]:
+        with self._lock:
+            return self._conn().execute(
+                "SELECT seq, origin, collection, doc_id FROM invalidations WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+    # -- token buckets --------------------------------------------------
+
+    def take_tokens(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        """
+        Refill ``key``'s bucket for the time elapsed and take ``cost`` tokens
+        if that many are available (a negative cost returns tokens).
+        Returns (taken, tokens left). The read-modify-write runs in one
+        immediate transaction, so concurrent workers cannot both spend the
+        same tokens.
+        """
+        with self._lock:
+            connection = self._conn()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = connection.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * refill_per_second)
+                taken = tokens >= cost
+                if taken:
+                    tokens = min(capacity, tokens - cost)
+                connection.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            self._wrote(connection)
+        return taken, tokens
+
+    # -- lifecycle ------------------------------------------------------
+
+    def reset(self):
+        """
+        Start a new epoch (invalidating every ETag issued before) and drop
+        counters and the invalidation log; run once when the server
+        starts. Cached values are content-addressed and survive, and quota
+        buckets are kept so a restart does not refill them.
+        """
+        with self._lock:
+            connection = self._conn()
+            for table in ("counters", "meta", "invalidations"):
+                connection.execute(f"DELETE FROM {table}")
+            self._close()
+
+    def _close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+shared_store: Optional[SharedStore] = (
+    SharedStore(settings.SHARED_STATE_PATH, max_entries=settings.SHARED_STATE_MAX_ENTRIES)
+    if settings.SHARED_STATE_PATH
+    else None
+)
@@ -0,0 +1,166 @@
+"""
+Per-user and per-resume change counters maintained by the DB layer.
+
+``ChangeTrackingDatabase`` wraps any backend (Firestore, SQLite, mock) and
+bumps counters on every insert, update or delete in the ``resumes``
+collection: the owning user, the resume itself and its parent resume
+(whose version list changed). Routes turn the counters into strong ETags
+and cache keys without reading storage. Counters carry a random epoch,
+so a restart invalidates every ETag issued before. They are
+process-local unless a ``SharedStore`` is configured (multi-worker
+mode), in which case every worker bumps and reads the same counters.
+"""
+import uuid
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.shared_state import SharedStore, shared_store
+
+TRACKED_COLLECTIONS = ("resumes",)
+
+
+class ChangeCounters:
+    def __init__(self, shared: Optional[SharedStore] = None):
+        self.shared = shared
+        self._epoch: Optional[str] = None if shared is not None else uuid.uuid4().hex[:8]
+        self._lock = Lock()
+        self._counters: Dict[Tuple[str, str], int] = {}
+        # resume id -> (user_id, parent_resume_id), learned from writes and reads.
+        # Owners never change, so this map stays per process even when shared.
+        self._owners: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+    @property
+    def epoch(self) -> str:
+        if self._epoch is None:
+            # Read lazily: the server resets the shared epoch after importing the app.
+            self._epoch = self.shared.epoch()
+        return self._epoch
+
+    def bump(self, scope: str, key: Optional[str]):
+        if not key:
+            return
+        if self.shared is not None:
+            self.shared.incr(scope, str(key))
+            return
+        with self._lock:
+            self._counters[(scope, str(key))] = self._counters.get((scope, str(key)), 0) + 1
+
+    def version(self, scope: str, key: str) -> str:
+        if self.shared is not None:
+            return f"{self.epoch}.{self.shared.counter(scope, str(key))}"
+        with self._lock:
+            return f"{self.epoch}.{self._counters.get((scope, str(key)), 0)}"
+
+    def remember(self, document: Optional[Dict[str, Any]]):
+        if document and document.get("id") is not None and "user_id" in document:
+            with self._lock:
+                self._owners[str(document["id"])] = (
+                    document.get("user_id"),
+                    document.get("parent_resume_id"),
+                )
+
+    def owner(self, resume_id: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        with self._lock:
+            return self._owners.get(str(resume_id))
+
+    def forget(self, resume_id: str):
+        with self._lock:
+            self._owners.pop(str(resume_id), None)
+
+    def resume_changed(self, resume_id: str, user_id: Optional[str], parent_id: Optional[str] = None):
+        self.bump("user", user_id)
+        self.bump("resume", resume_id)
+        self.bump("resume", parent_id)
+
+
+change_counters = ChangeCounters(shared_store)
+
+
+def _query_id(query: Dict[str, Any]) -> Optional[str]:
+    value = (query or {}).get("id")
+    return None if value is None or len(query) != 1 else str(value)
+
+
+class ChangeTrackingCollection:
+    def __init__(self, inner, counters: ChangeCounters):
+        self.inner = inner
+        self.counters = counters
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def _owner(self, query: Dict[str, Any]):
+        doc_id = _query_id(query)
+        if doc_id is not None:
+            known = self.counters.owner(doc_id)
+            if known is not None:
+                return doc_id, known
+        target = await self.inner.find_one(query)
+        if not target:
+            return None, None
+        self.counters.remember(target)
+        return str(target.get("id")), (target.get("user_id"), target.get("parent_resume_id"))
+
+    async def insert_one(self, document: Dict[str, Any]):
+        result = await self.inner.insert_one(document)
+        self.counters.remember(document)
+        self.counters.resume_changed(
+            str(document.get("id")),
+            document.get("user_id"),
+            document.get("parent_resume_id"),
+        )
+        return result
+
+    async def find_one(self, query: Dict[str, Any]):
+        document = await self.inner.find_one(query)
+        self.counters.remember(document)
+        return document
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        doc_id, owner = await self._owner(query)
+        result = await self.inner.update_one(query, update, upsert=upsert)
+        if doc_id is not None:
+            user_id, parent_id = owner
+            self.counters.resume_changed(doc_id, user_id, parent_id)
+        return result
+
+    def find(self, query: Dict[str, Any], projection=None):
+        return self.inner.find(query, projection=projection)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        doc_id, owner = await self._owner(query)
+        result = await self.inner.delete_one(query)
+        if doc_id is not None and result.deleted_count:
+            user_id, parent_id = owner
+            self.counters.resume_changed(doc_id, user_id, parent_id)
+            self.counters.forget(doc_id)
+        return result
+
+
+    async def delete_many(self, query: Dict[str, Any]):
+        targets = await self.inner.find(query, projection=["user_id", "parent_resume_id"]).to_list(length=None)
+        result = await self.inner.delete_many(query)
+        if result.deleted_count:
+            for target in targets:
+                doc_id = str(target.get("id"))
+                self.counters.resume_changed(doc_id, target.get("user_id"), target.get("parent_resume_id"))
+                self.counters.forget(doc_id)
+        return result
+
+
+class ChangeTrackingDatabase:
+    def __init__(self, inner, counters: ChangeCounters = change_counters, tracked: Iterable[str] = TRACKED_COLLECTIONS):
+        self.inner = inner
+        self.counters = counters
+        self.tracked = set(tracked)
+        self._collections: Dict[str, ChangeTrackingCollection] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def __getitem__(self, name: str):
+        if name not in self.tracked:
+            return self.inner[name]
+        if name not in self._collections:
+            self._collections[name] = ChangeTrackingCollection(self.inner[name], self.counters)
+        return self._collections[name]
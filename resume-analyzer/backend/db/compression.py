@@ -0,0 +1,340 @@
+"""
+Transparent compression of large resume fields.
+
+``CompressingDatabase`` wraps a backend and stores the bulky fields
+(resume text and AI payloads) as compact envelopes::
+
+    {"$z": "zlib", "v": 1, "t": "str" | "json", "n": <raw bytes>, "d": <base64>}
+
+Values are compressed with a preset dictionary of resume vocabulary, so
+even short documents shrink well. Documents read back are
+``LazyDocument`` instances: an envelope is only decompressed when a route
+actually reads that field.
+
+Optimized versions do not copy their parent's text. They store
+``{"$ref": <resume id>}`` plus a top-level ``content_source_id``. The
+reference is resolved on read (a cached point read), and is materialized
+into the referencing documents before the source resume is deleted.
+"""
+import base64
+import json
+import zlib
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.log import get_logger
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+logger = get_logger(__name__)
+
+COMPRESSED_FIELDS = (
+    "content_text",
+    "optimized_content",
+    "analysis_result",
+    "ats_heatmap",
+    "quality_check",
+    "score_explanation",
+    "interview_prep",
+)
+REFERENCE_FIELDS = ("content_text",)
+CONTENT_SOURCE_FIELD = "content_source_id"
+
+# Bump when the dictionary below changes; old envelopes keep decoding with their version.
+DICTIONARY_VERSION = 1
+
+# Preset dictionary: frequent resume/AI-payload substrings, most common last
+# (zlib favours the end of the dictionary). Frozen per DICTIONARY_VERSION.
+_RESUME_DICTIONARY = " ".join([
+    "kubernetes docker terraform ansible jenkins github actions gitlab ci aws azure gcp",
+    "tensorflow pytorch scikit-learn pandas numpy spark airflow tableau power bi",
+    "postgresql mysql mongodb redis elasticsearch sqlite dynamodb firebase",
+    "react angular vue.js next.js node.js express.js django flask fastapi spring boot",
+    "python java javascript typescript c++ c# go rust kotlin swift sql html css",
+    "agile scrum ci/cd unit testing rest api graphql microservices linux git",
+    "communication leadership teamwork problem solving collaboration mentoring",
+    "Certifications Awards Publications Languages Interests References Volunteer",
+    "Bachelor of Science Master of Science Computer Science Engineering University GPA",
+    "Summary Profile Objective Professional Experience Work Experience Projects",
+    "Technical Skills Education Achievements Responsibilities",
+    "Developed Designed Implemented Built Led Managed Improved Reduced Increased",
+    "Collaborated with cross-functional teams to deliver scalable",
+    "resulting in a improving performance by reducing latency by",
+    "Software Engineer Senior Software Engineer Data Scientist Full Stack Developer",
+    '"suggestions": ["issues": ["strengths": ["weaknesses": ["recommendations": [',
+    '"matched_skills": ["missing_skills": ["resume_skills": ["ai_suggestions": [',
+    '"section": "score": "reason": "description": "impact": "priority": "high", "medium", "low"',
+    '"question": "category": "difficulty": "original": "improved": "explanation": ',
+    "January February March April May June July August September October November December",
+    "2018 2019 2020 2021 2022 2023 2024 2025 Present",
+    "experience with the and of to in for on a",
+]).encode("utf-8")
+
+_DICTIONARIES = {1: _RESUME_DICTIONARY}
+
+
+def _zlib_compress(data: bytes, version: int, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=_DICTIONARIES[version])
+    return compressor.compress(data) + compressor.flush()
+
+
+def _zlib_decompress(data: bytes, version: int) -> bytes:
+    decompressor = zlib.decompressobj(-15, zdict=_DICTIONARIES[version])
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def _zstd_dictionary(version: int):
+    return zstandard.ZstdCompressionDict(
+        _DICTIONARIES[version], dict_type=zstandard.DICT_TYPE_RAWCONTENT
+    )
+
+
+def _zstd_compress(data: bytes, version: int, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level, dict_data=_zstd_dictionary(version)).compress(data)
+
+
+def _zstd_decompress(data: bytes, version: int) -> bytes:
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to read zstd-compressed documents")
+    return zstandard.ZstdDecompressor(dict_data=_zstd_dictionary(version)).decompress(data)
+
+
+def is_envelope(value: Any) -> bool:
+    return isinstance(value, dict) and "$z" in value and "d" in value
+
+
+def is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and "$ref" in value
+
+
+class StorageCodec:
+    def __init__(self, codec: str = "zlib", level: int = 6, min_bytes: int = 512):
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed; compressing stored fields with zlib")
+            codec = "zlib"
+        self.codec = codec
+        self.level = level
+        self.min_bytes = min_bytes
+        self._lock = Lock()
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.fields_compressed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.codec in ("zlib", "zstd")
+
+    def encode(self, value: Any) -> Any:
+        if not self.enabled or value is None or is_envelope(value) or is_reference(value):
+            return value
+        if isinstance(value, str):
+            kind, raw = "str", value.encode("utf-8")
+        else:
+            try:
+                kind, raw = "json", json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            except (TypeError, ValueError):
+                return value
+        if len(raw) < self.min_bytes:
+            return value
+
+        if self.codec == "zstd":
+            packed = _zstd_compress(raw, DICTIONARY_VERSION, self.level)
+        else:
+            packed = _zlib_compress(raw, DICTIONARY_VERSION, self.level)
+        envelope = {
+            "$z": self.codec,
+            "v": DICTIONARY_VERSION,
+            "t": kind,
+            "n": len(raw),
+            "d": base64.b64encode(packed).decode("ascii"),
+        }
+        stored = len(envelope["d"])
+        if stored >= len(raw):
+            return value
+
+        with self._lock:
+            self.raw_bytes += len(raw)
+            self.stored_bytes += stored
+            self.fields_compressed += 1
+        return envelope
+
+    def encode_fields(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: self.encode(value) if key in COMPRESSED_FIELDS else value
+            for key, value in values.items()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "codec": self.codec if self.enabled else "none",
+            "fields_compressed": self.fields_compressed,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "bytes_saved": self.raw_bytes - self.stored_bytes,
+        }
+
+
+def decode_value(value: Any) -> Any:
+    if not is_envelope(value):
+        return value
+    packed = base64.b64decode(value["d"])
+    if value["$z"] == "zstd":
+        raw = _zstd_decompress(packed, value.get("v", 1))
+    else:
+        raw = _zlib_decompress(packed, value.get("v", 1))
+    text = raw.decode("utf-8")
+    return text if value.get("t") == "str" else json.loads(text)
+
+
+class LazyDocument(dict):
+    """Dict whose compressed fields are decoded on first access."""
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if is_envelope(value):
+            value = decode_value(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        # Overriding __iter__ keeps dict(doc) / {**doc} on the decoding path.
+        return iter(list(dict.keys(self)))
+
+    def items(self):
+        return [(key, self[key]) for key in dict.keys(self)]
+
+    def values(self):
+        return [self[key] for key in dict.keys(self)]
+
+    def copy(self):
+        return dict(self.items())
+
+    def raw(self, key, default=None):
+        """The stored value, without decoding."""
+        return dict.get(self, key, default)
+
+    def storage_report(self) -> Dict[str, Any]:
+        fields = {}
+        for key in COMPRESSED_FIELDS:
+            value = dict.get(self, key)
+            if key in getattr(self, "_references", {}):
+                fields[key] = {
+                    "raw_bytes": self._references[key],
+                    "stored_bytes": 0,
+                    "shared_with": dict.get(self, CONTENT_SOURCE_FIELD),
+                }
+            elif is_envelope(value):
+                fields[key] = {"raw_bytes": value["n"], "stored_bytes": len(value["d"])}
+        raw = sum(item["raw_bytes"] for item in fields.values())
+        stored = sum(item["stored_bytes"] for item in fields.values())
+        return {"fields": fields, "raw_bytes": raw, "stored_bytes": stored, "bytes_saved": raw - stored}
+
+
+def content_reference(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields that make a new version share ``document``'s text instead of copying it."""
+    source_id = document.get(CONTENT_SOURCE_FIELD) or document["id"]
+    return {"content_text": {"$ref": source_id}, CONTENT_SOURCE_FIELD: source_id}
+
+
+class CompressingCursor:
+    def __init__(self, inner, collection: "CompressingCollection"):
+        self.inner = inner
+        self.collection = collection
+
+    def sort(self, key: str, direction: int):
+        self.inner = self.inner.sort(key, direction)
+        return self
+
+    def start_after(self, value: Any, doc_id: str):
+        self.inner = self.inner.start_after(value, doc_id)
+        return self
+
+    async def to_list(self, length: int):
+        documents = await self.inner.to_list(length=length)
+        return [await self.collection.wrap(document) for document in documents]
+
+
+class CompressingCollection:
+    def __init__(self, inner, codec: StorageCodec):
+        self.inner = inner
+        self.codec = codec
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def wrap(self, document: Optional[Dict[str, Any]]):
+        if document is None:
+            return None
+        lazy = LazyDocument(document)
+        references = {}
+        for key in REFERENCE_FIELDS:
+            value = dict.get(lazy, key)
+            if not is_reference(value):
+                continue
+            source = await self.inner.find_one({"id": value["$ref"]})
+            stored = (source or {}).get(key)
+            dict.__setitem__(lazy, key, stored if stored is not None else "")
+            references[key] = stored["n"] if is_envelope(stored) else len(str(stored or "").encode("utf-8"))
+        if references:
+            lazy._references = references
+        return lazy
+
+    async def insert_one(self, document: Dict[str, Any]):
+        return await self.inner.insert_one(self.codec.encode_fields(document))
+
+    async def find_one(self, query: Dict[str, Any]):
+        return await self.wrap(await self.inner.find_one(query))
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        if "$set" in update:
+            update = {**update, "$set": self.codec.encode_fields(update["$set"])}
+        return await self.inner.update_one(query, update, upsert=upsert)
+
+    def find(self, query: Dict[str, Any], projection=None):
+        return CompressingCursor(self.inner.find(query, projection=projection), self)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        target = await self.inner.find_one(query)
+        if target and target.get("id") is not None:
+            await self._materialize_references(target)
+        return await self.inner.delete_one(query)
+
+    async def delete_many(self, query: Dict[str, Any]):
+        # Bulk deletes remove whole version trees; text sources are always
+        # ancestors, so nothing outside the deleted set references them.
+        return await self.inner.delete_many(query)
+
+    async def _materialize_references(self, source: Dict[str, Any]):
+        """Copy shared text into versions that reference ``source`` before it goes away."""
+        dependents = await self.inner.find({CONTENT_SOURCE_FIELD: source["id"]}).to_list(length=None)
+        updates = {key: source.get(key) for key in REFERENCE_FIELDS}
+        updates[CONTENT_SOURCE_FIELD] = None
+        for dependent in dependents:
+            await self.inner.update_one({"id": dependent["id"]}, {"$set": updates})
+
+
+class CompressingDatabase:
+    def __init__(self, inner, codec: StorageCodec, compressed: Iterable[str] = ("resumes",)):
+        self.inner = inner
+        self.codec = codec
+        self.compressed = set(compressed)
+        self._collections: Dict[str, CompressingCollection] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def __getitem__(self, name: str):
+        if name not in self.compressed:
+            return self.inner[name]
+        if name not in self._collections:
+            self._collections[name] = CompressingCollection(self.inner[name], self.codec)
+        return self._collections[name]
+
+    def storage_stats(self) -> Dict[str, Any]:
+        return self.codec.stats()
@@ -0,0 +1,268 @@
+"""
+Read-through cache for documents looked up by id.
+
+``CachingDatabase`` wraps a backend and serves ``find_one({"id": ...})``
+from a bounded LRU with a per-entry TTL. Writes go to the backend first
+and then drop the cached copy (inserts seed it). A write by any other
+query first looks up the ids it can touch, so the invalidation names
+every affected document, not just the ones this worker had cached; a
+``delete_many`` matching more than the cache holds flushes the whole
+collection instead. Every invalidation is also published on an
+``InvalidationBus`` so other workers sharing the same backend can drop
+their copies. The in-process bus serves a single
+worker; with a ``SharedStore`` (multi-worker mode) invalidations are also
+appended to the shared log, and each worker replays entries from other
+workers before answering from its cache.
+"""
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.shared_state import SharedStore, shared_store
+from db.firebase import query_ids
+
+CACHED_COLLECTIONS = ("resumes",)
+
+Listener = Callable[[str, str, Optional[str]], None]
+
+
+class InvalidationBus:
+    """Minimal publish/subscribe channel for cache invalidations."""
+
+    def __init__(self):
+        self._listeners: List[Listener] = []
+        self._lock = Lock()
+
+    def subscribe(self, listener: Listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def publish(self, origin: str, collection: str, doc_id: Optional[str]):
+        self._deliver(origin, collection, doc_id)
+
+    def _deliver(self, origin: str, collection: str, doc_id: Optional[str]):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(origin, collection, doc_id)
+
+    def poll(self):
+        """Pick up invalidations published by other processes; a no-op in-process."""
+
+
+class SharedInvalidationBus(InvalidationBus):
+    """Invalidation bus whose messages also reach other processes through a ``SharedStore``."""
+
+    def __init__(self, store: SharedStore):
+        super().__init__()
+        self.store = store
+        self._last_seq: Optional[int] = None
+
+    def subscribe(self, listener: Listener):
+        if self._last_seq is None:
+            # Entries from before the first cache existed cannot refer to it.
+            self._last_seq = self.store.last_invalidation()
+        super().subscribe(listener)
+
+    def publish(self, origin: str, collection: str, doc_id: Optional[str]):
+        super().publish(origin, collection, doc_id)
+        self.store.append_invalidation(origin, collection, doc_id)
+
+    def poll(self):
+        if self._last_seq is None:
+            return
+        for seq, origin, collection, doc_id in self.store.invalidations_since(self._last_seq):
+            self._last_seq = seq
+            self._deliver(origin, collection, doc_id)
+
+
+invalidation_bus = SharedInvalidationBus(shared_store) if shared_store is not None else InvalidationBus()
+
+
+class DocumentCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        key = (collection, doc_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            document = entry[1]
+        # Callers are free to mutate what they get back.
+        return copy.deepcopy(document)
+
+    def set(self, collection: str, doc_id: str, document: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        snapshot = copy.deepcopy(document)
+        with self._lock:
+            self._entries[(collection, doc_id)] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end((collection, doc_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection: str, doc_id: Optional[str] = None):
+        """Drop one document, or the whole collection when ``doc_id`` is None."""
+        with self._lock:
+            if doc_id is not None:
+                removed = self._entries.pop((collection, doc_id), None) is not None
+            else:
+                keys = [key for key in self._entries if key[0] == collection]
+                for key in keys:
+                    del self._entries[key]
+                removed = bool(keys)
+            if removed:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+def _query_id(query: Dict[str, Any]) -> Optional[str]:
+    value = (query or {}).get("id")
+    return None if value is None or len(query) != 1 else str(value)
+
+
+class CachingCollection:
+    def __init__(self, inner, name: str, database: "CachingDatabase"):
+        self.inner = inner
+        self.name = name
+        self.database = database
+        self.cache = database.cache
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def insert_one(self, document: Dict[str, Any]):
+        result = await self.inner.insert_one(document)
+        if document.get("id") is not None:
+            self.database.invalidate(self.name, str(document["id"]))
+            self.cache.set(self.name, str(document["id"]), document)
+        return result
+
+    async def find_one(self, query: Dict[str, Any]):
+        doc_id = _query_id(query)
+        if doc_id is None:
+            return await self.inner.find_one(query)
+
+        self.database.sync()
+        cached = self.cache.get(self.name, doc_id)
+        if cached is not None:
+            return cached
+
+        document = await self.inner.find_one(query)
+        if document is not None:
+            self.cache.set(self.name, doc_id, document)
+        return document
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        targets = await self._targets(query, 1)
+        result = await self.inner.update_one(query, update, upsert=upsert)
+        self._invalidate(targets)
+        return result
+
+    def find(self, query: Dict[str, Any], projection=None):
+        return self.inner.find(query, projection=projection)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        targets = await self._targets(query, 1)
+        result = await self.inner.delete_one(query)
+        self._invalidate(targets)
+        return result
+
+    async def delete_many(self, query: Dict[str, Any]):
+        targets = await self._targets(query, None)
+        result = await self.inner.delete_many(query)
+        self._invalidate(targets)
+        return result
+
+    async def _targets(self, query: Dict[str, Any], limit: Optional[int]) -> Optional[List[str]]:
+        """
+        Ids a write with ``query`` can touch, looked up before the write so
+        other workers can be told even when this one never cached them.
+        None means too many to name: flush the collection instead.
+        """
+        ids = query_ids(query)
+        if ids is not None:
+            return ids
+        length = limit if limit is not None else self.cache.max_entries + 1
+        matches = await self.inner.find(query, projection=["id"]).to_list(length=length)
+        ids = [str(document["id"]) for document in matches if document.get("id") is not None]
+        return None if limit is None and len(ids) > self.cache.max_entries else ids
+
+    def _invalidate(self, ids: Optional[List[str]]):
+        if ids is None:
+            self.database.invalidate(self.name, None)
+            return
+        for doc_id in ids:
+            self.database.invalidate(self.name, doc_id)
+
+
+class CachingDatabase:
+    def __init__(
+        self,
+        inner,
+        cache: DocumentCache,
+        bus: Optional[InvalidationBus] = invalidation_bus,
+        cached: Iterable[str] = CACHED_COLLECTIONS,
+    ):
+        self.inner = inner
+        self.cache = cache
+        self.bus = bus
+        self.cached = set(cached)
+        self.node_id = uuid.uuid4().hex
+        self._collections: Dict[str, CachingCollection] = {}
+        if bus is not None:
+            bus.subscribe(self._on_invalidation)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def __getitem__(self, name: str):
+        if name not in self.cached:
+            return self.inner[name]
+        if name not in self._collections:
+            self._collections[name] = CachingCollection(self.inner[name], name, self)
+        return self._collections[name]
+
+    def invalidate(self, collection: str, doc_id: Optional[str]):
+        self.cache.invalidate(collection, doc_id)
+        self.publish(collection, doc_id)
+
+    def publish(self, collection: str, doc_id: Optional[str]):
+        if self.bus is not None:
+            self.bus.publish(self.node_id, collection, doc_id)
+
+    def sync(self):
+        if self.bus is not None:
+            self.bus.poll()
+
+    def _on_invalidation(self, origin: str, collection: str, doc_id: Optional[str]):
+        if origin != self.node_id:
+            self.cache.invalidate(collection, doc_id)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
@@ -1,63 +1,223 @@
 import uuid
 import json
-from typing import Any, Dict, List
-
-import firebase_admin
-from firebase_admin import credentials, firestore
+from typing import Any, Dict, List, Optional
 
 from core.config import get_settings
+from core.log import get_logger
+from core.metrics import metrics
+from db.change_tracking import ChangeTrackingDatabase
+from db.compression import CompressingDatabase, StorageCodec
+from db.metered import MeteredDatabase
+from db.write_behind import FIRESTORE_BATCH_LIMIT, WriteBehindBuffer
 
 settings = get_settings()
 
+logger = get_logger(__name__)
+
+
+def _project(doc: Dict[str, Any], projection: Optional[List[str]]) -> Dict[str, Any]:
+    """Return only the projected fields (plus id); no projection returns the document as-is."""
+    if not projection:
+        return doc
+    return {field: doc[field] for field in ["id", *projection] if field in doc}
+
+
+def _position(value: Any, doc_id: Any):
+    # Missing values sort first without being compared against real values.
+    if value is None or value == "":
+        return (0, "", str(doc_id))
+    return (1, value, str(doc_id))
+
+
+def _sort_position(doc: Dict[str, Any], key: str):
+    return _position(doc.get(key), doc.get("id"))
+
 
 class MockCursor:
-    def __init__(self, data: List[Dict[str, Any]]):
+    def __init__(self, data: List[Dict[str, Any]], projection: Optional[List[str]] = None):
         self.data = data
+        self.projection = projection
+        self._sort_key: Optional[str] = None
+        self._reverse = False
+        self._start_after = None
 
     def sort(self, key: str, direction: int):
         reverse = direction == -1
-        self.data.sort(key=lambda x: x.get(key) or "", reverse=reverse)
+        self.data.sort(key=lambda x: _sort_position(x, key), reverse=reverse)
+        self._sort_key = key
+        self._reverse = reverse
+        return self
+
+    def start_after(self, value: Any, doc_id: str):
+        """Resume a sorted listing after the document at (sort value, id)."""
+        self._start_after = _position(value, doc_id)
         return self
 
     async def to_list(self, length: int):
-        return self.data[:length]
+        data = self.data
+        if self._start_after is not None and self._sort_key is not None:
+            anchor = self._start_after
+            if self._reverse:
+                data = [doc for doc in data if _sort_position(doc, self._sort_key) < anchor]
+            else:
+                data = [doc for doc in data if _sort_position(doc, self._sort_key) > anchor]
+        return [_project(doc, self.projection) for doc in data[:length]]
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int = 0):
+        self.deleted_count = deleted_count
+
+
+def query_ids(query: Dict[str, Any]) -> Optional[List[str]]:
+    """Ids for ``{"id": x}`` or an ``$or`` of such clauses; None for any other query."""
+    if not query:
+        return None
+    if len(query) == 1 and query.get("id") is not None:
+        return [str(query["id"])]
+    branches = query.get("$or")
+    if len(query) == 1 and isinstance(branches, list) and branches:
+        ids = []
+        for condition in branches:
+            if len(condition) != 1 or condition.get("id") is None:
+                return None
+            ids.append(str(condition["id"]))
+        return ids
+    return None
+
+
+def ids_query(ids: List[str]) -> Dict[str, Any]:
+    return {"$or": [{"id": doc_id} for doc_id in ids]}
+
+
+# Secondary hash indexes every mock collection maintains.
+DEFAULT_MOCK_INDEXES = ("user_id", "parent_resume_id", "content_source_id")
+
+
+def _doc_key(document: Dict[str, Any]) -> str:
+    doc_id = document.get("id")
+    return str(doc_id) if doc_id is not None else f"_obj{id(document)}"
 
 
 class MockCollection:
-    def __init__(self):
-        self.data: List[Dict[str, Any]] = []
+    """
+    In-memory collection with a primary-key map and secondary hash indexes.
+
+    Documents live in ``data`` keyed by ``id`` (insertion ordered), and each
+    indexed field maps value -> ordered set of ids. Equality and ``$or``
+    queries are narrowed through the indexes before ``_matches_query``
+    filters the candidates, so point reads, updates and deletes are O(1).
+    """
+
+    def __init__(self, indexes=DEFAULT_MOCK_INDEXES):
+        self.data: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[Any, Dict[str, None]]] = {}
+        for field in indexes:
+            self.create_index(field)
+
+    def create_index(self, field: str):
+        index: Dict[Any, Dict[str, None]] = {}
+        for key, doc in self.data.items():
+            index.setdefault(doc.get(field), {})[key] = None
+        self.indexes[field] = index
+
+    def _index_add(self, key: str, doc: Dict[str, Any]):
+        for field, index in self.indexes.items():
+            index.setdefault(doc.get(field), {})[key] = None
+
+    def _index_remove(self, key: str, doc: Dict[str, Any]):
+        for field, index in self.indexes.items():
+            bucket = index.get(doc.get(field))
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[doc.get(field)]
+
+    def _candidate_keys(self, query: Dict[str, Any]):
+        """Pick the narrowest index for a query; None means a full scan."""
+        if not query:
+            return None
+
+        best = None
+        for key, value in query.items():
+            if key == "$or":
+                if not isinstance(value, list):
+                    return []
+                union: Dict[str, None] = {}
+                for condition in value:
+                    branch = self._candidate_keys(condition)
+                    if branch is None:
+                        union = None
+                        break
+                    union.update(dict.fromkeys(branch))
+                candidates = None if union is None else list(union)
+            elif key == "id":
+                candidates = [str(value)] if str(value) in self.data else []
+            elif key in self.indexes:
+                try:
+                    candidates = list(self.indexes[key].get(value, {}))
+                except TypeError:
+                    # Unhashable query value; cannot use the hash index.
+                    candidates = None
+            else:
+                candidates = None
+
+            if candidates is not None and (best is None or len(candidates) < len(best)):
+                best = candidates
+        return best
+
+    def _iter_matches(self, query: Dict[str, Any]):
+        keys = self._candidate_keys(query)
+        if keys is None:
+            docs = self.data.values()
+        else:
+            docs = [self.data[key] for key in keys if key in self.data]
+        for doc in docs:
+            if _matches_query(doc, query):
+                yield doc
 
     async def insert_one(self, document: Dict[str, Any]):
-        self.data.append(document)
+        key = _doc_key(document)
+        existing = self.data.get(key)
+        if existing is not None:
+            self._index_remove(key, existing)
+        self.data[key] = document
+        self._index_add(key, document)
         return True
 
     async def find_one(self, query: Dict[str, Any]):
-        for doc in self.data:
-            if _matches_query(doc, query):
-                return doc
-        return None
+        return next(self._iter_matches(query), None)
 
-    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any]):
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
         doc = await self.find_one(query)
-        if doc and "$set" in update:
-            doc.update(update["$set"])
+        if doc is None:
+            if upsert:
+                await self.insert_one(upsert_document(query, update))
+            return True
+        key = _doc_key(doc)
+        self._index_remove(key, doc)
+        apply_update(doc, update)
+        self._index_add(key, doc)
         return True
 
-    def find(self, query: Dict[str, Any]):
-        results = [doc for doc in self.data if _matches_query(doc, query)]
-        return MockCursor(results)
+    def find(self, query: Dict[str, Any], projection: Optional[List[str]] = None):
+        return MockCursor(list(self._iter_matches(query)), projection)
 
     async def delete_one(self, query: Dict[str, Any]):
         doc = await self.find_one(query)
-
-        class DeleteResult:
-            deleted_count = 0
-
-        result = DeleteResult()
         if doc:
-            self.data.remove(doc)
-            result.deleted_count = 1
-        return result
+            key = _doc_key(doc)
+            self._index_remove(key, doc)
+            self.data.pop(key, None)
+        return DeleteResult(1 if doc else 0)
+
+    async def delete_many(self, query: Dict[str, Any]):
+        docs = list(self._iter_matches(query))
+        for doc in docs:
+            key = _doc_key(doc)
+            self._index_remove(key, doc)
+            self.data.pop(key, None)
+        return DeleteResult(len(docs))
 
 
 class MockDatabase:
@@ -86,22 +246,186 @@ def _matches_query(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
     return True
 
 
+def _increment(target: Dict[str, Any], increments: Dict[str, Any]):
+    for field, amount in increments.items():
+        if isinstance(amount, dict):
+            if not isinstance(target.get(field), dict):
+                target[field] = {}
+            _increment(target[field], amount)
+        else:
+            target[field] = (target.get(field) or 0) + amount
+
+
+def apply_update(document: Dict[str, Any], update: Dict[str, Any]):
+    """
+    Apply an update in place: ``$set`` replaces fields, ``$inc`` adds to
+    numbers (a nested dict increments keys of a map field), ``$addToSet``
+    appends an element to an array unless an equal one is present and
+    ``$pull`` removes every element equal to the given one.
+    """
+    document.update(update.get("$set") or {})
+    _increment(document, update.get("$inc") or {})
+    for field, value in (update.get("$addToSet") or {}).items():
+        items = list(document.get(field) or [])
+        if value not in items:
+            items.append(value)
+        document[field] = items
+    for field, value in (update.get("$pull") or {}).items():
+        document[field] = [item for item in document.get(field) or [] if item != value]
+
+
+def upsert_document(query: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """The document an upsert creates: the query's equality fields with the update applied."""
+    document = {key: value for key, value in query.items() if not key.startswith("$")}
+    apply_update(document, update)
+    return document
+
+
 class FirestoreCursor:
-    def __init__(self, data: List[Dict[str, Any]]):
-        self.data = data
+    """
+    Lazily executed Firestore query.
+
+    Pure equality queries are pushed down to Firestore (where / order_by /
+    start_after / select / limit). ``$or`` queries, or queries whose
+    composite index is missing, fall back to streaming the collection and
+    filtering in Python.
+    """
+
+    def __init__(self, collection_ref, query: Dict[str, Any], projection: Optional[List[str]] = None, overlay=None):
+        self.collection_ref = collection_ref
+        self.query = query or {}
+        self.projection = projection
+        self._overlay = overlay or (lambda data: data)
+        self._sort_key: Optional[str] = None
+        self._reverse = False
+        self._start_after = None
 
     def sort(self, key: str, direction: int):
-        reverse = direction == -1
-        self.data.sort(key=lambda x: x.get(key) or "", reverse=reverse)
+        self._sort_key = key
+        self._reverse = direction == -1
         return self
 
-    async def to_list(self, length: int):
-        return self.data[:length]
+    def start_after(self, value: Any, doc_id: str):
+        self._start_after = (value, str(doc_id))
+        return self
+
+    def _native(self, length: Optional[int]) -> List[Dict[str, Any]]:
+        from firebase_admin import firestore
+
+        query = self.collection_ref
+        for key, value in self.query.items():
+            query = query.where(filter=firestore.FieldFilter(key, "==", value))
+        if self._sort_key:
+            direction = firestore.Query.DESCENDING if self._reverse else firestore.Query.ASCENDING
+            # Ordering by id too breaks ties the way ``_position`` does, so a page
+            # boundary inside a run of equal values skips nothing.
+            query = query.order_by(self._sort_key, direction=direction).order_by("id", direction=direction)
+            if self._start_after is not None:
+                value, doc_id = self._start_after
+                query = query.start_after({self._sort_key: value, "id": doc_id})
+        if self.projection:
+            query = query.select(list(dict.fromkeys(["id", *self.projection])))
+        if length is not None:
+            query = query.limit(length)
+        results = []
+        for doc in query.stream():
+            data = self._overlay(doc.to_dict() or {})
+            results.append(_project(data, self.projection))
+        return results
+
+    def _scan(self) -> MockCursor:
+        results = []
+        for doc in self.collection_ref.stream():
+            data = self._overlay(doc.to_dict() or {})
+            if _matches_query(data, self.query):
+                results.append(data)
+
+        cursor = MockCursor(results, self.projection)
+        if self._sort_key:
+            cursor.sort(self._sort_key, -1 if self._reverse else 1)
+            if self._start_after is not None:
+                cursor.start_after(*self._start_after)
+        return cursor
+
+    def _point_reads(self, ids: List[str]) -> MockCursor:
+        results = []
+        for doc_id in dict.fromkeys(ids):
+            snapshot = self.collection_ref.document(doc_id).get()
+            if snapshot.exists:
+                results.append(self._overlay(snapshot.to_dict() or {}))
+        cursor = MockCursor(results, self.projection)
+        if self._sort_key:
+            cursor.sort(self._sort_key, -1 if self._reverse else 1)
+            if self._start_after is not None:
+                cursor.start_after(*self._start_after)
+        return cursor
+
+    async def to_list(self, length: Optional[int]):
+        ids = query_ids(self.query)
+        if ids is not None and len(ids) > 1:
+            return await self._point_reads(ids).to_list(length)
+
+        if "$or" not in self.query:
+            try:
+                return self._native(length)
+            except Exception as e:
+                # Usually a missing composite index; keep serving from a scan.
+                logger.info("Firestore query fell back to a scan", extra={"error": str(e), "high_volume": True})
+
+        return await self._scan().to_list(length)
+
+
+def _query_doc_id(query: Dict[str, Any]) -> Optional[str]:
+    """Return the id for a pure ``{"id": ...}`` query, which can be a point read."""
+    if query and len(query) == 1 and query.get("id") is not None:
+        return str(query["id"])
+    return None
+
+
+def _firestore_increments(firestore, increments: Dict[str, Any], nested: bool, path=()) -> Dict[str, Any]:
+    """``$inc`` as Firestore Increment transforms: nested maps for merge writes, field paths for updates."""
+    fields: Dict[str, Any] = {}
+    for field, amount in increments.items():
+        if isinstance(amount, dict):
+            inner = _firestore_increments(firestore, amount, nested, (*path, field))
+            if nested:
+                fields[field] = inner
+            else:
+                fields.update(inner)
+        elif nested:
+            fields[field] = firestore.Increment(amount)
+        else:
+            from google.cloud.firestore_v1.field_path import FieldPath
+
+            # Map keys such as skill sets may hold dots or commas; FieldPath quotes them.
+            fields[FieldPath(*path, field).to_api_repr()] = firestore.Increment(amount)
+    return fields
+
+
+def _firestore_array_transforms(firestore, update: Dict[str, Any]) -> Dict[str, Any]:
+    """``$addToSet`` / ``$pull`` as Firestore ArrayUnion / ArrayRemove transforms."""
+    fields: Dict[str, Any] = {}
+    for field, value in (update.get("$addToSet") or {}).items():
+        fields[field] = firestore.ArrayUnion([value])
+    for field, value in (update.get("$pull") or {}).items():
+        fields[field] = firestore.ArrayRemove([value])
+    return fields
 
 
 class FirestoreCollection:
-    def __init__(self, collection_ref):
+    def __init__(self, collection_ref, writer: Optional[WriteBehindBuffer] = None, client=None):
         self.collection_ref = collection_ref
+        self.writer = writer
+        self.client = client
+
+    @property
+    def name(self) -> str:
+        return self.collection_ref.id
+
+    def _overlay(self, data: Optional[Dict[str, Any]]):
+        if self.writer is not None:
+            return self.writer.overlay(self.name, data)
+        return data
 
     async def insert_one(self, document: Dict[str, Any]):
         document_id = str(document.get("id") or uuid.uuid4())
@@ -111,55 +435,99 @@ class FirestoreCollection:
         return True
 
     async def find_one(self, query: Dict[str, Any]):
+        doc_id = _query_doc_id(query)
+        if doc_id is not None:
+            snapshot = self.collection_ref.document(doc_id).get()
+            if not snapshot.exists:
+                return None
+            data = self._overlay(snapshot.to_dict() or {})
+            return data if _matches_query(data, query) else None
+
         for doc in self.collection_ref.stream():
-            data = doc.to_dict() or {}
+            data = self._overlay(doc.to_dict() or {})
             if _matches_query(data, query):
                 return data
         return None
 
-    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any]):
-        target = await self.find_one(query)
-        if not target:
-            return False
-
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
         updates = update.get("$set", {})
-        if not updates:
+        increments = update.get("$inc", {})
+        transforms = increments or update.get("$addToSet") or update.get("$pull")
+        if not updates and not transforms:
             return False
 
-        doc_id = str(target.get("id"))
-        if not doc_id:
-            return False
+        # Updates by id go straight to the document; no read is needed.
+        doc_id = _query_doc_id(query)
+        if doc_id is None:
+            target = await self.find_one(query)
+            if not target or not target.get("id"):
+                return False
+            doc_id = str(target["id"])
 
-        self.collection_ref.document(doc_id).update(updates)
+        if not transforms and not upsert:
+            if self.writer is not None:
+                self.writer.enqueue(self.collection_ref, doc_id, updates)
+            else:
+                self.collection_ref.document(doc_id).update(updates)
+            return True
+
+        # Increments and array changes are applied by Firestore itself, so they never go through the buffer.
+        from firebase_admin import firestore
+
+        ref = self.collection_ref.document(doc_id)
+        arrays = _firestore_array_transforms(firestore, update)
+        if upsert:
+            # A merge write creates the document when it is missing and merges nested maps.
+            payload = upsert_document({"id": doc_id}, {"$set": updates})
+            payload.update(_firestore_increments(firestore, increments, nested=True))
+            payload.update(arrays)
+            ref.set(payload, merge=True)
+        else:
+            ref.update({**updates, **_firestore_increments(firestore, increments, nested=False), **arrays})
         return True
 
-    def find(self, query: Dict[str, Any]):
-        results: List[Dict[str, Any]] = []
-        for doc in self.collection_ref.stream():
-            data = doc.to_dict() or {}
-            if _matches_query(data, query):
-                results.append(data)
-        return FirestoreCursor(results)
+    def find(self, query: Dict[str, Any], projection: Optional[List[str]] = None):
+        return FirestoreCursor(self.collection_ref, query, projection, overlay=self._overlay)
 
     async def delete_one(self, query: Dict[str, Any]):
         target = await self.find_one(query)
-
-        class DeleteResult:
-            deleted_count = 0
-
-        result = DeleteResult()
-        if target and target.get("id"):
+        deleted = bool(target and target.get("id"))
+        if deleted:
+            if self.writer is not None:
+                self.writer.discard(self.name, str(target["id"]))
             self.collection_ref.document(str(target["id"])).delete()
-            result.deleted_count = 1
-        return result
+        return DeleteResult(1 if deleted else 0)
+
+    async def delete_many(self, query: Dict[str, Any]):
+        ids = query_ids(query)
+        if ids is None:
+            targets = await self.find(query, projection=["id"]).to_list(length=None)
+            ids = [str(target["id"]) for target in targets if target.get("id")]
+        else:
+            refs = [self.collection_ref.document(doc_id) for doc_id in dict.fromkeys(ids)]
+            ids = [snapshot.id for snapshot in self.client.get_all(refs) if snapshot.exists]
+
+        for start in range(0, len(ids), FIRESTORE_BATCH_LIMIT):
+            batch = self.client.batch()
+            for doc_id in ids[start:start + FIRESTORE_BATCH_LIMIT]:
+                if self.writer is not None:
+                    self.writer.discard(self.name, doc_id)
+                batch.delete(self.collection_ref.document(doc_id))
+            batch.commit()
+        return DeleteResult(len(ids))
 
 
 class FirestoreDatabase:
-    def __init__(self, client):
+    def __init__(self, client, write_window_seconds: float = 0.0):
         self.client = client
+        self.writer = WriteBehindBuffer(client, write_window_seconds) if write_window_seconds > 0 else None
 
     def __getitem__(self, name: str):
-        return FirestoreCollection(self.client.collection(name))
+        return FirestoreCollection(self.client.collection(name), self.writer, self.client)
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
 
 
 class FirebaseDB:
@@ -167,8 +535,20 @@ class FirebaseDB:
     db = None
 
     async def connect_to_database(self):
-        print("Connecting to Firebase Firestore...")
+        if settings.USE_LOCAL_DB:
+            self.db = self._wrap(self._local_database(), settings.LOCAL_DB_BACKEND.lower())
+            return
+
+        logger.info("Connecting to Firebase Firestore")
         try:
+            # Deferred so deployments on local storage never import the Google SDKs.
+            import firebase_admin
+            from dotenv import load_dotenv
+            from firebase_admin import credentials, firestore
+
+            # Application Default Credentials are read from os.environ, not from Settings.
+            load_dotenv()
+
             if not firebase_admin._apps:
                 if settings.FIREBASE_CREDENTIALS_JSON:
                     cred_info = json.loads(settings.FIREBASE_CREDENTIALS_JSON)
@@ -192,15 +572,57 @@ class FirebaseDB:
                 self.app = firebase_admin.get_app()
 
             client = firestore.client(app=self.app)
-            self.db = FirestoreDatabase(client)
-            print("Successfully connected to Firebase Firestore!")
+            self.db = self._wrap(
+                self._with_document_cache(FirestoreDatabase(client, settings.FIRESTORE_WRITE_COALESCE_MS / 1000)),
+                "firestore",
+            )
+            logger.info("Connected to Firebase Firestore")
         except Exception as e:
-            print(f"Unable to connect to Firebase Firestore: {e}")
-            print("WARNING: using In-Memory Mock Database for demonstration.")
-            self.db = MockDatabase()
+            logger.warning("Unable to connect to Firebase Firestore", extra={"error": str(e)})
+            self.db = self._wrap(self._local_database(), settings.LOCAL_DB_BACKEND.lower())
+
+    def _local_database(self):
+        if settings.LOCAL_DB_BACKEND.lower() == "sqlite":
+            from db.sqlite_store import SQLiteDatabase
+
+            logger.warning("Using local SQLite database", extra={"path": settings.LOCAL_DB_PATH})
+            return self._with_document_cache(
+                SQLiteDatabase(settings.LOCAL_DB_PATH, synchronous=settings.LOCAL_DB_SYNCHRONOUS)
+            )
+
+        logger.warning("Using in-memory mock database for demonstration")
+        return MockDatabase()
+
+    def _wrap(self, backend, provider: str):
+        codec = StorageCodec(
+            settings.STORAGE_COMPRESSION.lower(),
+            level=settings.STORAGE_COMPRESSION_LEVEL,
+            min_bytes=settings.STORAGE_COMPRESSION_MIN_BYTES,
+        )
+        database = ChangeTrackingDatabase(CompressingDatabase(backend, codec))
+        if metrics.enabled:
+            database = MeteredDatabase(database, provider)
+        return database
+
+    def _with_document_cache(self, backend):
+        # The in-memory mock already holds plain dicts; caching only pays off for real storage.
+        if settings.DOC_CACHE_MAX_ENTRIES <= 0:
+            return backend
+        from db.doc_cache import CachingDatabase, DocumentCache
+
+        cache = DocumentCache(settings.DOC_CACHE_MAX_ENTRIES, settings.DOC_CACHE_TTL_SECONDS)
+        return CachingDatabase(backend, cache)
+
+    async def flush_pending_writes(self):
+        flush = getattr(self.db, "flush", None)
+        if flush is not None:
+            flush()
 
     async def close_database_connection(self):
-        print("Closing Firebase connection")
+        logger.info("Closing database connection")
+        close = getattr(self.db, "close", None)
+        if close is not None:
+            close()
 
 
 db = FirebaseDB()
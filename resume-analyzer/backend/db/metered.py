@@ -0,0 +1,74 @@
+"""
+Timing wrapper recording every collection operation as a ``db.<op>`` stage.
+
+Only installed when metrics are enabled, so a disabled registry costs
+nothing on the DB path. The provider label names the storage backend.
+"""
+from typing import Any, Dict
+
+from core.metrics import span
+
+
+class MeteredCursor:
+    def __init__(self, inner, provider: str):
+        self.inner = inner
+        self.provider = provider
+
+    def sort(self, key: str, direction: int):
+        self.inner = self.inner.sort(key, direction)
+        return self
+
+    def start_after(self, value: Any, doc_id: str):
+        self.inner = self.inner.start_after(value, doc_id)
+        return self
+
+    async def to_list(self, length):
+        with span("db.find", self.provider):
+            return await self.inner.to_list(length=length)
+
+
+class MeteredCollection:
+    def __init__(self, inner, provider: str):
+        self.inner = inner
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def insert_one(self, document: Dict[str, Any]):
+        with span("db.insert_one", self.provider):
+            return await self.inner.insert_one(document)
+
+    async def find_one(self, query: Dict[str, Any]):
+        with span("db.find_one", self.provider):
+            return await self.inner.find_one(query)
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        with span("db.update_one", self.provider):
+            return await self.inner.update_one(query, update, upsert=upsert)
+
+    def find(self, query: Dict[str, Any], projection=None):
+        return MeteredCursor(self.inner.find(query, projection=projection), self.provider)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        with span("db.delete_one", self.provider):
+            return await self.inner.delete_one(query)
+
+    async def delete_many(self, query: Dict[str, Any]):
+        with span("db.delete_many", self.provider):
+            return await self.inner.delete_many(query)
+
+
+class MeteredDatabase:
+    def __init__(self, inner, provider: str):
+        self.inner = inner
+        self.provider = provider
+        self._collections: Dict[str, MeteredCollection] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def __getitem__(self, name: str):
+        if name not in self._collections:
+            self._collections[name] = MeteredCollection(self.inner[name], self.provider)
+        return self._collections[name]
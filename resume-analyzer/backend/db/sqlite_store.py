@@ -0,0 +1,373 @@
+"""
+Embedded SQLite storage backend with the same collection API as
+FirestoreCollection / MockCollection.
+
+Each collection is a table holding the JSON document plus indexed
+``id`` (primary key), ``user_id`` and ``parent_resume_id`` columns.
+Equality and ``$or`` queries on those fields are answered from the
+indexes; anything else falls back to filtering rows in Python with
+``_matches_query``. ``uploaded_at`` is also kept in its own column,
+indexed with ``user_id``, so for ``find`` on indexed fields the sort by
+it, keyset pagination (``start_after``), the limit and the projection
+(via ``json_extract``) all run in SQL, and a summary list page decodes
+only the projected fields of the rows it returns. The database runs in
+WAL mode and commits every write, so data survives restarts.
+"""
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from threading import RLock
+from typing import Any, Dict, List, Optional, Tuple
+
+from db.firebase import DeleteResult, MockCursor, _matches_query, apply_update, upsert_document
+
+INDEXED_FIELDS = ("id", "user_id", "parent_resume_id")
+# Copied into its own indexed column so list pages sort and page in SQL.
+SORT_FIELD = "uploaded_at"
+
+# Top-level field names that can be spliced into a JSON path.
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _encode_default(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_hook(obj: Dict[str, Any]):
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def dumps_document(document: Dict[str, Any]) -> str:
+    return json.dumps(document, default=_encode_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_document(payload: str) -> Dict[str, Any]:
+    return json.loads(payload, object_hook=_decode_hook)
+
+
+def _index_value(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _indexed_clause(query: Dict[str, Any]) -> Optional[Tuple[str, List[Any]]]:
+    """Translate the indexable part of a query into SQL, or None for a full scan."""
+    clauses, params = [], []
+    for key, value in query.items():
+        if key == "$or":
+            if not isinstance(value, list) or not value:
+                return None
+            branches = []
+            for condition in value:
+                branch = _indexed_clause(condition)
+                if branch is None:
+                    return None
+                branches.append(branch)
+            clauses.append("(" + " OR ".join(f"({sql})" for sql, _ in branches) + ")")
+            for _, branch_params in branches:
+                params.extend(branch_params)
+        elif key in INDEXED_FIELDS and (value is None or isinstance(value, (str, int))):
+            if value is None:
+                clauses.append(f"{key} IS NULL")
+            else:
+                clauses.append(f"{key} = ?")
+                params.append(str(value))
+    if not clauses:
+        return None
+    return " AND ".join(clauses), params
+
+
+def _fully_indexed(query: Dict[str, Any]) -> bool:
+    """True when ``_indexed_clause`` alone decides the query, with nothing left for Python."""
+    for key, value in query.items():
+        if key == "$or":
+            if not isinstance(value, list) or not value or not all(_fully_indexed(branch) for branch in value):
+                return False
+        elif key not in INDEXED_FIELDS or not (value is None or isinstance(value, str)):
+            return False
+    return True
+
+
+def _json_path(field: str) -> str:
+    return f'$."{field}"'
+
+
+def _sort_value(value: Any) -> Any:
+    """Column value for a sort field, ordered the way ``firebase._position`` orders documents."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        # ISO strings order chronologically.
+        return value.isoformat()
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return value
+    return str(value)
+
+
+class SQLiteCursor:
+    """
+    Lazily executed query. Fully indexed queries run entirely in SQL;
+    anything else goes through ``MockCursor`` over the filtered rows.
+    """
+
+    def __init__(self, collection: "SQLiteCollection", query: Dict[str, Any], projection: Optional[List[str]] = None):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort_key: Optional[str] = None
+        self._reverse = False
+        self._start_after = None
+
+    def sort(self, key: str, direction: int):
+        self._sort_key = key
+        self._reverse = direction == -1
+        return self
+
+    def start_after(self, value: Any, doc_id: str):
+        self._start_after = (value, str(doc_id))
+        return self
+
+    def _pushdown_possible(self) -> bool:
+        if not _fully_indexed(self.query):
+            return False
+        if self._sort_key is not None and self._sort_key != SORT_FIELD:
+            return False
+        return all(_FIELD_NAME.match(field) for field in self.projection or [])
+
+    def _keyset_clause(self, column: str) -> Tuple[str, List[Any]]:
+        """Rows after the ``start_after`` anchor in (column, id) order, NULLs lowest."""
+        anchor_value, anchor_id = self._start_after
+        anchor = _sort_value(anchor_value)
+        if self._reverse:
+            if anchor is None:
+                return f"({column} IS NULL AND id < ?)", [anchor_id]
+            return f"({column} < ? OR ({column} = ? AND id < ?) OR {column} IS NULL)", [anchor, anchor, anchor_id]
+        if anchor is None:
+            return f"({column} IS NOT NULL OR id > ?)", [anchor_id]
+        return f"({column} > ? OR ({column} = ? AND id > ?))", [anchor, anchor, anchor_id]
+
+    async def to_list(self, length: Optional[int]):
+        if not self._pushdown_possible():
+            cursor = MockCursor(self.collection._select(self.query), self.projection)
+            if self._sort_key:
+                cursor.sort(self._sort_key, -1 if self._reverse else 1)
+                if self._start_after is not None:
+                    cursor.start_after(*self._start_after)
+            return await cursor.to_list(length=length)
+
+        fields = [field for field in dict.fromkeys(self.projection or []) if field != "id"]
+        if self.projection:
+            columns = ", ".join(
+                f"json_type(doc, '{_json_path(field)}'), json_extract(doc, '{_json_path(field)}')" for field in fields
+            )
+            sql = f"SELECT id{', ' + columns if columns else ''} FROM {self.collection.table}"
+        else:
+            sql = f"SELECT doc FROM {self.collection.table}"
+
+        clauses, params = [], []
+        where = _indexed_clause(self.query)
+        if where:
+            clauses.append(where[0])
+            params.extend(where[1])
+        if self._sort_key:
+            column = self._sort_key
+            order = "DESC" if self._reverse else "ASC"
+            if self._start_after is not None:
+                clause, anchor_params = self._keyset_clause(column)
+                clauses.append(clause)
+                params.extend(anchor_params)
+            # NULL (missing or empty) sorts lowest, like rank 0 in ``firebase._position``.
+            ordering = f" ORDER BY {column} {order}, id {order}"
+        else:
+            ordering = " ORDER BY seq"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += ordering + " LIMIT ?"
+        # A negative limit means no limit in SQLite.
+        params.append(-1 if length is None else int(length))
+
+        rows = self.collection.database.query(sql, params)
+        if not self.projection:
+            return [loads_document(payload) for (payload,) in rows]
+
+        results = []
+        for row in rows:
+            document: Dict[str, Any] = {"id": row[0]}
+            for index, field in enumerate(fields):
+                kind, value = row[1 + 2 * index], row[2 + 2 * index]
+                if kind is None:
+                    continue
+                if kind in ("object", "array"):
+                    value = loads_document(value)
+                elif kind in ("true", "false"):
+                    value = kind == "true"
+                document[field] = value
+            results.append(document)
+        return results
+
+
+class SQLiteCollection:
+    def __init__(self, database: "SQLiteDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.table = '"' + name.replace('"', '""') + '"'
+
+    def _select(self, query: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        where = _indexed_clause(query or {})
+        sql = f"SELECT doc FROM {self.table}"
+        params: List[Any] = []
+        if where:
+            sql += f" WHERE {where[0]}"
+            params = where[1]
+        sql += " ORDER BY seq"
+
+        results = []
+        for (payload,) in self.database.query(sql, params):
+            document = loads_document(payload)
+            if _matches_query(document, query):
+                results.append(document)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    async def insert_one(self, document: Dict[str, Any]):
+        doc_id = str(document.get("id"))
+        self.database.execute(
+            f"INSERT OR REPLACE INTO {self.table} (id, user_id, parent_resume_id, uploaded_at, doc) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                doc_id,
+                _index_value(document.get("user_id")),
+                _index_value(document.get("parent_resume_id")),
+                _sort_value(document.get("uploaded_at")),
+                dumps_document(document),
+            ),
+        )
+        return True
+
+    async def find_one(self, query: Dict[str, Any]):
+        results = self._select(query, limit=1)
+        return results[0] if results else None
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        if not any(update.get(operator) for operator in ("$set", "$inc", "$addToSet", "$pull")):
+            return False
+        # Read and write in one transaction, so changes from other workers are not lost.
+        with self.database.transaction():
+            target = await self.find_one(query)
+            if not target:
+                if upsert:
+                    await self.insert_one(upsert_document(query, update))
+                    return True
+                return False
+            apply_update(target, update)
+            self.database.execute(
+                f"UPDATE {self.table} SET user_id = ?, parent_resume_id = ?, uploaded_at = ?, doc = ? WHERE id = ?",
+                (
+                    _index_value(target.get("user_id")),
+                    _index_value(target.get("parent_resume_id")),
+                    _sort_value(target.get("uploaded_at")),
+                    dumps_document(target),
+                    str(target.get("id")),
+                ),
+            )
+        return True
+
+    def find(self, query: Dict[str, Any], projection: Optional[List[str]] = None):
+        return SQLiteCursor(self, query, projection)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        deleted = 0
+        with self.database.lock:
+            target = await self.find_one(query)
+            if target:
+                deleted = self.database.execute(
+                    f"DELETE FROM {self.table} WHERE id = ?",
+                    (str(target.get("id")),),
+                )
+        return DeleteResult(deleted)
+
+    async def delete_many(self, query: Dict[str, Any]):
+        with self.database.lock:
+            ids = [str(document.get("id")) for document in self._select(query)]
+            deleted = 0
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                deleted += self.database.execute(
+                    f"DELETE FROM {self.table} WHERE id IN ({placeholders})", chunk
+                )
+        return DeleteResult(deleted)
+
+
+class SQLiteDatabase:
+    def __init__(self, path: str, synchronous: str = "FULL"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.collections: Dict[str, SQLiteCollection] = {}
+
+    def execute(self, sql: str, params=()) -> int:
+        with self.lock:
+            return self.connection.execute(sql, params).rowcount
+
+    def query(self, sql: str, params=()) -> List[tuple]:
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Hold the write lock across a read-modify-write, also against other processes."""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def _create_table(self, name: str):
+        table = '"' + name.replace('"', '""') + '"'
+        with self.lock:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "id TEXT NOT NULL UNIQUE, "
+                "user_id TEXT, "
+                "parent_resume_id TEXT, "
+                "uploaded_at, "
+                "doc TEXT NOT NULL)"
+            )
+            columns = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            if "uploaded_at" not in columns:
+                # Tables created before the sort column: add it and fill it from the documents.
+                self.connection.execute(f"ALTER TABLE {table} ADD COLUMN uploaded_at")
+                value = "COALESCE(json_extract(doc, '$.uploaded_at.\"$date\"'), json_extract(doc, '$.uploaded_at'))"
+                self.connection.execute(f"UPDATE {table} SET uploaded_at = NULLIF({value}, '')")
+            for column in ("user_id", "parent_resume_id", "user_id, uploaded_at, id"):
+                suffix = column.replace(", ", "_")
+                index = '"' + f"idx_{name}_{suffix}".replace('"', '""') + '"'
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({column})")
+
+    def __getitem__(self, name: str):
+        if name not in self.collections:
+            self._create_table(name)
+            self.collections[name] = SQLiteCollection(self, name)
+        return self.collections[name]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
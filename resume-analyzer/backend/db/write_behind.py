@@ -0,0 +1,131 @@
+"""
+Write-behind buffer for Firestore ``$set`` updates.
+
+Updates to the same document within a short window are merged into one
+pending field map, then committed together with Firestore batched writes
+(up to 500 operations per batch). The commit runs on the default
+executor so a Firestore round trip never blocks the event loop; commits
+are serialized, so a later batch cannot overtake an earlier one. Readers
+overlay pending and in-flight fields so a request sees its own writes
+before they are committed. ``flush()`` commits synchronously and is only
+called on shutdown (``DBHandler.shutdown``) so nothing queued is lost.
+"""
+import asyncio
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from core.log import get_logger
+
+FIRESTORE_BATCH_LIMIT = 500
+
+logger = get_logger(__name__)
+
+
+class WriteBehindBuffer:
+    def __init__(self, client, window_seconds: float = 0.05):
+        self.client = client
+        self.window_seconds = window_seconds
+        self._pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._refs: Dict[Tuple[str, str], Any] = {}
+        # Fields handed to a commit that has not finished yet.
+        self._in_flight: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = Lock()
+        self._commit_lock = Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.enqueued = 0
+        self.committed_docs = 0
+        self.batches = 0
+
+    def enqueue(self, collection_ref, doc_id: str, updates: Dict[str, Any]):
+        key = (collection_ref.id, doc_id)
+        with self._lock:
+            self._pending.setdefault(key, {}).update(updates)
+            self._refs[key] = collection_ref.document(doc_id)
+            self.enqueued += 1
+
+        if self.window_seconds <= 0:
+            self.flush()
+            return
+
+        if self._timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            self._timer = loop.call_later(self.window_seconds, self._flush_in_background, loop)
+
+    def _flush_in_background(self, loop: asyncio.AbstractEventLoop):
+        self._timer = None
+        loop.run_in_executor(None, self._commit_pending)
+
+    def pending_for(self, collection_name: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        key = (collection_name, str(doc_id))
+        with self._lock:
+            merged = {**self._in_flight.get(key, {}), **self._pending.get(key, {})}
+            return merged or None
+
+    def overlay(self, collection_name: str, document: Optional[Dict[str, Any]]):
+        """Apply not-yet-committed fields to a document read from Firestore."""
+        if not document or document.get("id") is None:
+            return document
+        pending = self.pending_for(collection_name, document["id"])
+        if pending:
+            document.update(pending)
+        return document
+
+    def discard(self, collection_name: str, doc_id: str):
+        with self._lock:
+            self._pending.pop((collection_name, str(doc_id)), None)
+            self._refs.pop((collection_name, str(doc_id)), None)
+            self._in_flight.pop((collection_name, str(doc_id)), None)
+
+    def flush(self):
+        """Commit everything queued, blocking the caller; for shutdown."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._commit_pending()
+
+    def _commit_pending(self):
+        with self._commit_lock:
+            with self._lock:
+                pending, self._pending = self._pending, OrderedDict()
+                refs, self._refs = self._refs, {}
+                self._in_flight = dict(pending)
+            try:
+                self._commit([(refs[key], updates) for key, updates in pending.items()])
+            finally:
+                with self._lock:
+                    self._in_flight = {}
+
+    def _commit(self, items):
+        for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+            chunk = items[start:start + FIRESTORE_BATCH_LIMIT]
+            batch = self.client.batch()
+            for ref, updates in chunk:
+                batch.update(ref, updates)
+            try:
+                batch.commit()
+                self.batches += 1
+                self.committed_docs += len(chunk)
+            except Exception as e:
+                # One missing document fails the whole batch; retry individually.
+                logger.warning("Batched write failed, retrying per document", extra={"docs": len(chunk), "error": str(e)})
+                for ref, updates in chunk:
+                    try:
+                        ref.update(updates)
+                        self.committed_docs += 1
+                    except Exception as doc_error:
+                        logger.error("Dropped buffered update", extra={"doc_id": ref.id, "error": str(doc_error)})
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            queued = len(self._pending)
+        return {
+            "enqueued_updates": self.enqueued,
+            "committed_docs": self.committed_docs,
+            "batches": self.batches,
+            "pending_docs": queued,
+        }
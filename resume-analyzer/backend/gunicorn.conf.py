@@ -0,0 +1,59 @@
+"""
+Multi-worker deployment:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Runs WEB_CONCURRENCY uvicorn workers. ``preload_app`` imports the app once
+in the master, so the skill matcher tables, prompt templates and settings
+are built before fork and shared copy-on-write; ``gc.freeze()`` keeps the
+collector from dirtying those pages in the workers.
+
+State that would otherwise diverge between workers:
+
+* SHARED_STATE_PATH defaults to ``local_data/shared_state.db``, so the AI
+  response cache, ETag change counters, document-cache invalidations and
+  AI quota buckets are shared (see ``core.shared_state``). It is reset at
+  server start; quota buckets carry over.
+* The in-memory mock database cannot be shared, so local storage switches
+  to SQLite (LOCAL_DB_BACKEND=sqlite) when more than one worker runs.
+
+Still per worker: ``/metrics`` histograms, the AI fair queue
+(AI_MAX_CONCURRENT slots each), and Firestore write coalescing
+(a write buffered in one worker is visible to others only after its
+FIRESTORE_WRITE_COALESCE_MS flush).
+
+``uvicorn main:app --workers N`` works too with SHARED_STATE_PATH set, but
+its workers are fresh interpreters that share nothing copy-on-write.
+"""
+import gc
+import os
+
+from dotenv import dotenv_values
+
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+if workers > 1:
+    # Settings also read .env, so look there before overriding anything.
+    configured = {**dotenv_values(".env"), **os.environ}
+    if not configured.get("SHARED_STATE_PATH"):
+        os.environ["SHARED_STATE_PATH"] = "local_data/shared_state.db"
+    if (configured.get("LOCAL_DB_BACKEND") or "memory").lower() == "memory":
+        os.environ["LOCAL_DB_BACKEND"] = "sqlite"
+
+
+def on_starting(server):
+    # Runs after the preloaded import and before any worker exists.
+    from core.shared_state import shared_store
+
+    if shared_store is not None:
+        shared_store.reset()
+
+
+def when_ready(server):
+    gc.freeze()
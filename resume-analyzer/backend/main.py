@@ -1,37 +1,67 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routes import resume, ai_routes, advanced_features
+from routes import resume, ai_routes, advanced_features, admin
 from core.config import get_settings
 from db.firebase import db
+from services.http_transport import close_http_client
+from services.warmup import start_warmup
+from core.metrics import MetricsMiddleware, metrics
+from core.log import RequestIdMiddleware, configure_logging, shutdown_logging
+from core.profiling import ProfilingMiddleware
+from core.json_response import default_response_class
+from core.http_compression import CompressionMiddleware
+from core.quotas import QuotaMiddleware
 
 settings = get_settings()
+configure_logging()
 
-app = FastAPI()
+app = FastAPI(default_response_class=default_response_class())
 
+# Inside CORS so that 429/503 answers still carry the CORS headers.
+app.add_middleware(QuotaMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor", "ETag", "X-Request-ID", "X-Profile-Id",
+        "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After",
+    ],
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(resume.router, prefix="/api", tags=["Resume"])
 app.include_router(ai_routes.router, prefix="/api", tags=["Groq AI"])
 app.include_router(advanced_features.router, prefix="/api", tags=["Advanced Features"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
 
 class DBHandler:
     async def startup(self):
         await db.connect_to_database()
         
     async def shutdown(self):
+        await db.flush_pending_writes()
         await db.close_database_connection()
 
 db_handler = DBHandler()
 
 app.add_event_handler("startup", db_handler.startup)
+app.add_event_handler("startup", start_warmup)
 app.add_event_handler("shutdown", db_handler.shutdown)
+app.add_event_handler("shutdown", close_http_client)
+app.add_event_handler("shutdown", shutdown_logging)
 
 @app.get("/")
 def read_root():
     return {"message": "AI Resume Analyzer API is running"}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -15,3 +15,131 @@ class AIAnalysisResult(BaseModel):
     strengths: Optional[List[str]] = None
     ai_suggestions: List[str]
     score_breakdown: Optional[Dict[str, Dict[str, float]]] = None
+
+
+# Structured AI payloads, validated per feature.
+
+class ResumeSkillsPayload(BaseModel):
+    matched: List[str] = []
+    missing: List[str] = []
+    recommended: List[str] = []
+
+class ResumeAnalysisPayload(BaseModel):
+    resume_score: Optional[float] = None
+    ats_score: Optional[float] = None
+    skills: Optional[ResumeSkillsPayload] = None
+    section_scores: Dict[str, float] = {}
+    strengths: List[str]
+    resume_category: Optional[str] = None
+    improvement_tips: List[str]
+    experience_match: Optional[str] = None
+
+class JobMatchResult(BaseModel):
+    match_percentage: float
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
+    experience_match: str = ""
+    reasoning: str
+
+class SimulationResult(BaseModel):
+    old_score: float
+    new_score: float
+    impact_percentage: float
+    old_job_match: Optional[float] = None
+    new_job_match: Optional[float] = None
+    impact_explanation: str
+
+class RoadmapPhase(BaseModel):
+    phase: str
+    duration: str = ""
+    skills: List[str] = []
+    resources: List[str] = []
+    milestone: str = ""
+
+class CareerRoadmapResult(BaseModel):
+    total_duration: str
+    roadmap: List[RoadmapPhase]
+
+class OptimizedBullet(BaseModel):
+    original: str = ""
+    optimized: str
+    reason: str = ""
+
+class OptimizationResult(BaseModel):
+    optimized_summary: str
+    optimized_skills: List[str] = []
+    optimized_experience: List[OptimizedBullet] = []
+    ats_improvement_score: float = 0
+    changes_explanation: str = ""
+
+class VersionChange(BaseModel):
+    section: str = ""
+    change_type: str = "modified"
+    description: str
+    impact: str = "neutral"
+
+class VersionComparisonResult(BaseModel):
+    score_change: Dict[str, object] = {}
+    key_changes: List[VersionChange] = []
+    improvements: List[str] = []
+    regressions: List[str] = []
+    recommendation: str
+
+class HeatmapSection(BaseModel):
+    name: str
+    score: float
+    status: str
+    feedback: str = ""
+
+class ATSHeatmapResult(BaseModel):
+    sections: List[HeatmapSection]
+
+class QualityIssue(BaseModel):
+    type: str
+    severity: str
+    location: str = ""
+    issue: str
+    example: str = ""
+
+class QualitySuggestion(BaseModel):
+    issue_type: str = ""
+    current: str = ""
+    suggested: str
+    reason: str = ""
+
+class QualityCheckResult(BaseModel):
+    confidence_score: float
+    authenticity_score: float
+    issues: List[QualityIssue] = []
+    suggestions: List[QualitySuggestion] = []
+    risk_level: str
+    overall_assessment: str = ""
+
+class ScoreFactor(BaseModel):
+    factor: str
+    impact: str
+    evidence: str = ""
+
+class ImprovementAction(BaseModel):
+    action: str
+    expected_impact: str = ""
+    priority: str = "medium"
+
+class ScoreExplanationResult(BaseModel):
+    reasoning: str
+    positive_factors: List[ScoreFactor] = []
+    negative_factors: List[ScoreFactor] = []
+    improvement_actions: List[ImprovementAction] = []
+    score_breakdown: Dict[str, float] = {}
+
+class InterviewQuestion(BaseModel):
+    question: str
+    focus_area: str = ""
+    difficulty: str = "medium"
+
+class InterviewPrepResult(BaseModel):
+    technical: List[InterviewQuestion]
+    behavioral: List[InterviewQuestion]
+    situational: List[InterviewQuestion]
+    overall_difficulty: str = "medium"
+    preparation_tips: List[str] = []
@@ -1,3 +1,3 @@
-from . import resume, ai_routes, advanced_features
+from . import resume, ai_routes, advanced_features, admin
 
-__all__ = ["resume", "ai_routes", "advanced_features"]
+__all__ = ["resume", "ai_routes", "advanced_features", "admin"]
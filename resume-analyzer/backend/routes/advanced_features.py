@@ -1,13 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from services.ai_service import ai_service
+from services.version_index import version_index
+from services.version_diff import apply_optimization, build_local_comparison, diff_versions, summarize_diff
 from db.firebase import get_database
+from db.change_tracking import change_counters
+from db.compression import content_reference
+from core.http_cache import etag_matches, make_etag, response_cache
+from core.json_response import json_response
+from core.log import get_logger
+from core.quotas import COMPARE_NARRATIVE_COST, metered
 from datetime import datetime
 import uuid
 
 router = APIRouter()
 
+logger = get_logger(__name__)
+
 # ============================================
 # REQUEST/RESPONSE MODELS
 # ============================================
@@ -32,6 +42,13 @@ class CompareVersionsRequest(BaseModel):
     resume_id: str
     version1: int
     version2: int
+    # Ask the model for a written narrative of the local diff.
+    include_narrative: bool = False
+
+class ResumeInsightsRequest(BaseModel):
+    resume_id: str
+    job_description: Optional[str] = ""
+    include: List[str] = ["ats_heatmap", "quality_check", "score_explanation", "interview_prep"]
 
 # ============================================
 # FEATURE 1: COMPANY-SPECIFIC RESUME OPTIMIZER
@@ -63,7 +80,7 @@ async def optimize_resume(request: OptimizeResumeRequest, db = Depends(get_datab
             "id": optimized_resume_id,
             "user_id": resume["user_id"],
             "filename": f"{resume['filename']}_optimized_v{version_number}",
-            "content_text": resume["content_text"],  # Keep original
+            **content_reference(resume),  # Share the original text instead of copying it
             "optimized_content": optimization_result,
             "uploaded_at": datetime.utcnow(),
             "version": version_number,
@@ -76,15 +93,16 @@ async def optimize_resume(request: OptimizeResumeRequest, db = Depends(get_datab
         }
         
         await db["resumes"].insert_one(optimized_resume_data)
+        await version_index.add_version(db, request.resume_id, optimized_resume_data)
         
-        return {
+        return json_response({
             **optimization_result,
             "optimized_resume_id": optimized_resume_id,
             "version": version_number
-        }
+        })
         
     except Exception as e:
-        print(f"Optimization Error: {e}")
+        logger.exception("Optimization failed")
         raise HTTPException(status_code=500, detail=f"Failed to optimize resume: {str(e)}")
 
 # ============================================
@@ -124,7 +142,7 @@ async def generate_interview_questions(request: InterviewQuestionsRequest, db =
         return questions
         
     except Exception as e:
-        print(f"Interview Questions Error: {e}")
+        logger.exception("Interview Questions failed")
         raise HTTPException(status_code=500, detail=f"Failed to generate questions: {str(e)}")
 
 # ============================================
@@ -166,7 +184,7 @@ async def explain_score(request: ExplainScoreRequest, db = Depends(get_database)
         return explanation
         
     except Exception as e:
-        print(f"Explain Score Error: {e}")
+        logger.exception("Explain Score failed")
         raise HTTPException(status_code=500, detail=f"Failed to explain score: {str(e)}")
 
 # ============================================
@@ -174,25 +192,27 @@ async def explain_score(request: ExplainScoreRequest, db = Depends(get_database)
 # ============================================
 
 @router.get("/resume-versions/{resume_id}")
-async def get_resume_versions(resume_id: str, db = Depends(get_database)):
+async def get_resume_versions(resume_id: str, request: Request, db = Depends(get_database)):
     """
     Get all versions of a resume with score history
     """
+    etag = make_etag(f"versions:{resume_id}", change_counters.version("resume", resume_id), request)
+    if etag_matches(request, etag):
+        return response_cache.not_modified(etag)
+    cache_key = f"versions:{resume_id}"
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached
+
     try:
         # Find original resume and all its versions
         original = await db["resumes"].find_one({"id": resume_id})
         if not original:
             raise HTTPException(status_code=404, detail="Resume not found")
         
-        # Find all versions (children of this resume)
-        versions_cursor = db["resumes"].find({
-            "$or": [
-                {"id": resume_id},
-                {"parent_resume_id": resume_id}
-            ]
-        }).sort("version", 1)
-        
-        versions = await versions_cursor.to_list(length=100)
+        # Original plus its optimized children, in version order
+        entries = await version_index.entries(db, resume_id) or []
+        versions = await version_index.load(db, entries[:100])
         
         # Format version history
         version_history = []
@@ -207,66 +227,82 @@ async def get_resume_versions(resume_id: str, db = Depends(get_database)):
                 "optimization_metadata": v.get("optimization_metadata")
             })
         
-        return {
+        return response_cache.store(cache_key, etag, {
             "resume_id": resume_id,
             "total_versions": len(version_history),
             "versions": version_history
-        }
+        })
         
     except Exception as e:
-        print(f"Version History Error: {e}")
+        logger.exception("Version History failed")
         raise HTTPException(status_code=500, detail=f"Failed to get versions: {str(e)}")
 
-@router.post("/compare-versions")
+async def narrative_quota(request: CompareVersionsRequest, http_request: Request, response: Response):
+    """Meter the comparison only when it asks the model for a narrative"""
+    if not request.include_narrative:
+        yield
+        return
+    async with metered(http_request, response, COMPARE_NARRATIVE_COST):
+        yield
+
+
+@router.post("/compare-versions", dependencies=[Depends(narrative_quota)])
 async def compare_versions(request: CompareVersionsRequest, db = Depends(get_database)):
     """
     Compare two resume versions side-by-side
     """
     try:
-        # Get both versions
-        versions_cursor = db["resumes"].find({
-            "$or": [
-                {"id": request.resume_id},
-                {"parent_resume_id": request.resume_id}
-            ]
-        }).sort("version", 1)
-        
-        versions = await versions_cursor.to_list(length=100)
+        entries = await version_index.entries(db, request.resume_id) or []
         
-        if len(versions) < 2:
+        if len(entries) < 2:
             raise HTTPException(status_code=400, detail="Not enough versions to compare")
         
         # Find requested versions
-        v1 = next((v for v in versions if v.get("version", 1) == request.version1), None)
-        v2 = next((v for v in versions if v.get("version", 1) == request.version2), None)
+        e1 = next((e for e in entries if e.get("version") == request.version1), None)
+        e2 = next((e for e in entries if e.get("version") == request.version2), None)
+        v1 = await db["resumes"].find_one({"id": e1["id"]}) if e1 else None
+        v2 = await db["resumes"].find_one({"id": e2["id"]}) if e2 else None
         
         if not v1 or not v2:
             raise HTTPException(status_code=404, detail="One or both versions not found")
         
-        # Compare using AI provider
-        comparison = await ai_service.compare_resume_versions(
-            v1["content_text"],
-            v2["content_text"],
-            v1.get("ats_score", 0),
-            v2.get("ats_score", 0)
+        # Diff locally; the model only sees the compact diff when a narrative is requested
+        job_description = (
+            (v2.get("optimization_metadata") or v1.get("optimization_metadata") or {}).get("job_description") or ""
         )
+        diff = diff_versions(
+            apply_optimization(v1["content_text"], v1.get("optimized_content")),
+            apply_optimization(v2["content_text"], v2.get("optimized_content")),
+            job_description,
+        )
+        # Optimized versions are never scored; fall back to the local rubric for both sides
+        score1, score2 = v1.get("ats_score"), v2.get("ats_score")
+        if score1 is None or score2 is None:
+            score1, score2 = diff["rubric"]["total"]["before"], diff["rubric"]["total"]["after"]
+        if request.include_narrative:
+            comparison = await ai_service.compare_resume_versions(
+                summarize_diff(diff), score1, score2, source_text=v1["content_text"]
+            )
+        else:
+            comparison = build_local_comparison(diff, score1, score2)
         
         return {
             "version1": {
                 "id": v1["id"],
                 "version": v1.get("version", 1),
-                "score": v1.get("ats_score", 0)
+                "score": score1
             },
             "version2": {
                 "id": v2["id"],
                 "version": v2.get("version", 1),
-                "score": v2.get("ats_score", 0)
+                "score": score2
             },
-            "comparison": comparison
+            "comparison": comparison,
+            "diff": diff
         }
         
     except Exception as e:
-        print(f"Version Comparison Error: {e}")
+        logger.exception("Version Comparison failed")
         raise HTTPException(status_code=500, detail=f"Failed to compare versions: {str(e)}")
 
 # ============================================
@@ -299,5 +335,76 @@ async def check_resume_quality(request: QualityCheckRequest, db = Depends(get_da
         return quality_report
         
     except Exception as e:
-        print(f"Quality Check Error: {e}")
+        logger.exception("Quality Check failed")
         raise HTTPException(status_code=500, detail=f"Failed to check quality: {str(e)}")
+
+# ============================================
+# FEATURE 6: COMBINED DASHBOARD INSIGHTS
+# ============================================
+
+# Timestamp field written alongside each insight part.
+_INSIGHT_TIMESTAMPS = {
+    "quality_check": "quality_checked_at",
+    "score_explanation": "explanation_generated_at",
+    "interview_prep": "interview_prep_generated_at",
+}
+
+@router.post("/resume-insights")
+async def get_resume_insights(request: ResumeInsightsRequest, db = Depends(get_database)):
+    """
+    Generate heatmap, quality check, score explanation and interview prep
+    in a single AI call and store them in the per-feature fields
+    """
+    try:
+        resume = await db["resumes"].find_one({"id": request.resume_id})
+        if not resume:
+            raise HTTPException(status_code=404, detail="Resume not found")
+
+        tasks = list(dict.fromkeys(request.include))
+        errors = {}
+
+        analysis = resume.get("analysis_result") or {}
+        if "score_explanation" in tasks and not analysis:
+            tasks.remove("score_explanation")
+            errors["score_explanation"] = "Resume not analyzed yet. Please analyze first."
+
+        if not request.job_description:
+            for task in ("score_explanation", "interview_prep"):
+                if task in tasks:
+                    tasks.remove(task)
+                    errors[task] = "job_description is required for this insight."
+
+        insights = {"results": {}, "errors": {}, "cached": []}
+        if tasks:
+            insights = await ai_service.generate_resume_insights(
+                resume["content_text"],
+                tasks,
+                job_description=request.job_description,
+                ats_score=analysis.get("ats_score", 0),
+                matched_skills=analysis.get("matched_skills", []),
+                missing_skills=analysis.get("missing_skills", []),
+            )
+        errors.update(insights["errors"])
+
+        updates = {}
+        now = datetime.utcnow()
+        for task, payload in insights["results"].items():
+            updates[task] = payload
+            if task in _INSIGHT_TIMESTAMPS:
+                updates[_INSIGHT_TIMESTAMPS[task]] = now
+
+        if updates:
+            await db["resumes"].update_one(
+                {"id": request.resume_id},
+                {"$set": updates}
+            )
+
+        return {
+            **insights["results"],
+            "cached": insights["cached"],
+            "errors": errors,
+        }
+
+    except Exception as e:
+        logger.exception("Resume Insights failed")
+        raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
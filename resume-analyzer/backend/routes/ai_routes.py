@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 from services.ai_service import ai_service
+from services.career_paths import career_path_cache
+from services.http_transport import transport_stats
 from db.firebase import get_database
+from core.log import get_logger
+from core.quotas import fair_scheduler
 
 router = APIRouter()
 
+logger = get_logger(__name__)
+
 
 class ATSHeatmapRequest(BaseModel):
     resume_id: str
@@ -47,7 +53,7 @@ async def get_ats_heatmap(request: ATSHeatmapRequest, db=Depends(get_database)):
         return heatmap_data
 
     except Exception as e:
-        print(f"ATS Heatmap Error: {e}")
+        logger.exception("ATS Heatmap failed")
         raise HTTPException(status_code=500, detail=f"Failed to generate ATS heatmap: {str(e)}")
 
 
@@ -67,7 +73,7 @@ async def match_job(request: JobMatchRequest, db=Depends(get_database)):
         return match_data
 
     except Exception as e:
-        print(f"Job Match Error: {e}")
+        logger.exception("Job Match failed")
         raise HTTPException(status_code=500, detail=f"Failed to match job: {str(e)}")
 
 
@@ -89,15 +95,28 @@ async def simulate_improvement(request: SimulateImprovementRequest, db=Depends(g
         return simulation_data
 
     except Exception as e:
-        print(f"Simulation Error: {e}")
+        logger.exception("Simulation failed")
         raise HTTPException(status_code=500, detail=f"Failed to simulate improvement: {str(e)}")
 
 
 @router.post("/career-path")
-async def generate_career_path(request: CareerPathRequest):
-    """Generate personalized career roadmap"""
+async def generate_career_path(
+    request: CareerPathRequest,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_database),
+):
+    """Generate personalized career roadmap, reusing cached roadmaps for common transitions"""
     try:
-        roadmap_data = await ai_service.generate_career_path(
+        roadmap_data = await career_path_cache.get_or_generate(
+            db,
+            ai_service,
+            request.current_role,
+            request.target_role,
+            request.current_skills,
+        )
+        background_tasks.add_task(
+            career_path_cache.record_request,
+            db,
             request.current_role,
             request.target_role,
             request.current_skills,
@@ -106,5 +125,35 @@ async def generate_career_path(request: CareerPathRequest):
         return roadmap_data
 
     except Exception as e:
-        print(f"Career Path Error: {e}")
+        logger.exception("Career Path failed")
         raise HTTPException(status_code=500, detail=f"Failed to generate career path: {str(e)}")
+
+
+@router.get("/ai/prompt-stats")
+async def get_prompt_stats():
+    """Per prompt-template latency, keyed by versioned template cache key"""
+    return {
+        key: {
+            **stats,
+            "avg_seconds": stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0,
+        }
+        for key, stats in list(ai_service.prompt_stats.items())
+    }
+
+
+@router.get("/ai/transport-stats")
+async def get_transport_stats():
+    """Connection reuse counters for the shared LLM HTTP transport"""
+    return transport_stats.snapshot()
+
+
+@router.get("/ai/parse-stats")
+async def get_parse_stats():
+    """How often model output needed repair, continuation, or failed to parse"""
+    return ai_service.parse_stats.snapshot()
+
+
+@router.get("/ai/quota-stats")
+async def get_quota_stats():
+    """Fair-queue slots, depth and waits for AI requests in this worker"""
+    return fair_scheduler.snapshot()
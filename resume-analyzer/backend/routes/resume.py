@@ -1,14 +1,63 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Header, Query, Request
 from services.parser import parse_resume
 from services.nlp_engine import nlp_engine
 from services.ai_generator import ai_generator
-from db.firebase import get_database
+from services.response_cache import content_owner
+from services.version_index import version_index
+from db.firebase import get_database, ids_query
+from db.change_tracking import change_counters
+from core.auth import bearer_token, token_verifier
+from core.http_cache import etag_matches, make_etag, response_cache
+from core.json_response import json_response
+from core.log import get_logger
+from core.profiling import is_admin
 from models.schemas import AIAnalysisResult, AnalysisRequest
+import base64
+import json
 import uuid
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
+logger = get_logger(__name__)
+
+# Fields the resume list needs; everything else stays in storage unless expanded.
+LIST_SUMMARY_FIELDS = ["filename", "uploaded_at", "ats_score", "analysis_summary"]
+LIST_ANALYSIS_FIELDS = ["analysis_result", "resume_skills", "skills"]
+MAX_PAGE_SIZE = 100
+
+
+def _encode_cursor(record) -> str:
+    uploaded_at = record.get("uploaded_at")
+    if isinstance(uploaded_at, datetime):
+        value = {"$date": uploaded_at.isoformat()}
+    else:
+        value = uploaded_at
+    payload = json.dumps({"v": value, "id": record["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload.get("v")
+        if isinstance(value, dict) and "$date" in value:
+            value = datetime.fromisoformat(value["$date"])
+        return value, str(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _build_analysis_summary(result):
+    return {
+        "experience_match": result.experience_match,
+        "matched_skills_count": len(result.matched_skills or []),
+        "missing_skills_count": len(result.missing_skills or []),
+        "top_skills": (result.resume_skills or [])[:5],
+    }
+
 
 def _normalize_points(items, limit=4):
     normalized = []
@@ -85,7 +134,7 @@ async def upload_resume(
         await db["resumes"].insert_one(resume_data)
         return {"resume_id": resume_id, "message": "Uploaded", "extracted_skills": resume_data["skills"]}
     except Exception as e:
-        print(f"Upload Error: {e}")
+        logger.exception("Upload failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analyze-resume", response_model=AIAnalysisResult)
@@ -125,7 +174,7 @@ async def analyze_resume(request: AnalysisRequest, db = Depends(get_database)):
         elif not result.strengths:
             result.strengths = _build_fallback_strengths(result, resume_skills, request.job_description or "")
     except Exception as e:
-        print(f"AI Analysis Error (supplemental only): {e}")
+        logger.warning("Supplemental AI analysis failed", extra={"error": str(e)})
         result.ai_suggestions = _normalize_points(result.ai_suggestions, limit=4)
         if not result.strengths:
             result.strengths = _build_fallback_strengths(result, resume_skills, request.job_description or "")
@@ -136,26 +185,70 @@ async def analyze_resume(request: AnalysisRequest, db = Depends(get_database)):
             "ats_score": result.ats_score,
             "resume_skills": resume_skills,
             "analysis_result": result.dict(),
+            "analysis_summary": _build_analysis_summary(result),
             "ai_analysis": ai_analysis,
             "last_analyzed_at": datetime.utcnow(),
         }}
     )
 
-    return result
+    # The result is already an AIAnalysisResult; skip re-validating it on the way out.
+    return json_response(result)
 
 @router.get("/resumes/{user_id}")
-async def get_user_resumes(user_id: str, db = Depends(get_database)):
-    cursor = db["resumes"].find({"user_id": user_id}).sort("uploaded_at", -1)
-    resumes = await cursor.to_list(length=100)
+async def get_user_resumes(
+    user_id: str,
+    request: Request,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    db = Depends(get_database),
+):
+    """
+    List a user's resumes, newest first.
+
+    Only summary fields are fetched from storage by default; pass
+    ``include=analysis`` to expand the full analysis_result. When more
+    results exist, the next page's cursor is returned in ``X-Next-Cursor``.
+    Responses carry a strong ETag derived from the user's change counter.
+    """
+    etag = make_etag(f"resumes:{user_id}", change_counters.version("user", user_id), request)
+    if etag_matches(request, etag):
+        return response_cache.not_modified(etag)
+    cache_key = f"resumes:{user_id}?{request.url.query}"
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached
+
+    expansions = {part.strip() for part in (include or "").split(",") if part.strip()}
+    with_analysis = "analysis" in expansions
 
-    def _enrich_analysis_result(record):
+    projection = LIST_SUMMARY_FIELDS + (LIST_ANALYSIS_FIELDS if with_analysis else [])
+    query = db["resumes"].find({"user_id": user_id}, projection=projection).sort("uploaded_at", -1)
+    if cursor:
+        query = query.start_after(*_decode_cursor(cursor))
+
+    # Fetch one extra record to know whether another page exists.
+    resumes = await query.to_list(length=limit + 1)
+    headers = {}
+    if len(resumes) > limit:
+        resumes = resumes[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(resumes[-1])
+
+    async def _enrich_analysis_result(record):
         analysis = dict(record.get("analysis_result") or {})
         if not analysis:
             return None
 
         fallback_skills = record.get("resume_skills") or record.get("skills") or []
         if not fallback_skills:
-            fallback_skills = nlp_engine.extract_skills(record.get("content_text") or "")
+            # Legacy record without stored skills: extract once and backfill.
+            full = await db["resumes"].find_one({"id": record["id"]})
+            fallback_skills = nlp_engine.extract_skills((full or {}).get("content_text") or "")
+            if fallback_skills:
+                await db["resumes"].update_one(
+                    {"id": record["id"]},
+                    {"$set": {"resume_skills": fallback_skills}},
+                )
         if (not isinstance(analysis.get("resume_skills"), list)) or len(analysis.get("resume_skills") or []) == 0:
             analysis["resume_skills"] = fallback_skills
 
@@ -167,18 +260,86 @@ async def get_user_resumes(user_id: str, db = Depends(get_database)):
         return analysis
 
     # Map to simpler format for list view
-    return [{
-        "id": r["id"],
-        "filename": r["filename"],
-        "uploaded_at": r["uploaded_at"],
-        "ats_score": r.get("ats_score"),
-        # Return full result if present so we can load it instantly
-        "analysis_result": _enrich_analysis_result(r)
-    } for r in resumes]
+    items = []
+    for r in resumes:
+        item = {
+            "id": r["id"],
+            "filename": r["filename"],
+            "uploaded_at": r["uploaded_at"],
+            "ats_score": r.get("ats_score"),
+            "analysis_summary": r.get("analysis_summary"),
+        }
+        if with_analysis:
+            item["analysis_result"] = await _enrich_analysis_result(r)
+        items.append(item)
+    return response_cache.store(cache_key, etag, items, headers)
 
 @router.delete("/resumes/{resume_id}")
 async def delete_resume(resume_id: str, db = Depends(get_database)):
-    result = await db["resumes"].delete_one({"id": resume_id})
-    if result.deleted_count == 0:
+    """Delete a resume together with every version derived from it."""
+    resume = await db["resumes"].find_one({"id": resume_id})
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    resume_ids = [resume_id] + await version_index.descendants(db, resume_id)
+    result = await db["resumes"].delete_many(ids_query(resume_ids))
+    await version_index.remove_many(db, resume_ids, resume.get("parent_resume_id"))
+    return {"message": "Deleted successfully", "deleted_count": result.deleted_count}
+
+
+async def require_account_owner(user_id: str, request: Request, x_admin_token: Optional[str] = Header(None)):
+    """The signed-in user named by ``user_id`` (verified Firebase ID token), or an admin."""
+    if is_admin(x_admin_token):
+        return
+    token = bearer_token(request.scope)
+    uid = await token_verifier.uid(token) if token else None
+    if uid is None:
+        raise HTTPException(status_code=401, detail="Sign-in required", headers={"WWW-Authenticate": "Bearer"})
+    if uid != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed for this account")
+
+
+@router.delete("/users/{user_id}/resumes", dependencies=[Depends(require_account_owner)])
+async def delete_user_resumes(user_id: str, db = Depends(get_database)):
+    """
+    Delete all of a user's resumes, versions and version indexes (account
+    deletion), then purge what was cached from them: AI responses built
+    from the resume texts and the ETag-cached list and version bodies.
+    """
+    from services.ai_service import ai_service
+
+    resumes = await db["resumes"].find({"user_id": user_id}, projection=["content_text"]).to_list(length=None)
+    result = await db["resumes"].delete_many({"user_id": user_id})
+    await version_index.remove_user(db, user_id)
+
+    ai_service.response_cache.purge({content_owner(r.get("content_text")) for r in resumes})
+    response_cache.invalidate(f"resumes:{user_id}?")
+    for r in resumes:
+        response_cache.invalidate(f"versions:{r['id']}")
+    return {"message": "Deleted successfully", "deleted_count": result.deleted_count}
+
+
+@router.get("/db/cache-stats")
+async def get_document_cache_stats(db = Depends(get_database)):
+    """Hit/miss counters for the read-through resume document cache."""
+    cache_stats = getattr(db, "cache_stats", None)
+    if cache_stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache_stats()}
+
+
+@router.get("/db/storage-stats")
+async def get_storage_stats(db = Depends(get_database)):
+    """Bytes written before and after compression since startup."""
+    storage_stats = getattr(db, "storage_stats", None)
+    return storage_stats() if storage_stats is not None else {"codec": "none"}
+
+
+@router.get("/resumes/{resume_id}/storage")
+async def get_resume_storage(resume_id: str, db = Depends(get_database)):
+    """Per-field raw vs stored size for one resume."""
+    resume = await db["resumes"].find_one({"id": resume_id})
+    if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
-    return {"message": "Deleted successfully"}
+    report = getattr(resume, "storage_report", None)
+    return report() if report is not None else {"fields": {}, "raw_bytes": 0, "stored_bytes": 0, "bytes_saved": 0}
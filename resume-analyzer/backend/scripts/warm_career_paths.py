@@ -0,0 +1,32 @@
+"""
+Precompute career-path roadmaps for the most requested role pairs.
+
+Usage (from the backend directory):
+    python -m scripts.warm_career_paths --top 20
+"""
+import argparse
+import asyncio
+
+from db.firebase import db
+from services.ai_service import ai_service
+from services.career_paths import career_path_cache
+
+
+async def run(top_n: int):
+    await db.connect_to_database()
+    try:
+        summary = await career_path_cache.warm_up(db.db, ai_service, top_n=top_n)
+        print(f"Career path warm-up finished: {summary}")
+    finally:
+        await db.close_database_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="number of role pairs to precompute")
+    args = parser.parse_args()
+    asyncio.run(run(args.top))
+
+
+if __name__ == "__main__":
+    main()
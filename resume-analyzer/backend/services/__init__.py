@@ -1,3 +0,0 @@
-from .ai_service import ai_service, AIService
-
-__all__ = ["ai_service", "AIService"]
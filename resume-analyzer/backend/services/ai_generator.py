@@ -1,19 +1,45 @@
-from openai import OpenAI
 from core.config import get_settings
+from services.http_transport import get_http_client, get_timeout
+from core.metrics import span
+from core.log import get_logger
+from threading import Lock
 from typing import List
 import json
 
 settings = get_settings()
 
+logger = get_logger(__name__)
+
 class AIGenerator:
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
-        self.client = None
-        if self.api_key:
-            try:
-                self.client = OpenAI(api_key=self.api_key)
-            except Exception as e:
-                print(f"OpenAI Init Error: {e}")
+        # The OpenAI SDK is imported and the client built on first use.
+        self._client = None
+        self._client_failed = False
+        self._client_lock = Lock()
+
+    @property
+    def client(self):
+        if self._client is None and self.api_key and not self._client_failed:
+            with self._client_lock:
+                if self._client is None and not self._client_failed:
+                    try:
+                        from openai import OpenAI
+
+                        self._client = OpenAI(
+                            api_key=self.api_key,
+                            base_url=settings.OPENAI_BASE_URL or None,
+                            http_client=get_http_client(),
+                            timeout=get_timeout(),
+                        )
+                    except Exception as e:
+                        self._client_failed = True
+                        logger.error("OpenAI client init failed", extra={"error": str(e)})
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
 
     def generate_feedback(self, resume_text: str, job_desc: str, missing_skills: List[str]) -> List[str]:
         suggestions = []
@@ -23,11 +49,12 @@ class AIGenerator:
         if self.client:
             prompt = f"Analyze resume vs job. Missing: {missing_skills}. Give 3 short improvements."
             try:
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=150
-                )
+                with span("llm.completion", "openai"):
+                    response = self.client.chat.completions.create(
+                        model="gpt-3.5-turbo",
+                        messages=[{"role": "user", "content": prompt}],
+                        max_tokens=150
+                    )
                 content = response.choices[0].message.content
                 return [line.strip("- ") for line in content.split("\n") if line.strip()]
             except:
@@ -1,512 +1,438 @@
-import os
-import json
-from typing import Dict, Any
-from dotenv import load_dotenv
-from groq import Groq
+import copy
+import time
+from threading import Lock
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError as SchemaValidationError
+
+from core.config import get_settings
+from core.log import get_logger
+from core.metrics import span
+from core.shared_state import shared_store
+from db.doc_cache import invalidation_bus
+from services.http_transport import get_http_client, get_timeout
+from services.json_repair import JSONRepairError, parse_model_json
+from services.prompt_templates import build_combined_messages, get_template
+from services.response_cache import ResponseCache, content_owner, make_cache_key
+
+settings = get_settings()
+
+logger = get_logger(__name__)
+
+# Dashboard insight parts: stored field -> prompt template.
+INSIGHT_TASKS = {
+    "ats_heatmap": "ats_heatmap",
+    "quality_check": "quality_check",
+    "score_explanation": "explain_score",
+    "interview_prep": "interview_questions",
+}
+
+CONTINUATION_PROMPT = (
+    "Your previous JSON output was cut off. Continue it exactly from the last character, "
+    "outputting only the remaining characters. Do not repeat anything already written."
+)
+
+
+class ParseStats:
+    """Counters for how model output was turned into JSON"""
 
-load_dotenv()
+    def __init__(self):
+        self._lock = Lock()
+        self.responses = 0
+        self.repaired = 0
+        self.continuations = 0
+        self.validation_failures = 0
+        self.failures = 0
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.responses or 1
+            return {
+                "responses": self.responses,
+                "repaired": self.repaired,
+                "continuations": self.continuations,
+                "validation_failures": self.validation_failures,
+                "failures": self.failures,
+                "failure_rate": round(self.failures / total, 4),
+                "repair_rate": round(self.repaired / total, 4),
+            }
 
 
 class AIService:
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        self.client = Groq(api_key=api_key) if api_key else None
-        self.model_name = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
-
-    def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
-        """Extract and parse JSON from model response"""
+        # The Groq SDK is imported and the client built on first use.
+        self._client = None
+        self._client_lock = Lock()
+        self.model_name = settings.GROQ_MODEL
+        # Per template-version latency, keyed by PromptTemplate.cache_key.
+        self.prompt_stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = Lock()
+        self.response_cache = ResponseCache(
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+            shared=shared_store,
+            bus=invalidation_bus,
+        )
+        self.parse_stats = ParseStats()
+
+    @property
+    def client(self):
+        """Groq client, or None when GROQ_API_KEY is not configured."""
+        if self._client is None and settings.GROQ_API_KEY:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+
+                    self._client = Groq(
+                        api_key=settings.GROQ_API_KEY,
+                        base_url=settings.GROQ_BASE_URL or None,
+                        http_client=get_http_client(),
+                        timeout=get_timeout(),
+                    )
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    def _validate(self, template, data: Any) -> bool:
+        if template.response_model is None:
+            return isinstance(data, dict)
         try:
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                return json.loads(json_str)
-
-            return json.loads(response_text)
-        except json.JSONDecodeError as e:
-            print(f"JSON Parse Error: {e}")
-            print(f"Response: {response_text}")
-            raise ValueError(f"Failed to parse JSON from model response: {str(e)}")
-
-    def _generate_json(self, prompt: str) -> Dict[str, Any]:
-        """Call Groq chat completion and return a parsed JSON payload."""
+            template.response_model.parse_obj(data)
+        except SchemaValidationError:
+            return False
+        return True
+
+    def _parse_with_recovery(self, template, messages: List[Dict[str, str]], raw: str, finish_reason: str) -> Dict[str, Any]:
+        """
+        Parse model output tolerantly. When the output was cut off (the
+        model hit its token limit or stopped inside the top-level value),
+        ask once for just the missing tail instead of regenerating the whole
+        response. Complete output is never continued: invalid JSON there
+        cannot be fixed by appending. Output that still fails parsing or
+        schema validation raises, so ``_generate_json`` never caches it.
+        """
+        self.parse_stats.incr("responses")
+        parsed = None
+        unterminated = False
+        try:
+            parsed = parse_model_json(raw)
+            unterminated = parsed.unterminated
+        except JSONRepairError as e:
+            unterminated = e.unterminated
+
+        if parsed is not None and parsed.complete and self._validate(template, parsed.data):
+            return parsed.data
+
+        truncated = finish_reason == "length" or unterminated
+        if truncated and settings.LLM_CONTINUATION_MAX_TOKENS > 0:
+            self.parse_stats.incr("continuations")
+            try:
+                tail, _ = self._complete(
+                    messages + [
+                        {"role": "assistant", "content": raw},
+                        {"role": "user", "content": CONTINUATION_PROMPT},
+                    ],
+                    f"{template.cache_key}:continuation",
+                    max_tokens=settings.LLM_CONTINUATION_MAX_TOKENS,
+                    json_mode=False,
+                )
+                continued = parse_model_json(raw + tail)
+                if self._validate(template, continued.data):
+                    if continued.repaired:
+                        self.parse_stats.incr("repaired")
+                    return continued.data
+                if parsed is None:
+                    parsed = continued
+            except Exception as e:
+                logger.warning("JSON continuation request failed", extra={"template": template.cache_key, "error": str(e)})
+
+        if parsed is None:
+            self.parse_stats.incr("failures")
+            logger.warning("Model response could not be recovered", extra={"template": template.cache_key, "response_chars": len(raw or "")})
+            logger.debug("Unparseable model response", extra={"response_preview": (raw or "")[:500]})
+            raise ValueError("Failed to parse JSON from model response")
+
+        if not self._validate(template, parsed.data):
+            # Like an invalid part of a combined insights call: reported, never cached.
+            self.parse_stats.incr("validation_failures")
+            logger.warning("Model response failed schema validation", extra={"template": template.cache_key})
+            raise ValueError(f"Model response does not match the {template.name} schema")
+        if parsed.repaired:
+            self.parse_stats.incr("repaired")
+        return parsed.data
+
+    def _render(self, template_name: str, resume_text: Optional[str] = None, cache_owner: Optional[str] = None, **variables):
+        """Build the prompt; the cache key is tagged with the resume it came from (see ``ResponseCache.purge``)."""
+        template = get_template(template_name)
+        messages = template.build_messages(resume_text, **variables)
+        owner = cache_owner or content_owner(resume_text)
+        return template, messages, make_cache_key(template.cache_key, messages, owner)
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        stats_key: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = True,
+    ) -> Tuple[str, str]:
+        """Run one chat completion; returns (content, finish_reason)."""
         if self.client is None:
             raise ValueError(
                 "GROQ_API_KEY is not configured. Set GROQ_API_KEY to enable AI endpoints."
             )
 
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict JSON API. Return only valid JSON with no markdown.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            response_format={"type": "json_object"},
-        )
-        message = response.choices[0].message.content if response.choices else "{}"
-        return self._parse_json_response(message or "{}")
+        options = {}
+        if max_tokens:
+            options["max_tokens"] = max_tokens
+        if json_mode:
+            options["response_format"] = {"type": "json_object"}
+
+        started = time.perf_counter()
+        with span("llm.completion", "groq"):
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=0.2,
+                **options,
+            )
+        self._record_latency(stats_key, time.perf_counter() - started)
 
-    async def analyze_resume(self, resume_text: str, job_description: str = "") -> Dict[str, Any]:
-        prompt = f"""You are an expert ATS (Applicant Tracking System) and resume analyzer.
-Analyze the following resume and provide a comprehensive evaluation.
-
-Resume Text:
-{resume_text}
-
-{f"Job Description: {job_description}" if job_description else ""}
-
-Provide your analysis in STRICT JSON format with the following structure:
-{{
-    "resume_score": <number 0-100>,
-    "ats_score": <number 0-100>,
-    "skills": {{
-        "matched": [<list of skills found in resume>],
-        "missing": [<list of important skills not found>],
-        "recommended": [<list of skills to add>]
-    }},
-    "section_scores": {{
-        "education": <number 0-100>,
-        "experience": <number 0-100>,
-        "projects": <number 0-100>,
-        "skills": <number 0-100>
-    }},
-    "strengths": [<list of 3-4 specific resume strengths>],
-    "resume_category": "<Fresher or Experienced>",
-    "improvement_tips": [<list of 3-4 specific actionable tips>],
-    "experience_match": "<Strong or Moderate or Weak>"
-}}
-
-Rules for strengths and improvement_tips:
-- Keep each point concise (max 18 words).
-- Avoid generic filler text.
-- Focus on resume content and JD relevance.
-
-IMPORTANT: Return ONLY the JSON object, no additional text or explanation."""
+        if not response.choices:
+            return "{}", "stop"
+        choice = response.choices[0]
+        return choice.message.content or "{}", choice.finish_reason or "stop"
+
+    def _generate_json(self, template_name: str, resume_text: Optional[str] = None, **variables) -> Dict[str, Any]:
+        """Render a registered prompt template, call Groq and return a parsed JSON payload."""
+        template, messages, cache_key = self._render(template_name, resume_text, **variables)
 
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        raw, finish_reason = self._complete(messages, template.cache_key)
+        result = self._parse_with_recovery(template, messages, raw, finish_reason)
+        self.response_cache.set(cache_key, copy.deepcopy(result))
+        return result
+
+    async def _generate(self, template_name: str, resume_text: Optional[str] = None, **variables) -> Dict[str, Any]:
+        """``_generate_json`` on a worker thread: the Groq SDK call is blocking."""
+        return await run_in_threadpool(self._generate_json, template_name, resume_text, **variables)
+
+    def _record_latency(self, cache_key: str, elapsed: float):
+        with self._stats_lock:
+            stats = self.prompt_stats.setdefault(cache_key, {"calls": 0, "total_seconds": 0.0, "last_seconds": 0.0})
+            stats["calls"] += 1
+            stats["total_seconds"] += elapsed
+            stats["last_seconds"] = elapsed
+
+    async def analyze_resume(self, resume_text: str, job_description: str = "") -> Dict[str, Any]:
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "analyze_resume",
+                resume_text,
+                job_description=job_description,
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def analyze_ats_heatmap(self, resume_text: str) -> Dict[str, Any]:
-        prompt = f"""You are an ATS (Applicant Tracking System) expert. Analyze the following resume
-and evaluate each section for ATS compatibility.
-
-Resume Text:
-{resume_text}
-
-Provide your analysis in STRICT JSON format:
-{{
-    "sections": [
-        {{
-            "name": "Contact Information",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Professional Summary",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Work Experience",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Education",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Skills",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Projects",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Certifications",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }},
-        {{
-            "name": "Keywords Density",
-            "score": <number 0-100>,
-            "status": "<excellent|good|moderate|needs-work|critical>",
-            "feedback": "<specific feedback>"
-        }}
-    ]
-}}
-
-Status guidelines:
-- excellent: 90-100
-- good: 80-89
-- moderate: 70-79
-- needs-work: 50-69
-- critical: 0-49
-
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate("ats_heatmap", resume_text)
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def match_job(self, resume_text: str, job_description: str) -> Dict[str, Any]:
-        prompt = f"""You are an expert job matching AI. Compare the following resume with the job description
-and provide a detailed match analysis.
-
-Resume:
-{resume_text}
-
-Job Description:
-{job_description}
-
-Provide analysis in STRICT JSON format:
-{{
-    "match_percentage": <number 0-100>,
-    "matched_skills": [<list of skills that match>],
-    "missing_skills": [<list of required skills not in resume>],
-    "experience_match": "<low|medium|high>",
-    "reasoning": "<detailed explanation of why this is a good/bad match>"
-}}
-
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "match_job",
+                resume_text,
+                job_description=job_description,
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def simulate_improvement(self, resume_text: str, added_item: str, item_type: str, job_description: str = "") -> Dict[str, Any]:
-        prompt = f"""You are a resume optimization expert. Analyze the impact of adding a new {item_type}
-to the resume.
-
-Original Resume:
-{resume_text}
-
-Added {item_type}:
-{added_item}
-
-{f"Target Job: {job_description}" if job_description else ""}
-
-Provide analysis in STRICT JSON format:
-{{
-    "old_score": <number 0-100>,
-    "new_score": <number 0-100>,
-    "impact_percentage": <number representing improvement>,
-    "old_job_match": <number 0-100>,
-    "new_job_match": <number 0-100>,
-    "impact_explanation": "<detailed explanation of the impact>"
-}}
-
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "simulate_improvement",
+                resume_text,
+                item_type=item_type,
+                added_item=added_item,
+                job_description=job_description,
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def generate_career_path(self, current_role: str, target_role: str, current_skills: list = None) -> Dict[str, Any]:
-        skills_text = f"Current Skills: {', '.join(current_skills)}" if current_skills else ""
-
-        prompt = f"""You are a career development expert. Create a detailed learning roadmap for transitioning
-from {current_role} to {target_role}.
-
-{skills_text}
-
-Provide a structured roadmap in STRICT JSON format:
-{{
-    "total_duration": "<e.g., 7-11 months>",
-    "roadmap": [
-        {{
-            "phase": "Phase 1: <Name>",
-            "duration": "<e.g., 2-3 months>",
-            "skills": [<list of skills to learn>],
-            "resources": [<list of recommended resources>],
-            "milestone": "<project or achievement to complete>"
-        }},
-        {{
-            "phase": "Phase 2: <Name>",
-            "duration": "<e.g., 2-3 months>",
-            "skills": [<list of skills to learn>],
-            "resources": [<list of recommended resources>],
-            "milestone": "<project or achievement to complete>"
-        }},
-        {{
-            "phase": "Phase 3: <Name>",
-            "duration": "<e.g., 1-2 months>",
-            "skills": [<list of skills to learn>],
-            "resources": [<list of recommended resources>],
-            "milestone": "<project or achievement to complete>"
-        }},
-        {{
-            "phase": "Phase 4: <Name>",
-            "duration": "<e.g., 2-3 months>",
-            "skills": [<list of skills to learn>],
-            "resources": [<list of recommended resources>],
-            "milestone": "<project or achievement to complete>"
-        }}
-    ]
-}}
-
-Provide 4 phases with specific, actionable skills and resources.
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "career_path",
+                current_role=current_role,
+                target_role=target_role,
+                current_skills=current_skills or [],
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def optimize_resume(self, resume_text: str, job_description: str, company_name: str = "") -> Dict[str, Any]:
-        company_context = f" at {company_name}" if company_name else ""
-
-        prompt = f"""You are an expert resume writer and ATS optimization specialist.
-Rewrite the following resume to perfectly match the job description{company_context}.
-
-CRITICAL RULES:
-1. Preserve ALL factual information (dates, companies, education)
-2. Enhance language to match job requirements
-3. Add relevant ATS keywords from the job description
-4. Improve action verbs and quantifiable achievements
-5. Maintain professional tone
-
-Original Resume:
-{resume_text}
-
-Job Description:
-{job_description}
-
-Provide optimization in STRICT JSON format:
-{{
-    "optimized_summary": "<rewritten professional summary>",
-    "optimized_skills": ["<skill 1>", "<skill 2>", ...],
-    "optimized_experience": [
-        {{
-            "original": "<original bullet point>",
-            "optimized": "<improved bullet point>",
-            "reason": "<why this change improves ATS score>"
-        }}
-    ],
-    "ats_improvement_score": <number 0-100 representing expected improvement>,
-    "changes_explanation": "<summary of key optimizations made>"
-}}
-
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "optimize_resume",
+                resume_text,
+                company_name=company_name,
+                job_description=job_description,
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def generate_interview_questions(self, resume_text: str, job_description: str, missing_skills: list = None) -> Dict[str, Any]:
-        missing_context = ""
-        if missing_skills:
-            missing_context = f"\nMissing Skills to Focus On: {', '.join(missing_skills)}"
-
-        prompt = f"""You are an expert technical interviewer. Generate comprehensive interview questions
-based on the candidate's resume and the job requirements.
-
-Resume:
-{resume_text}
-
-Job Description:
-{job_description}
-{missing_context}
-
-Generate questions in STRICT JSON format:
-{{
-    "technical": [
-        {{
-            "question": "<technical question>",
-            "focus_area": "<skill/technology>",
-            "difficulty": "easy|medium|hard"
-        }}
-    ],
-    "behavioral": [
-        {{
-            "question": "<behavioral question>",
-            "focus_area": "<competency>",
-            "difficulty": "easy|medium|hard"
-        }}
-    ],
-    "situational": [
-        {{
-            "question": "<situational question>",
-            "focus_area": "<scenario type>",
-            "difficulty": "easy|medium|hard"
-        }}
-    ],
-    "overall_difficulty": "easy|medium|hard",
-    "preparation_tips": ["<tip 1>", "<tip 2>", ...]
-}}
-
-Generate 5 questions per category. Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "interview_questions",
+                resume_text,
+                job_description=job_description,
+                missing_skills=missing_skills or [],
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def explain_score(self, resume_text: str, job_description: str, ats_score: float, matched_skills: list, missing_skills: list) -> Dict[str, Any]:
-        prompt = f"""You are an AI explainability expert. Provide clear, actionable reasoning
-for why this resume received its ATS score.
-
-Resume:
-{resume_text}
-
-Job Description:
-{job_description}
-
-Current ATS Score: {ats_score}%
-Matched Skills: {', '.join(matched_skills)}
-Missing Skills: {', '.join(missing_skills)}
-
-Provide explanation in STRICT JSON format:
-{{
-    "reasoning": "<detailed explanation of the score>",
-    "positive_factors": [
-        {{
-            "factor": "<what helped the score>",
-            "impact": "high|medium|low",
-            "evidence": "<specific example from resume>"
-        }}
-    ],
-    "negative_factors": [
-        {{
-            "factor": "<what hurt the score>",
-            "impact": "high|medium|low",
-            "evidence": "<specific gap or issue>"
-        }}
-    ],
-    "improvement_actions": [
-        {{
-            "action": "<specific action to take>",
-            "expected_impact": "+<number> points",
-            "priority": "high|medium|low"
-        }}
-    ],
-    "score_breakdown": {
-        "skills_match": <0-100>,
-        "experience_relevance": <0-100>,
-        "keyword_optimization": <0-100>,
-        "formatting_quality": <0-100>
-    }
-}}
-
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "explain_score",
+                resume_text,
+                job_description=job_description,
+                ats_score=f"{ats_score}%",
+                matched_skills=matched_skills or [],
+                missing_skills=missing_skills or [],
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
     async def check_resume_quality(self, resume_text: str) -> Dict[str, Any]:
-        prompt = f"""You are a resume quality auditor. Analyze this resume for:
-1. Weak/passive language
-2. Buzzword overuse
-3. Vague claims without evidence
-4. Unrealistic skill claims
-5. Inconsistencies
-
-Resume:
-{resume_text}
-
-Provide analysis in STRICT JSON format:
-{{
-    "confidence_score": <number 0-100>,
-    "authenticity_score": <number 0-100>,
-    "issues": [
-        {{
-            "type": "weak_language|buzzwords|vague_claim|unrealistic|inconsistency",
-            "severity": "high|medium|low",
-            "location": "<where in resume>",
-            "issue": "<description of the problem>",
-            "example": "<specific text from resume>"
-        }}
-    ],
-    "suggestions": [
-        {{
-            "issue_type": "<type>",
-            "current": "<current text>",
-            "suggested": "<improved text>",
-            "reason": "<why this is better>"
-        }}
-    ],
-    "risk_level": "low|medium|high",
-    "overall_assessment": "<summary of resume quality>"
-}}
-
-Return ONLY the JSON object."""
-
         try:
-            return self._generate_json(prompt)
+            return await self._generate("quality_check", resume_text)
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
-    async def compare_resume_versions(self, version1_text: str, version2_text: str, version1_score: float, version2_score: float) -> Dict[str, Any]:
-        prompt = f"""You are a resume improvement analyst. Compare these two resume versions
-and explain what changed and why it improved (or worsened) the score.
-
-Version 1 (Score: {version1_score}%):
-{version1_text}
-
-Version 2 (Score: {version2_score}%):
-{version2_text}
-
-Provide comparison in STRICT JSON format:
-{{
-    "score_change": {{
-        "previous": {version1_score},
-        "current": {version2_score},
-        "delta": <difference>,
-        "trend": "improved|declined|unchanged"
-    }},
-    "key_changes": [
-        {{
-            "section": "<which section changed>",
-            "change_type": "added|removed|modified",
-            "description": "<what changed>",
-            "impact": "positive|negative|neutral"
-        }}
-    ],
-    "improvements": ["<improvement 1>", "<improvement 2>", ...],
-    "regressions": ["<regression 1>", "<regression 2>", ...],
-    "recommendation": "<overall advice for next iteration>"
-}}
-
-Return ONLY the JSON object."""
-
+    async def compare_resume_versions(
+        self, diff_summary: str, version1_score: float, version2_score: float, source_text: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """``source_text`` (the compared resume) only tags the cached narrative; the model sees the diff."""
         try:
-            return self._generate_json(prompt)
+            return await self._generate(
+                "compare_versions",
+                cache_owner=content_owner(source_text),
+                version1_score=f"{version1_score}%",
+                version2_score=f"{version2_score}%",
+                diff_summary=diff_summary,
+            )
         except Exception as e:
-            print(f"Groq API Error: {str(e)}")
+            logger.error("Groq API error", extra={"error": str(e)})
             raise
 
+    async def generate_resume_insights(
+        self,
+        resume_text: str,
+        tasks: List[str],
+        job_description: str = "",
+        ats_score: float = 0,
+        matched_skills: list = None,
+        missing_skills: list = None,
+    ) -> Dict[str, Any]:
+        """
+        Produce several dashboard insight parts with a single Groq call.
+
+        Parts already in the response cache are served from it; the rest are
+        requested together, validated one by one, and written back under the
+        same cache keys the single-feature methods use.
+        """
+        task_variables = {
+            "ats_heatmap": {},
+            "quality_check": {},
+            "score_explanation": {
+                "job_description": job_description,
+                "ats_score": f"{ats_score}%",
+                "matched_skills": matched_skills or [],
+                "missing_skills": missing_skills or [],
+            },
+            "interview_prep": {
+                "job_description": job_description,
+                "missing_skills": missing_skills or [],
+            },
+        }
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        cached: List[str] = []
+        pending: Dict[str, str] = {}
+
+        for task in tasks:
+            if task not in INSIGHT_TASKS:
+                errors[task] = "Unknown insight task"
+                continue
+            template_name = INSIGHT_TASKS[task]
+            _, _, cache_key = self._render(template_name, resume_text, **task_variables[task])
+            hit = self.response_cache.get(cache_key)
+            if hit is not None:
+                results[task] = copy.deepcopy(hit)
+                cached.append(task)
+            else:
+                pending[task] = cache_key
+
+        if pending:
+            template_names = [INSIGHT_TASKS[task] for task in pending]
+            variables: Dict[str, Any] = {}
+            for task in pending:
+                variables.update(task_variables[task])
+
+            messages = build_combined_messages(template_names, resume_text, variables)
+            try:
+                raw, _ = await run_in_threadpool(self._complete, messages, "combined:" + "+".join(template_names))
+                self.parse_stats.incr("responses")
+                parsed = parse_model_json(raw)
+                if parsed.repaired:
+                    self.parse_stats.incr("repaired")
+                payload = parsed.data if isinstance(parsed.data, dict) else {}
+            except JSONRepairError as e:
+                self.parse_stats.incr("failures")
+                logger.warning("Combined insights response is not valid JSON", extra={"error": str(e)})
+                raise ValueError(f"Failed to parse JSON from model response: {str(e)}")
+            except Exception as e:
+                logger.error("Groq API error", extra={"error": str(e)})
+                raise
+
+            for task, cache_key in pending.items():
+                template = get_template(INSIGHT_TASKS[task])
+                part = payload.get(template.name)
+                if part is None:
+                    part = payload.get(task)
+                try:
+                    validated = template.response_model.parse_obj(part).dict()
+                except SchemaValidationError as e:
+                    self.parse_stats.incr("validation_failures")
+                    errors[task] = f"Invalid {task} payload: {e.errors()[0].get('msg', 'validation failed')}"
+                    continue
+                results[task] = validated
+                self.response_cache.set(cache_key, copy.deepcopy(validated))
+
+        return {"results": results, "errors": errors, "cached": cached}
+
 
 ai_service = AIService()
@@ -5,6 +5,8 @@ Provides reusable patterns for all service classes
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+from core.log import get_logger
+
 
 class BaseService(ABC):
     """
@@ -14,19 +16,19 @@ class BaseService(ABC):
     
     def __init__(self):
         self.name = self.__class__.__name__
+        self.logger = get_logger(f"services.{self.name}")
     
     def log_info(self, message: str):
         """Log informational message"""
-        print(f"[{self.name}] INFO: {message}")
+        self.logger.info(message)
     
     def log_error(self, message: str, error: Exception = None):
         """Log error message"""
-        error_detail = f" - {str(error)}" if error else ""
-        print(f"[{self.name}] ERROR: {message}{error_detail}")
+        self.logger.error(message, extra={"error": str(error)} if error else None)
     
     def log_warning(self, message: str):
         """Log warning message"""
-        print(f"[{self.name}] WARNING: {message}")
+        self.logger.warning(message)
     
     @abstractmethod
     async def validate_input(self, **kwargs) -> bool:
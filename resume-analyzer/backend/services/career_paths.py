@@ -0,0 +1,263 @@
+"""
+Persistent roadmap cache for /api/career-path.
+
+Roadmaps depend only on (current_role, target_role, current_skills), and
+most traffic is a handful of common transitions. Inputs are normalized,
+stored in the ``career_roadmaps`` collection keyed on the normalized
+tuple, and near-identical skill sets for the same role pair reuse an
+existing roadmap. Request counts per role pair are kept in
+``career_path_stats`` so a warm-up job can precompute the top-N pairs.
+
+Only roadmaps that validate against ``CareerRoadmapResult`` (with at
+least one phase) are stored, and stored roadmaps are served for
+CAREER_PATH_TTL_DAYS before being regenerated.
+"""
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError as SchemaValidationError
+
+from core.config import get_settings
+from core.log import get_logger
+from models.schemas import CareerRoadmapResult
+from services.prompt_templates import get_template
+
+settings = get_settings()
+
+logger = get_logger(__name__)
+
+ROADMAPS_COLLECTION = "career_roadmaps"
+STATS_COLLECTION = "career_path_stats"
+
+# Seeds for warm-up when no traffic has been recorded yet.
+DEFAULT_ROLE_PAIRS = [
+    ("Junior Developer", "Senior Developer"),
+    ("Data Analyst", "Data Scientist"),
+    ("Software Engineer", "Machine Learning Engineer"),
+    ("Frontend Developer", "Full Stack Developer"),
+    ("QA Engineer", "DevOps Engineer"),
+]
+
+_ROLE_ALIASES = {
+    "jr": "junior",
+    "sr": "senior",
+    "snr": "senior",
+    "dev": "developer",
+    "devs": "developer",
+    "eng": "engineer",
+    "engg": "engineer",
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "mgr": "manager",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "ds": "data scientist",
+    "fullstack": "full stack",
+    "frontend": "front end",
+    "backend": "back end",
+}
+
+_SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "reactjs": "react",
+    "react.js": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "sklearn": "scikit-learn",
+}
+
+_MAX_SKILL_SETS_PER_PAIR = 20
+
+
+def normalize_role(role: str) -> str:
+    words = re.findall(r"[a-z0-9+#]+", (role or "").lower())
+    return " ".join(_ROLE_ALIASES.get(word, word) for word in words)
+
+
+def normalize_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    normalized = set()
+    for skill in skills or []:
+        text = re.sub(r"\s+", " ", str(skill or "").strip().lower())
+        if text:
+            normalized.add(_SKILL_ALIASES.get(text, text))
+    return sorted(normalized)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:24]
+
+
+def pair_key(current_role: str, target_role: str) -> str:
+    return f"{normalize_role(current_role)}->{normalize_role(target_role)}"
+
+
+def roadmap_key(current_role: str, target_role: str, skills: List[str]) -> str:
+    template = get_template("career_path")
+    return _digest(template.cache_key, pair_key(current_role, target_role), ",".join(skills))
+
+
+def validate_roadmap(roadmap: Any) -> Optional[Dict[str, Any]]:
+    """The roadmap normalized to ``CareerRoadmapResult``, or None if it does not fit."""
+    try:
+        validated = CareerRoadmapResult.parse_obj(roadmap)
+    except SchemaValidationError:
+        return None
+    return validated.dict() if validated.roadmap else None
+
+
+def _jaccard(a: Iterable[str], b: Iterable[str]) -> float:
+    a, b = set(a), set(b)
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class CareerPathCache:
+    def __init__(self, similarity_threshold: float = 0.8, ttl_days: float = 30):
+        self.similarity_threshold = similarity_threshold
+        self.ttl = timedelta(days=ttl_days)
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        created_at = entry.get("created_at")
+        if not isinstance(created_at, datetime):
+            return False
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return datetime.utcnow() - created_at < self.ttl
+
+    async def lookup(self, db, current_role: str, target_role: str, skills: List[str]) -> Optional[Dict[str, Any]]:
+        collection = db[ROADMAPS_COLLECTION]
+        exact = await collection.find_one({"id": roadmap_key(current_role, target_role, skills)})
+        if exact and self._fresh(exact):
+            self.hits += 1
+            return exact["roadmap"]
+
+        template_key = get_template("career_path").cache_key
+        candidates = await collection.find({"pair_key": pair_key(current_role, target_role)}).to_list(length=200)
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            if candidate.get("template_key") != template_key or not self._fresh(candidate):
+                continue
+            score = _jaccard(skills, candidate.get("skills") or [])
+            if score > best_score:
+                best, best_score = candidate, score
+
+        if best is not None and best_score >= self.similarity_threshold:
+            self.similar_hits += 1
+            return best["roadmap"]
+
+        self.misses += 1
+        return None
+
+    async def store(self, db, current_role: str, target_role: str, skills: List[str], roadmap: Dict[str, Any]):
+        key = roadmap_key(current_role, target_role, skills)
+        collection = db[ROADMAPS_COLLECTION]
+        # An expired entry for the same key is replaced.
+        await collection.delete_one({"id": key})
+        await collection.insert_one({
+            "id": key,
+            "pair_key": pair_key(current_role, target_role),
+            "template_key": get_template("career_path").cache_key,
+            "current_role": normalize_role(current_role),
+            "target_role": normalize_role(target_role),
+            "skills": skills,
+            "roadmap": roadmap,
+            "created_at": datetime.utcnow(),
+        })
+
+    async def get_or_generate(self, db, ai_service, current_role: str, target_role: str, current_skills: Optional[List[str]]) -> Dict[str, Any]:
+        skills = normalize_skills(current_skills)
+        cached = await self.lookup(db, current_role, target_role, skills)
+        if cached is not None:
+            return cached
+
+        roadmap = await ai_service.generate_career_path(current_role, target_role, skills)
+        validated = validate_roadmap(roadmap)
+        if validated is None:
+            logger.warning("Career roadmap failed validation; not caching it", extra={"current_role": current_role, "target_role": target_role})
+            return roadmap
+        await self.store(db, current_role, target_role, skills, validated)
+        return validated
+
+    async def record_request(self, db, current_role: str, target_role: str, current_skills: Optional[List[str]]):
+        """Count a request per role pair and per normalized skill set (the warm-up log)."""
+        key = pair_key(current_role, target_role)
+        skill_set = ",".join(normalize_skills(current_skills))
+        collection = db[STATS_COLLECTION]
+        stats_id = _digest(key)
+
+        # Counters are incremented by the store, so concurrent requests are all counted.
+        increments: Dict[str, Any] = {"requests": 1}
+        existing = await collection.find_one({"id": stats_id})
+        skill_sets = (existing or {}).get("skill_sets") or {}
+        if skill_set in skill_sets or len(skill_sets) < _MAX_SKILL_SETS_PER_PAIR:
+            increments["skill_sets"] = {skill_set: 1}
+
+        await collection.update_one(
+            {"id": stats_id},
+            {
+                "$set": {
+                    "pair_key": key,
+                    "current_role": current_role.strip(),
+                    "target_role": target_role.strip(),
+                    "last_requested_at": datetime.utcnow(),
+                },
+                "$inc": increments,
+            },
+            upsert=True,
+        )
+
+    async def top_pairs(self, db, top_n: int) -> List[Tuple[str, str, List[str]]]:
+        """Most requested role pairs, each with its most common skill set."""
+        stats = await db[STATS_COLLECTION].find({}).sort("requests", -1).to_list(length=top_n)
+        pairs = []
+        for entry in stats:
+            skill_sets = entry.get("skill_sets") or {"": 1}
+            common = max(skill_sets.items(), key=lambda item: item[1])[0]
+            pairs.append((entry["current_role"], entry["target_role"], [s for s in common.split(",") if s]))
+
+        if len(pairs) < top_n:
+            seen = {pair_key(current, target) for current, target, _ in pairs}
+            for current, target in DEFAULT_ROLE_PAIRS:
+                if len(pairs) >= top_n:
+                    break
+                if pair_key(current, target) not in seen:
+                    pairs.append((current, target, []))
+        return pairs
+
+    async def warm_up(self, db, ai_service, top_n: int = 20) -> Dict[str, int]:
+        """Precompute roadmaps for the top-N role pairs; already cached pairs are skipped."""
+        generated = skipped = failed = 0
+        for current, target, skills in await self.top_pairs(db, top_n):
+            if await self.lookup(db, current, target, skills) is not None:
+                skipped += 1
+                continue
+            try:
+                roadmap = validate_roadmap(await ai_service.generate_career_path(current, target, skills))
+                if roadmap is None:
+                    raise ValueError("roadmap failed validation")
+                await self.store(db, current, target, skills, roadmap)
+                generated += 1
+            except Exception as e:
+                logger.warning("Career path warm-up failed", extra={"current_role": current, "target_role": target, "error": str(e)})
+                failed += 1
+        return {"generated": generated, "skipped": skipped, "failed": failed}
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "similar_hits": self.similar_hits, "misses": self.misses}
+
+
+career_path_cache = CareerPathCache(
+    similarity_threshold=settings.CAREER_PATH_SIMILARITY_THRESHOLD,
+    ttl_days=settings.CAREER_PATH_TTL_DAYS,
+)
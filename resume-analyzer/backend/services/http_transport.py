@@ -0,0 +1,125 @@
+"""
+Shared HTTP transport for the Groq and OpenAI clients.
+
+Both SDKs accept an ``httpx.Client``; handing them the same pooled client
+means keep-alive connections (and their TLS sessions) are reused across
+bursts of calls, and every request gets explicit connect/read timeouts
+instead of the SDK's 10-minute default. Pool size, keep-alive expiry,
+timeouts and HTTP/2 are configured in ``core.config.Settings``.
+"""
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import httpx
+
+from core.config import get_settings
+from core.log import get_logger
+
+settings = get_settings()
+
+logger = get_logger(__name__)
+
+
+class TransportStats:
+    def __init__(self):
+        self._lock = Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.errors = 0
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+                "tls_handshakes": self.tls_handshakes,
+                "errors": self.errors,
+            }
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """HTTPTransport that counts new connections via httpcore trace events."""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self.stats
+        stats.incr("requests")
+        upstream_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                stats.incr("new_connections")
+            elif event_name == "connection.start_tls.complete":
+                stats.incr("tls_handshakes")
+            if upstream_trace is not None:
+                upstream_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        try:
+            return super().handle_request(request)
+        except httpx.TransportError:
+            stats.incr("errors")
+            raise
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+transport_stats = TransportStats()
+_client: Optional[httpx.Client] = None
+_client_lock = Lock()
+
+
+def get_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
+        read=settings.LLM_HTTP_READ_TIMEOUT,
+        write=settings.LLM_HTTP_WRITE_TIMEOUT,
+        pool=settings.LLM_HTTP_POOL_TIMEOUT,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            http2 = settings.LLM_HTTP2
+            if http2 and not _http2_available():
+                logger.warning("LLM_HTTP2 is enabled but the 'h2' package is missing; using HTTP/1.1")
+                http2 = False
+
+            limits = httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+            )
+            _client = httpx.Client(
+                transport=MeteredTransport(transport_stats, limits=limits, http2=http2),
+                timeout=get_timeout(),
+            )
+        return _client
+
+
+def close_http_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
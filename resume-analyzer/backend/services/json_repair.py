@@ -0,0 +1,150 @@
+"""
+Tolerant, incremental JSON extraction for LLM output.
+
+``IncrementalJSONParser`` is fed model output (all at once or chunk by
+chunk while streaming) and tracks string/escape state and the bracket
+stack of the first top-level JSON value. Once the value closes it is
+decoded directly. If the output stops early, the parser repairs it by
+closing the open string and containers, falling back to the last comma
+where the document was still well formed.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# How many fallback cut points to try before giving up on a repair.
+_MAX_REPAIR_ATTEMPTS = 64
+
+
+class JSONRepairError(ValueError):
+    """Raised when no JSON value can be recovered from the model output"""
+
+    def __init__(self, message: str, unterminated: bool = False):
+        super().__init__(message)
+        # True when the output stopped before the top-level value closed.
+        self.unterminated = unterminated
+
+
+class ParseResult:
+    def __init__(self, data: Any, complete: bool, repaired: bool, tail_start: int, unterminated: bool = False):
+        self.data = data
+        # True when the top-level value was closed by the model itself.
+        self.complete = complete
+        # True when closing brackets/strings had to be synthesized.
+        self.repaired = repaired
+        # Offset in the fed text where the recovered document ends.
+        self.tail_start = tail_start
+        # True when the output stopped before the top-level value closed, so
+        # more output could finish it; False for closed but invalid JSON.
+        self.unterminated = unterminated
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.buffer = ""
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # (offset, stack snapshot) right before each comma inside a container.
+        self._cut_points: List[Tuple[int, Tuple[str, ...]]] = []
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Consume more output; returns True once the top-level value is closed."""
+        if self.complete or not chunk:
+            return self.complete
+
+        offset = len(self.buffer)
+        self.buffer += chunk
+        for index in range(offset, len(self.buffer)):
+            char = self.buffer[index]
+
+            if self._start is None:
+                if char in _CLOSERS:
+                    self._start = index
+                    self._stack.append(char)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self._end = index + 1
+                    return True
+            elif char == ",":
+                self._cut_points.append((index, tuple(self._stack)))
+
+        return False
+
+    def _closers(self, stack) -> str:
+        return "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+    def result(self) -> ParseResult:
+        if self._start is None:
+            # No container at all; the model may have returned a bare literal.
+            try:
+                return ParseResult(json.loads(self.buffer), True, False, len(self.buffer))
+            except json.JSONDecodeError as e:
+                raise JSONRepairError(f"No JSON object found in model response: {e}")
+
+        if self.complete:
+            try:
+                return ParseResult(json.loads(self.buffer[self._start:self._end]), True, False, self._end)
+            except json.JSONDecodeError:
+                # Structurally closed but invalid inside (e.g. trailing comma); try repairs below.
+                pass
+
+        return self._repair()
+
+    def _repair(self) -> ParseResult:
+        end = self._end if self._end is not None else len(self.buffer)
+        body = self.buffer[self._start:end]
+
+        candidates = []
+        if not self.complete:
+            head = body
+            if self._in_string:
+                if self._escape:
+                    head = head[:-1]
+                head += '"'
+            candidates.append((head.rstrip().rstrip(",") + self._closers(self._stack), end))
+
+        for cut, stack in reversed(self._cut_points[-_MAX_REPAIR_ATTEMPTS:]):
+            if cut >= end:
+                continue
+            candidates.append((self.buffer[self._start:cut] + self._closers(stack), cut))
+
+        for text, tail_start in candidates:
+            try:
+                return ParseResult(json.loads(text), False, True, tail_start, unterminated=not self.complete)
+            except json.JSONDecodeError:
+                continue
+
+        raise JSONRepairError(
+            "Model response is not valid JSON and could not be repaired", unterminated=not self.complete
+        )
+
+
+def parse_model_json(text: str) -> ParseResult:
+    parser = IncrementalJSONParser()
+    parser.feed(text or "")
+    return parser.result()
@@ -3,11 +3,16 @@ from difflib import SequenceMatcher
 
 from utils.skills_db import COMMON_SKILLS
 from models.schemas import AIAnalysisResult
+from core.metrics import timed
 
 class NLPService:
     def __init__(self):
-        # Precompute lowercase skills once for faster matching.
-        self._skills = [skill.strip().lower() for skill in COMMON_SKILLS if skill.strip()]
+        # Matcher tables are built once, at import. Under gunicorn's preload_app that
+        # happens in the master, and forked workers share them copy-on-write.
+        skills = sorted({skill.strip().lower() for skill in COMMON_SKILLS if skill.strip()})
+        self._single_skills = frozenset(skill for skill in skills if " " not in skill)
+        self._phrase_skills = tuple(skill for skill in skills if " " in skill)
+        self._skill_patterns = {skill: re.compile(rf"\b{re.escape(skill)}\b") for skill in skills}
         self._required_sections = [
             "summary",
             "experience",
@@ -16,6 +21,9 @@ class NLPService:
             "projects",
         ]
         self._critical_sections = ["experience", "skills", "education"]
+        self._section_patterns = [
+            (section, re.compile(rf"\b{re.escape(section)}\b")) for section in self._required_sections
+        ]
         self._action_verbs = {
             "built", "led", "managed", "designed", "developed", "implemented", "optimized",
             "improved", "launched", "scaled", "automated", "delivered", "created", "reduced",
@@ -95,17 +103,12 @@ class NLPService:
 
         return ordered
 
+    @timed("nlp.extract_skills")
     def extract_skills(self, text: str) -> list[str]:
         text_lower = text.lower()
         tokens = self._tokenize(text)
-        skills = set()
-
-        for skill in self._skills:
-            if " " in skill:
-                if skill in text_lower:
-                    skills.add(skill)
-            elif skill in tokens:
-                skills.add(skill)
+        skills = set(self._single_skills.intersection(tokens))
+        skills.update(skill for skill in self._phrase_skills if skill in text_lower)
 
         # If dictionary match is sparse, recover skills from explicit skills text patterns.
         if len(skills) < 3:
@@ -114,6 +117,7 @@ class NLPService:
 
         return sorted(skills)
 
+    @timed("nlp.similarity")
     def calculate_similarity_score(self, resume_text: str, job_desc: str) -> float:
         resume_text = (resume_text or "").strip().lower()
         job_desc = (job_desc or "").strip().lower()
@@ -130,9 +134,8 @@ class NLPService:
         found = []
         missing = []
 
-        for section in self._required_sections:
-            pattern = rf"\b{re.escape(section)}\b"
-            if re.search(pattern, text):
+        for section, pattern in self._section_patterns:
+            if pattern.search(text):
                 found.append(section)
             else:
                 missing.append(section)
@@ -197,7 +200,8 @@ class NLPService:
 
         repeated_count = 0
         for skill in job_skills:
-            occurrences = len(re.findall(rf"\b{re.escape(skill)}\b", text))
+            pattern = self._skill_patterns.get(skill) or re.compile(rf"\b{re.escape(skill)}\b")
+            occurrences = len(pattern.findall(text))
             if occurrences >= 6:
                 repeated_count += 1
 
@@ -245,6 +249,7 @@ class NLPService:
 
         return capped_score, cap_reasons
 
+    @timed("nlp.analyze_resume_vs_job")
     def analyze_resume_vs_job(self, resume_text: str, job_desc: str) -> AIAnalysisResult:
         resume_text = resume_text or ""
         job_desc = job_desc or ""
@@ -1,27 +1,35 @@
-import fitz
-import docx
 import io
 from fastapi import UploadFile
+from core.metrics import timed
+from core.log import get_logger
 
+logger = get_logger(__name__)
+
+@timed("parser.pdf")
 async def extract_text_from_pdf(file_content: bytes) -> str:
+    import fitz  # Deferred: PyMuPDF is slow to import and only needed for uploads.
+
     text = ""
     try:
         with fitz.open(stream=file_content, filetype="pdf") as doc:
             for page in doc:
                 text += page.get_text() + "\n"
     except Exception as e:
-        print(f"Error parsing PDF: {e}")
+        logger.warning("Failed to parse PDF", extra={"error": str(e)})
         raise ValueError("Failed to parse PDF file")
     return text
 
+@timed("parser.docx")
 async def extract_text_from_docx(file_content: bytes) -> str:
+    import docx
+
     text = ""
     try:
         doc = docx.Document(io.BytesIO(file_content))
         for para in doc.paragraphs:
             text += para.text + "\n"
     except Exception as e:
-        print(f"Error parsing DOCX: {e}")
+        logger.warning("Failed to parse DOCX", extra={"error": str(e)})
         raise ValueError("Failed to parse DOCX file")
     return text
 
@@ -0,0 +1,495 @@
+"""
+Prompt template registry for Groq-backed features.
+
+Every prompt is ordered from most to least shared:
+
+    system:  JSON-API preamble (identical for every template)
+    user:    resume block (byte-identical across features)
+    user:    task instructions + JSON schema (static per template version)
+    user:    per-call variables (job description, scores, skills, ...)
+
+Heatmap, explain-score and quality-check calls for the same resume
+therefore start with the same two messages, which provider-side prefix
+caching can reuse; only the task and its variables differ. Templates
+without a resume go straight from the preamble to the task. Bump a
+template's ``version`` whenever its instructions or schema change so
+cache keys roll over.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from models.schemas import (
+    ATSHeatmapResult,
+    CareerRoadmapResult,
+    InterviewPrepResult,
+    JobMatchResult,
+    OptimizationResult,
+    QualityCheckResult,
+    ResumeAnalysisPayload,
+    ScoreExplanationResult,
+    SimulationResult,
+    VersionComparisonResult,
+)
+
+
+SYSTEM_PREAMBLE = "You are a strict JSON API. Return only valid JSON with no markdown."
+
+
+def _digest(text: str, length: int = 12) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:length]
+
+
+def render_resume_block(resume_text: str, label: str = "Resume") -> str:
+    """Render resume text exactly the same way for every template."""
+    return f"{label}:\n{(resume_text or '').strip()}"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: int
+    instructions: str
+    schema: str
+    footer: str = "Return ONLY the JSON object."
+    uses_resume: bool = True
+    # Ordered (label, variable) pairs rendered after the resume block.
+    fields: List[tuple] = field(default_factory=list)
+    # Pydantic model the parsed response is validated against.
+    response_model: Optional[Type[BaseModel]] = None
+
+    @property
+    def task_prompt(self) -> str:
+        """Instructions and schema: identical for every call of this version."""
+        return (
+            f"{self.instructions.strip()}\n\n"
+            f"Respond in STRICT JSON format:\n{self.schema.strip()}\n\n"
+            f"{self.footer}"
+        )
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:v{self.version}:{_digest(self.task_prompt)}"
+
+    def render_variables(self, variables: Dict[str, Any]) -> str:
+        lines = []
+        for label, key in self.fields:
+            value = variables.get(key)
+            if value in (None, "", []):
+                continue
+            if isinstance(value, (list, tuple, set)):
+                value = ", ".join(str(item) for item in value)
+            text = str(value).strip()
+            if "\n" in text or len(text) > 120:
+                lines.append(f"{label}:\n{text}")
+            else:
+                lines.append(f"{label}: {text}")
+        return "\n\n".join(lines)
+
+    def build_messages(self, resume_text: Optional[str] = None, **variables) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": SYSTEM_PREAMBLE}]
+        if self.uses_resume:
+            messages.append({"role": "user", "content": render_resume_block(resume_text or "")})
+        messages.append({"role": "user", "content": self.task_prompt})
+
+        tail = self.render_variables(variables)
+        if tail:
+            messages.append({"role": "user", "content": tail})
+        elif not self.uses_resume:
+            messages.append({"role": "user", "content": "Generate the JSON now."})
+        return messages
+
+
+_SECTION_STATUS = '"<excellent|good|moderate|needs-work|critical>"'
+
+_HEATMAP_SECTIONS = [
+    "Contact Information",
+    "Professional Summary",
+    "Work Experience",
+    "Education",
+    "Skills",
+    "Projects",
+    "Certifications",
+    "Keywords Density",
+]
+
+
+def _heatmap_schema() -> str:
+    entries = ",\n".join(
+        "        {\n"
+        f'            "name": "{name}",\n'
+        '            "score": <number 0-100>,\n'
+        f"            \"status\": {_SECTION_STATUS},\n"
+        '            "feedback": "<specific feedback>"\n'
+        "        }"
+        for name in _HEATMAP_SECTIONS
+    )
+    return "{\n    \"sections\": [\n" + entries + "\n    ]\n}"
+
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def register_template(template: PromptTemplate) -> PromptTemplate:
+    PROMPT_TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    try:
+        return PROMPT_TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f"Unknown prompt template: {name}")
+
+
+register_template(PromptTemplate(
+    name="analyze_resume",
+    version=1,
+    response_model=ResumeAnalysisPayload,
+    instructions="""You are an expert ATS (Applicant Tracking System) and resume analyzer.
+Analyze the resume provided by the user and give a comprehensive evaluation.
+If a job description is provided, evaluate relevance against it.
+
+Rules for strengths and improvement_tips:
+- Keep each point concise (max 18 words).
+- Avoid generic filler text.
+- Focus on resume content and JD relevance.""",
+    schema="""{
+    "resume_score": <number 0-100>,
+    "ats_score": <number 0-100>,
+    "skills": {
+        "matched": [<list of skills found in resume>],
+        "missing": [<list of important skills not found>],
+        "recommended": [<list of skills to add>]
+    },
+    "section_scores": {
+        "education": <number 0-100>,
+        "experience": <number 0-100>,
+        "projects": <number 0-100>,
+        "skills": <number 0-100>
+    },
+    "strengths": [<list of 3-4 specific resume strengths>],
+    "resume_category": "<Fresher or Experienced>",
+    "improvement_tips": [<list of 3-4 specific actionable tips>],
+    "experience_match": "<Strong or Moderate or Weak>"
+}""",
+    footer="IMPORTANT: Return ONLY the JSON object, no additional text or explanation.",
+    fields=[("Job Description", "job_description")],
+))
+
+register_template(PromptTemplate(
+    name="ats_heatmap",
+    version=1,
+    response_model=ATSHeatmapResult,
+    instructions="""You are an ATS (Applicant Tracking System) expert. Analyze the resume provided
+by the user and evaluate each section for ATS compatibility.
+
+Status guidelines:
+- excellent: 90-100
+- good: 80-89
+- moderate: 70-79
+- needs-work: 50-69
+- critical: 0-49""",
+    schema=_heatmap_schema(),
+))
+
+register_template(PromptTemplate(
+    name="match_job",
+    version=1,
+    response_model=JobMatchResult,
+    instructions="""You are an expert job matching AI. Compare the resume with the job description
+provided by the user and give a detailed match analysis.""",
+    schema="""{
+    "match_percentage": <number 0-100>,
+    "matched_skills": [<list of skills that match>],
+    "missing_skills": [<list of required skills not in resume>],
+    "experience_match": "<low|medium|high>",
+    "reasoning": "<detailed explanation of why this is a good/bad match>"
+}""",
+    fields=[("Job Description", "job_description")],
+))
+
+register_template(PromptTemplate(
+    name="simulate_improvement",
+    version=1,
+    response_model=SimulationResult,
+    instructions="""You are a resume optimization expert. Analyze the impact of adding the new item
+described by the user (skill, project, certification or experience) to the resume.
+If a target job is provided, estimate the job match before and after.""",
+    schema="""{
+    "old_score": <number 0-100>,
+    "new_score": <number 0-100>,
+    "impact_percentage": <number representing improvement>,
+    "old_job_match": <number 0-100>,
+    "new_job_match": <number 0-100>,
+    "impact_explanation": "<detailed explanation of the impact>"
+}""",
+    fields=[
+        ("Item Type", "item_type"),
+        ("Added Item", "added_item"),
+        ("Target Job", "job_description"),
+    ],
+))
+
+register_template(PromptTemplate(
+    name="career_path",
+    version=1,
+    response_model=CareerRoadmapResult,
+    instructions="""You are a career development expert. Create a detailed learning roadmap for the
+role transition described by the user, taking their current skills into account.
+Provide 4 phases with specific, actionable skills and resources.""",
+    schema="""{
+    "total_duration": "<e.g., 7-11 months>",
+    "roadmap": [
+        {
+            "phase": "Phase <n>: <Name>",
+            "duration": "<e.g., 2-3 months>",
+            "skills": [<list of skills to learn>],
+            "resources": [<list of recommended resources>],
+            "milestone": "<project or achievement to complete>"
+        }
+    ]
+}""",
+    uses_resume=False,
+    fields=[
+        ("Current Role", "current_role"),
+        ("Target Role", "target_role"),
+        ("Current Skills", "current_skills"),
+    ],
+))
+
+register_template(PromptTemplate(
+    name="optimize_resume",
+    version=1,
+    response_model=OptimizationResult,
+    instructions="""You are an expert resume writer and ATS optimization specialist.
+Rewrite the resume to perfectly match the job description (and target company, if given).
+
+CRITICAL RULES:
+1. Preserve ALL factual information (dates, companies, education)
+2. Enhance language to match job requirements
+3. Add relevant ATS keywords from the job description
+4. Improve action verbs and quantifiable achievements
+5. Maintain professional tone""",
+    schema="""{
+    "optimized_summary": "<rewritten professional summary>",
+    "optimized_skills": ["<skill 1>", "<skill 2>", ...],
+    "optimized_experience": [
+        {
+            "original": "<original bullet point>",
+            "optimized": "<improved bullet point>",
+            "reason": "<why this change improves ATS score>"
+        }
+    ],
+    "ats_improvement_score": <number 0-100 representing expected improvement>,
+    "changes_explanation": "<summary of key optimizations made>"
+}""",
+    fields=[
+        ("Target Company", "company_name"),
+        ("Job Description", "job_description"),
+    ],
+))
+
+register_template(PromptTemplate(
+    name="interview_questions",
+    version=1,
+    response_model=InterviewPrepResult,
+    instructions="""You are an expert technical interviewer. Generate comprehensive interview questions
+based on the candidate's resume and the job requirements.
+Generate 5 questions per category.""",
+    schema="""{
+    "technical": [
+        {
+            "question": "<technical question>",
+            "focus_area": "<skill/technology>",
+            "difficulty": "easy|medium|hard"
+        }
+    ],
+    "behavioral": [
+        {
+            "question": "<behavioral question>",
+            "focus_area": "<competency>",
+            "difficulty": "easy|medium|hard"
+        }
+    ],
+    "situational": [
+        {
+            "question": "<situational question>",
+            "focus_area": "<scenario type>",
+            "difficulty": "easy|medium|hard"
+        }
+    ],
+    "overall_difficulty": "easy|medium|hard",
+    "preparation_tips": ["<tip 1>", "<tip 2>", ...]
+}""",
+    fields=[
+        ("Job Description", "job_description"),
+        ("Missing Skills to Focus On", "missing_skills"),
+    ],
+))
+
+register_template(PromptTemplate(
+    name="explain_score",
+    version=1,
+    response_model=ScoreExplanationResult,
+    instructions="""You are an AI explainability expert. Provide clear, actionable reasoning
+for why the resume received its ATS score, using the job description, score and
+skill lists provided by the user.""",
+    schema="""{
+    "reasoning": "<detailed explanation of the score>",
+    "positive_factors": [
+        {
+            "factor": "<what helped the score>",
+            "impact": "high|medium|low",
+            "evidence": "<specific example from resume>"
+        }
+    ],
+    "negative_factors": [
+        {
+            "factor": "<what hurt the score>",
+            "impact": "high|medium|low",
+            "evidence": "<specific gap or issue>"
+        }
+    ],
+    "improvement_actions": [
+        {
+            "action": "<specific action to take>",
+            "expected_impact": "+<number> points",
+            "priority": "high|medium|low"
+        }
+    ],
+    "score_breakdown": {
+        "skills_match": <0-100>,
+        "experience_relevance": <0-100>,
+        "keyword_optimization": <0-100>,
+        "formatting_quality": <0-100>
+    }
+}""",
+    fields=[
+        ("Job Description", "job_description"),
+        ("Current ATS Score", "ats_score"),
+        ("Matched Skills", "matched_skills"),
+        ("Missing Skills", "missing_skills"),
+    ],
+))
+
+register_template(PromptTemplate(
+    name="quality_check",
+    version=1,
+    response_model=QualityCheckResult,
+    instructions="""You are a resume quality auditor. Analyze the resume for:
+1. Weak/passive language
+2. Buzzword overuse
+3. Vague claims without evidence
+4. Unrealistic skill claims
+5. Inconsistencies""",
+    schema="""{
+    "confidence_score": <number 0-100>,
+    "authenticity_score": <number 0-100>,
+    "issues": [
+        {
+            "type": "weak_language|buzzwords|vague_claim|unrealistic|inconsistency",
+            "severity": "high|medium|low",
+            "location": "<where in resume>",
+            "issue": "<description of the problem>",
+            "example": "<specific text from resume>"
+        }
+    ],
+    "suggestions": [
+        {
+            "issue_type": "<type>",
+            "current": "<current text>",
+            "suggested": "<improved text>",
+            "reason": "<why this is better>"
+        }
+    ],
+    "risk_level": "low|medium|high",
+    "overall_assessment": "<summary of resume quality>"
+}""",
+))
+
+register_template(PromptTemplate(
+    name="compare_versions",
+    version=2,
+    response_model=VersionComparisonResult,
+    instructions="""You are a resume improvement analyst. The user provides the scores of two resume
+versions and a precomputed diff between them (changed lines per section, skill changes and
+ATS rubric component changes). Explain what changed and why it improved (or worsened) the score.""",
+    schema="""{
+    "score_change": {
+        "previous": <version 1 score>,
+        "current": <version 2 score>,
+        "delta": <difference>,
+        "trend": "improved|declined|unchanged"
+    },
+    "key_changes": [
+        {
+            "section": "<which section changed>",
+            "change_type": "added|removed|modified",
+            "description": "<what changed>",
+            "impact": "positive|negative|neutral"
+        }
+    ],
+    "improvements": ["<improvement 1>", "<improvement 2>", ...],
+    "regressions": ["<regression 1>", "<regression 2>", ...],
+    "recommendation": "<overall advice for next iteration>"
+}""",
+    uses_resume=False,
+    fields=[
+        ("Version 1 Score", "version1_score"),
+        ("Version 2 Score", "version2_score"),
+        ("Changes", "diff_summary"),
+    ],
+))
+
+
+def build_combined_messages(
+    template_names: List[str],
+    resume_text: str,
+    variables: Dict[str, Any],
+) -> List[Dict[str, str]]:
+    """
+    Merge several resume-bound templates into one multi-task prompt.
+
+    Each template's JSON object is requested under a top-level key of the
+    same name. The preamble and resume block lead exactly as in the
+    single-task prompts, and the variable fields are the ordered union of every
+    template's fields.
+    """
+    templates = [get_template(name) for name in template_names]
+    sections = [
+        f"### Task \"{t.name}\"\n{t.instructions.strip()}\n\nSchema for \"{t.name}\":\n{t.schema.strip()}"
+        for t in templates
+    ]
+    keys = ", ".join(f'"{t.name}"' for t in templates)
+    task_prompt = (
+        "Perform several independent analyses of the same resume. Return ONE JSON object "
+        f"whose top-level keys are exactly {keys}; the value of each key must follow that task's schema.\n\n"
+        + "\n\n".join(sections)
+        + "\n\nReturn ONLY the JSON object."
+    )
+
+    fields: List[tuple] = []
+    for t in templates:
+        for item in t.fields:
+            if item not in fields:
+                fields.append(item)
+    combined = PromptTemplate(
+        name="combined:" + "+".join(t.name for t in templates),
+        version=max(t.version for t in templates),
+        instructions="",
+        schema="",
+        fields=fields,
+    )
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PREAMBLE},
+        {"role": "user", "content": render_resume_block(resume_text)},
+        {"role": "user", "content": task_prompt},
+    ]
+    tail = combined.render_variables(variables)
+    if tail:
+        messages.append({"role": "user", "content": tail})
+    return messages
@@ -0,0 +1,136 @@
+"""
+Bounded in-memory cache for parsed AI responses.
+
+Entries are keyed on the versioned prompt-template cache key plus a digest
+of the rendered variable content, so a template version bump or any change
+to the resume / job description naturally misses. Because keys are
+content-addressed, entries never go stale, so with a ``SharedStore``
+(multi-worker mode) the in-process LRU sits in front of the shared file
+and a miss in one worker can be answered by another worker's result.
+
+Entries built from a resume carry an owner tag (a digest of the resume
+text) as their key prefix, so deleting the resume can ``purge`` them:
+locally, in the shared store, and, through the invalidation bus, in the
+other workers' LRUs.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.shared_state import SharedStore
+
+SHARED_NAMESPACE = "ai_responses"
+
+
+def content_owner(text: Optional[str]) -> Optional[str]:
+    """Owner tag for entries derived from ``text``; None when there is no text."""
+    if not text:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(template_key: str, messages: List[Dict[str, str]], owner: Optional[str] = None) -> str:
+    """Digest the variable part of a rendered prompt (everything after the prefix)."""
+    payload = json.dumps([m["content"] for m in messages[1:]], ensure_ascii=False)
+    key = f"{template_key}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}"
+    return f"{owner}/{key}" if owner else key
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600, shared: Optional[SharedStore] = None, bus=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared if max_entries > 0 else None
+        self.bus = bus
+        self.node_id = uuid.uuid4().hex
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        if bus is not None:
+            bus.subscribe(self._on_invalidation)
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.bus is not None:
+            self.bus.poll()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.shared is not None:
+            raw = self.shared.get(SHARED_NAMESPACE, key)
+            if raw is not None:
+                value = json.loads(raw)
+                self._store_local(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store_local(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._store_local(key, value)
+        if self.shared is not None:
+            self.shared.set(SHARED_NAMESPACE, key, json.dumps(value, default=str), self.ttl_seconds)
+
+    def _drop_local(self, prefixes) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefixes)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def purge(self, owners: Iterable[str]) -> int:
+        """Drop every entry tagged with one of ``owners``; returns how many this worker held."""
+        prefixes = tuple(f"{owner}/" for owner in owners if owner)
+        if not prefixes:
+            return 0
+        removed = self._drop_local(prefixes)
+        if self.shared is not None:
+            for prefix in prefixes:
+                self.shared.delete_prefix(SHARED_NAMESPACE, prefix)
+        if self.bus is not None:
+            for prefix in prefixes:
+                self.bus.publish(self.node_id, SHARED_NAMESPACE, prefix)
+        return removed
+
+    def _on_invalidation(self, origin: str, collection: str, prefix: Optional[str]):
+        if origin != self.node_id and collection == SHARED_NAMESPACE and prefix:
+            self._drop_local((prefix,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear(SHARED_NAMESPACE)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "shared": self.shared is not None,
+        }
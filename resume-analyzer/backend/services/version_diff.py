@@ -0,0 +1,238 @@
+"""
+Deterministic local comparison of two resume versions.
+
+``diff_versions`` splits both texts into sections, diffs them line by
+line (with word-level counts for rewritten lines), and compares the
+skills from ``NLPService.extract_skills`` and the ATS rubric components
+from ``analyze_resume_vs_job``. It runs in milliseconds and needs no
+model call. ``build_local_comparison`` turns the diff into the same
+shape the compare-versions prompt returns. ``summarize_diff`` renders a
+compact text version for when an LLM narrative is requested.
+"""
+import re
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+from services.nlp_engine import nlp_engine
+
+HEADER_SECTION = "header"
+
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "experience", "work experience",
+    "professional experience", "education", "skills", "technical skills",
+    "projects", "certifications", "achievements", "awards", "publications",
+}
+
+# Upper bounds on what is reported per section and sent to the model.
+MAX_LINES_PER_SECTION = 6
+MAX_SUMMARY_LINES = 40
+
+_BULLET = re.compile(r"^\s*[-*•]\s*")
+
+
+def _heading(line: str) -> Optional[str]:
+    candidate = line.strip().strip(":|-").strip().lower()
+    return candidate if candidate in SECTION_HEADINGS else None
+
+
+def split_sections(text: str) -> "OrderedDict[str, List[str]]":
+    """Non-empty lines grouped under their section heading, in order."""
+    sections: "OrderedDict[str, List[str]]" = OrderedDict()
+    current = HEADER_SECTION
+    sections[current] = []
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        heading = _heading(line)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    if not sections[HEADER_SECTION]:
+        del sections[HEADER_SECTION]
+    return sections
+
+
+def apply_optimization(text: str, optimized_content: Optional[Dict[str, Any]]) -> str:
+    """
+    Text of an optimized version: the shared original with the optimizer's
+    summary, skills and rewritten bullets applied.
+    """
+    if not optimized_content:
+        return text or ""
+
+    sections = split_sections(text)
+    summary = optimized_content.get("optimized_summary")
+    if summary:
+        key = next((name for name in ("summary", "profile", "objective") if name in sections), "summary")
+        sections[key] = [summary]
+
+    skills = optimized_content.get("optimized_skills") or []
+    if skills:
+        key = "technical skills" if "technical skills" in sections else "skills"
+        sections[key] = [", ".join(skills)]
+
+    rewrites = {}
+    for bullet in optimized_content.get("optimized_experience") or []:
+        original = _BULLET.sub("", (bullet.get("original") or "")).strip()
+        improved = bullet.get("optimized") or bullet.get("improved")
+        if original and improved:
+            rewrites[original] = improved
+
+    lines = []
+    for name, body in sections.items():
+        if name != HEADER_SECTION:
+            lines.append(name.title())
+        for line in body:
+            stripped = _BULLET.sub("", line).strip()
+            lines.append(f"- {rewrites[stripped]}" if stripped in rewrites else line)
+    return "\n".join(lines)
+
+
+def _word_delta(before: List[str], after: List[str]) -> Dict[str, int]:
+    old_words = " ".join(before).split()
+    new_words = " ".join(after).split()
+    added = removed = 0
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_words, new_words, autojunk=False).get_opcodes():
+        if tag in ("replace", "delete"):
+            removed += i2 - i1
+        if tag in ("replace", "insert"):
+            added += j2 - j1
+    return {"added": added, "removed": removed}
+
+
+def _diff_section(name: str, before: List[str], after: List[str]) -> Optional[Dict[str, Any]]:
+    if before == after:
+        return None
+    if not before:
+        change_type = "added"
+    elif not after:
+        change_type = "removed"
+    else:
+        change_type = "modified"
+
+    added_lines, removed_lines = [], []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, before, after, autojunk=False).get_opcodes():
+        if tag in ("replace", "delete"):
+            removed_lines.extend(before[i1:i2])
+        if tag in ("replace", "insert"):
+            added_lines.extend(after[j1:j2])
+
+    return {
+        "section": name,
+        "change_type": change_type,
+        "added_lines": added_lines[:MAX_LINES_PER_SECTION],
+        "removed_lines": removed_lines[:MAX_LINES_PER_SECTION],
+        "lines_added": len(added_lines),
+        "lines_removed": len(removed_lines),
+        "words": _word_delta(removed_lines, added_lines),
+    }
+
+
+def _rubric(text: str, job_description: str) -> Dict[str, float]:
+    breakdown = nlp_engine.analyze_resume_vs_job(text, job_description).score_breakdown or {}
+    return {name: float(part.get("score", 0)) for name, part in breakdown.items()}
+
+
+def diff_versions(text1: str, text2: str, job_description: str = "") -> Dict[str, Any]:
+    started = time.perf_counter()
+
+    sections1, sections2 = split_sections(text1), split_sections(text2)
+    names = list(sections1) + [name for name in sections2 if name not in sections1]
+    sections = [
+        change for change in (
+            _diff_section(name, sections1.get(name, []), sections2.get(name, []))
+            for name in names
+        ) if change
+    ]
+
+    skills1, skills2 = set(nlp_engine.extract_skills(text1 or "")), set(nlp_engine.extract_skills(text2 or ""))
+
+    rubric1, rubric2 = _rubric(text1, job_description), _rubric(text2, job_description)
+    rubric = {
+        name: {"before": rubric1.get(name, 0.0), "after": rubric2.get(name, 0.0),
+               "delta": round(rubric2.get(name, 0.0) - rubric1.get(name, 0.0), 1)}
+        for name in rubric2
+    }
+
+    return {
+        "sections": sections,
+        "skills": {
+            "added": sorted(skills2 - skills1),
+            "removed": sorted(skills1 - skills2),
+            "unchanged": len(skills1 & skills2),
+        },
+        "rubric": rubric,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def build_local_comparison(diff: Dict[str, Any], score1: float, score2: float) -> Dict[str, Any]:
+    """Comparison in the compare-versions response shape, derived from the diff alone."""
+    delta = round((score2 or 0) - (score1 or 0), 1)
+    trend = "improved" if delta > 0 else "declined" if delta < 0 else "unchanged"
+
+    key_changes = []
+    for change in diff["sections"]:
+        words = change["words"]
+        key_changes.append({
+            "section": change["section"].title(),
+            "change_type": change["change_type"],
+            "description": (
+                f"{change['lines_added']} line(s) added, {change['lines_removed']} removed "
+                f"(+{words['added']}/-{words['removed']} words)"
+            ),
+            "impact": "neutral",
+        })
+
+    improvements, regressions = [], []
+    if diff["skills"]["added"]:
+        improvements.append(f"Added skills: {', '.join(diff['skills']['added'][:8])}")
+    if diff["skills"]["removed"]:
+        regressions.append(f"Removed skills: {', '.join(diff['skills']['removed'][:8])}")
+    for name, part in diff["rubric"].items():
+        if name == "total" or not part["delta"]:
+            continue
+        label = name.replace("_", " ")
+        if name == "strictness_deductions":
+            # Deductions going up is a regression.
+            (regressions if part["delta"] > 0 else improvements).append(f"{label}: {part['delta']:+}")
+        else:
+            (improvements if part["delta"] > 0 else regressions).append(f"{label}: {part['delta']:+}")
+
+    if regressions:
+        recommendation = f"Address the regressions first, starting with {regressions[0].split(':')[0].lower()}."
+    elif not key_changes:
+        recommendation = "The versions are identical; optimize for a specific job to create a new version."
+    else:
+        recommendation = "The new version holds up; keep iterating on sections that did not change."
+
+    return {
+        "score_change": {"previous": score1, "current": score2, "delta": delta, "trend": trend},
+        "key_changes": key_changes,
+        "improvements": improvements,
+        "regressions": regressions,
+        "recommendation": recommendation,
+    }
+
+
+def summarize_diff(diff: Dict[str, Any]) -> str:
+    """Compact, line-oriented rendering of a diff for the narrative prompt."""
+    lines = []
+    for change in diff["sections"]:
+        lines.append(f"[{change['section']}] {change['change_type']}")
+        lines.extend(f"- {line}" for line in change["removed_lines"])
+        lines.extend(f"+ {line}" for line in change["added_lines"])
+    if diff["skills"]["added"] or diff["skills"]["removed"]:
+        lines.append(f"Skills added: {', '.join(diff['skills']['added']) or 'none'}")
+        lines.append(f"Skills removed: {', '.join(diff['skills']['removed']) or 'none'}")
+    for name, part in diff["rubric"].items():
+        if part["delta"]:
+            lines.append(f"Rubric {name}: {part['before']} -> {part['after']}")
+    if not lines:
+        return "No textual differences."
+    return "\n".join(lines[:MAX_SUMMARY_LINES])
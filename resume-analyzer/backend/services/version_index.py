@@ -0,0 +1,129 @@
+"""
+Maintained version index for resume version history.
+
+For every resume that has been listed or optimized, the
+``resume_versions`` collection holds one document keyed by that resume's
+id with its ordered versions (the resume itself, then its optimized
+children) as ``[{"id", "version"}]``. Listing and comparing versions
+then costs one index read plus a point read per version, instead of a
+``$or`` scan over the whole ``resumes`` collection.
+
+The index is updated when ``optimize_resume`` inserts a version and
+when a resume is deleted. Both are single ``$addToSet`` / ``$pull``
+updates (ArrayUnion / ArrayRemove on Firestore), so concurrent
+optimizations of the same resume cannot overwrite each other's entries;
+readers sort the entries by version. Resumes created before the index
+existed are backfilled lazily on first access, using two indexed
+equality queries.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from db.firebase import ids_query
+
+VERSIONS_COLLECTION = "resume_versions"
+
+
+def _entry(document: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": document["id"], "version": document.get("version", 1)}
+
+
+def _ordered(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Stable: versions with the same number keep insertion order.
+    return sorted(entries, key=lambda entry: entry.get("version") or 0)
+
+
+class VersionIndex:
+    async def _backfill(self, db, resume_id: str) -> Optional[List[Dict[str, Any]]]:
+        root = await db["resumes"].find_one({"id": resume_id})
+        if not root:
+            return None
+        children = await db["resumes"].find(
+            {"parent_resume_id": resume_id}, projection=["version"]
+        ).to_list(length=None)
+        entries = _ordered([_entry(root)] + [_entry(child) for child in children])
+        await db[VERSIONS_COLLECTION].insert_one({
+            "id": resume_id,
+            "user_id": root.get("user_id"),
+            "entries": entries,
+            "updated_at": datetime.utcnow(),
+        })
+        return entries
+
+    async def entries(self, db, resume_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Ordered ``{"id", "version"}`` entries, or None if the resume does not exist."""
+        index = await db[VERSIONS_COLLECTION].find_one({"id": resume_id})
+        if index is not None:
+            return _ordered(index.get("entries") or [])
+        return await self._backfill(db, resume_id)
+
+    async def load(self, db, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Point-read the documents behind ``entries``, skipping any that vanished."""
+        documents = []
+        for entry in entries:
+            document = await db["resumes"].find_one({"id": entry["id"]})
+            if document is not None:
+                documents.append(document)
+        return documents
+
+    async def find_version(self, db, resume_id: str, version: int) -> Optional[Dict[str, Any]]:
+        for entry in await self.entries(db, resume_id) or []:
+            if entry.get("version") == version:
+                return await db["resumes"].find_one({"id": entry["id"]})
+        return None
+
+    async def add_version(self, db, parent_id: str, document: Dict[str, Any]):
+        """Register a freshly inserted version under its parent."""
+        index = await db[VERSIONS_COLLECTION].find_one({"id": parent_id})
+        if index is None:
+            # The backfill already sees the new child.
+            await self._backfill(db, parent_id)
+            return
+        await db[VERSIONS_COLLECTION].update_one(
+            {"id": parent_id},
+            {"$addToSet": {"entries": _entry(document)}, "$set": {"updated_at": datetime.utcnow()}},
+        )
+
+    async def remove(self, db, resume_id: str, parent_id: Optional[str] = None):
+        """Drop a deleted resume's own index and its entry in the parent's index."""
+        await db[VERSIONS_COLLECTION].delete_one({"id": resume_id})
+        if not parent_id:
+            return
+        index = await db[VERSIONS_COLLECTION].find_one({"id": parent_id})
+        if index is None:
+            return
+        # Entries never change once written, so pulling the exact stored ones is safe.
+        for entry in index.get("entries") or []:
+            if entry["id"] == resume_id:
+                await db[VERSIONS_COLLECTION].update_one(
+                    {"id": parent_id},
+                    {"$pull": {"entries": entry}, "$set": {"updated_at": datetime.utcnow()}},
+                )
+
+    async def descendants(self, db, resume_id: str) -> List[str]:
+        """Ids of every version derived from ``resume_id``, at any depth."""
+        found: List[str] = []
+        frontier = [resume_id]
+        while frontier:
+            parent_id = frontier.pop()
+            children = await db["resumes"].find(
+                {"parent_resume_id": parent_id}, projection=["parent_resume_id"]
+            ).to_list(length=None)
+            for child in children:
+                if child["id"] not in found and child["id"] != resume_id:
+                    found.append(child["id"])
+                    frontier.append(child["id"])
+        return found
+
+    async def remove_many(self, db, resume_ids: List[str], parent_id: Optional[str] = None):
+        """Drop the indexes of a deleted version tree and its entry under ``parent_id``."""
+        if resume_ids:
+            await db[VERSIONS_COLLECTION].delete_many(ids_query(resume_ids))
+        if parent_id and parent_id not in resume_ids:
+            await self.remove(db, resume_ids[0], parent_id)
+
+    async def remove_user(self, db, user_id: str):
+        await db[VERSIONS_COLLECTION].delete_many({"user_id": user_id})
+
+
+version_index = VersionIndex()
@@ -0,0 +1,65 @@
+"""
+Optional background warm-up.
+
+The parsers, provider SDKs and API clients load lazily so the app can
+answer health checks as soon as it starts. With STARTUP_WARMUP enabled,
+``start_warmup`` loads them on a worker thread right after startup, so
+the first real upload or AI request does not pay for the imports.
+"""
+import asyncio
+import importlib
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import get_settings
+from core.log import get_logger
+
+settings = get_settings()
+
+logger = get_logger(__name__)
+
+_warmup_future: Optional[asyncio.Future] = None
+
+
+def _ai_clients():
+    from services.ai_generator import ai_generator
+    from services.ai_service import ai_service
+
+    ai_service.client
+    ai_generator.client
+
+
+def _nlp():
+    from services.nlp_engine import nlp_engine
+
+    nlp_engine.analyze_resume_vs_job("Experience\n- Built services in python", "python")
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("fitz", lambda: importlib.import_module("fitz")),
+    ("docx", lambda: importlib.import_module("docx")),
+    ("ai_clients", _ai_clients),
+    ("nlp", _nlp),
+]
+
+
+def warm_up() -> Dict[str, float]:
+    """Run every warm-up step; returns milliseconds per step. Failures are logged, not raised."""
+    timings: Dict[str, float] = {}
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step failed", extra={"step": name, "error": str(e)})
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("Warm-up finished", extra={"timings_ms": timings})
+    return timings
+
+
+async def start_warmup():
+    """Startup hook; schedules ``warm_up`` without delaying startup."""
+    global _warmup_future
+    if not settings.STARTUP_WARMUP or _warmup_future is not None:
+        return
+    _warmup_future = asyncio.get_running_loop().run_in_executor(None, warm_up)
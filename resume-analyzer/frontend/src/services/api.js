@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { auth } from './firebase';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
@@ -6,6 +7,17 @@ export const api = axios.create({
     baseURL: API_URL,
 });
 
+// Identifies the signed-in user to the backend's per-user AI quotas with
+// a Firebase ID token; getIdToken() returns the cached one until it is
+// about to expire.
+api.interceptors.request.use(async (config) => {
+    const user = auth.currentUser;
+    if (user) {
+        config.headers.Authorization = `Bearer ${await user.getIdToken()}`;
+    }
+    return config;
+});
+
 export const uploadResume = async (file, userId) => {
     const formData = new FormData();
     formData.append('file', file);
@@ -28,8 +40,10 @@ export const analyzeResume = async (resumeId, jobDescription) => {
     return response.data;
 };
 
-export const getUserAnalysisHistory = async (userId) => {
-    const response = await api.get(`/resumes/${userId}`);
+export const getUserAnalysisHistory = async (userId, { limit = 100, include = 'analysis' } = {}) => {
+    const response = await api.get(`/resumes/${userId}`, {
+        params: { limit, include },
+    });
     return response.data;
 };
 